@@ -1,3 +1,4 @@
+from array import array  # array: Tamsayıları sıkışık (düz) dizilerde saklamak için kullanılır.
 from collections import defaultdict, deque  # defaultdict: Varsayılan değerli sözlük, deque: Çift taraflı kuyruk (hızlı ekleme/çıkarma)
 import heapq  # heapq: Öncelikli kuyruk (min-heap) işlemleri için, en küçük elemanı hızlı almak için kullanılır.
 from typing import Dict, List, Tuple, Optional  # Dict: sözlük, List: liste, Tuple: demet, Optional: None olabilir türler için tip belirtimi sağlar.
@@ -17,38 +18,73 @@ class MetroAgi:  # Metro ağını temsil eden sınıf
     def __init__(self):  # Metro ağı nesnesini başlatan yapıcı metod
         self.istasyonlar: Dict[str, Istasyon] = {}  # Tüm istasyonları ID'leriyle saklayan sözlük
         self.hatlar: Dict[str, List[Istasyon]] = defaultdict(list)  # Hatları ve içindeki istasyonları saklayan sözlük
+        self._derlendi = False  # Grafın CSR düzenine derlenmiş hâlinin güncel olup olmadığı
+        self._sira: List[Istasyon] = []  # İndeks -> istasyon (derlenmiş düzen)
+        self._indeks: Dict[str, int] = {}  # İstasyon ID'si -> indeks (derlenmiş düzen)
+        self._ofset = array("i")  # i. istasyonun komşuları _komsu[_ofset[i]:_ofset[i+1]] aralığında
+        self._komsu = array("i")  # Tüm komşu indeksleri art arda
+        self._agirlik = array("i")  # _komsu ile aynı sırada kenar süreleri
 
     def istasyon_ekle(self, idx: str, ad: str, hat: str) -> None:  # Yeni bir istasyon ekleyen metod
         if idx not in self.istasyonlar:  # İstasyon daha önce eklenmemişse
             istasyon = Istasyon(idx, ad, hat)  # Yeni istasyon nesnesi oluştur
             self.istasyonlar[idx] = istasyon  # İstasyonu istasyonlar sözlüğüne ekle
             self.hatlar[hat].append(istasyon)  # İstasyonu ilgili hatta ekle
+            self._derlendi = False  # Graf değişti, derlenmiş düzen yeniden kurulmalı
 
     def baglanti_ekle(self, istasyon1_id: str, istasyon2_id: str, sure: int) -> None:  # İki istasyon arasında bağlantı ekleyen metod
         istasyon1 = self.istasyonlar[istasyon1_id]  # İlk istasyonu al
         istasyon2 = self.istasyonlar[istasyon2_id]  # İkinci istasyonu al
         istasyon1.komsu_ekle(istasyon2, sure)  # İlk istasyona ikinciyi komşu olarak ekle
         istasyon2.komsu_ekle(istasyon1, sure)  # İkinci istasyona ilki komşu olarak ekle
+        self._derlendi = False  # Graf değişti, derlenmiş düzen yeniden kurulmalı
+
+    def compile(self) -> None:  # Grafı tamsayı indeksli düz dizilere (CSR) donduran metod
+        if self._derlendi:  # Derlenmiş düzen hâlâ güncelse
+            return  # Yeniden kurmaya gerek yok
+        self._sira = list(self.istasyonlar.values())  # İstasyonlara 0..n-1 indeks ver
+        self._indeks = {ist.idx: i for i, ist in enumerate(self._sira)}  # ID'den indekse eşleme
+        self._ofset = array("i", [0])  # İlk istasyonun komşuları 0'dan başlar
+        self._komsu = array("i")  # Komşu indeksleri
+        sureler = []  # Kenar süreleri (türü hepsi görüldükten sonra seçilir)
+        for ist in self._sira:  # Her istasyon için
+            for komsu, sure in ist.komsular:  # Komşularını sırayla dolaş
+                self._komsu.append(self._indeks[komsu.idx])  # Komşunun indeksini ekle
+                sureler.append(sure)  # Kenar süresini ekle
+            self._ofset.append(len(self._komsu))  # Bu istasyonun komşu aralığının sonu
+        tip = "i" if all(isinstance(s, int) for s in sureler) else "d"  # Kesirli süre varsa double dizi
+        self._agirlik = array(tip, sureler)  # _komsu ile aynı sırada kenar süreleri
+        self._derlendi = True  # Derlenmiş düzen artık güncel
+
+    def _yol_olustur(self, onceki: List[int], hedef: int) -> List[Istasyon]:  # Öncül dizisinden rotayı geri kuran metod
+        yol = [hedef]  # Hedeften başla
+        while onceki[yol[-1]] != yol[-1]:  # Başlangıcın öncülü kendisidir
+            yol.append(onceki[yol[-1]])  # Öncüle geri git
+        return [self._sira[i] for i in reversed(yol)]  # İndeksleri istasyonlara çevir
 
     def en_az_aktarma_bul(self, baslangic_id: str, hedef_id: str) -> Optional[List[Istasyon]]:  # En az aktarmalı rotayı bulan metod (BFS)
         if baslangic_id not in self.istasyonlar or hedef_id not in self.istasyonlar:  # Başlangıç veya hedef istasyonu yoksa
             return None  # Geçersiz giriş
 
-        baslangic = self.istasyonlar[baslangic_id]  # Başlangıç istasyonunu al
-        hedef = self.istasyonlar[hedef_id]  # Hedef istasyonunu al
+        self.compile()  # Derlenmiş düzenin güncel olduğundan emin ol
+        ofset, komsu = self._ofset, self._komsu  # Döngüde hızlı erişim için yerel değişkenler
+        baslangic = self._indeks[baslangic_id]  # Başlangıç istasyonunun indeksi
+        hedef = self._indeks[hedef_id]  # Hedef istasyonunun indeksi
 
-        kuyruk = deque([(baslangic, [baslangic])])  # BFS için kuyruk, her eleman (istasyon, şu ana kadarki yol)
-        ziyaret_edildi = set([baslangic])  # Ziyaret edilen istasyonları saklayan küme
+        onceki = [-1] * len(self._sira)  # Her istasyonun öncülü (-1: ziyaret edilmedi)
+        onceki[baslangic] = baslangic  # Başlangıç kendi öncülüdür
+        kuyruk = deque([baslangic])  # BFS için kuyruk, yalnızca istasyon indeksleri tutulur
 
         while kuyruk:  # Kuyruk boşalana kadar işle
-            istasyon, yol = kuyruk.popleft()  # Kuyruktan sıradaki istasyonu al
-            if istasyon == hedef:  # Hedefe ulaşıldıysa
-                return yol  # Bulunan en kısa rota
+            u = kuyruk.popleft()  # Kuyruktan sıradaki istasyonu al
+            if u == hedef:  # Hedefe ulaşıldıysa
+                return self._yol_olustur(onceki, hedef)  # Rotayı öncüllerden kur
 
-            for komsu, _ in istasyon.komsular:  # Komşu istasyonları kontrol et
-                if komsu not in ziyaret_edildi:  # Daha önce ziyaret edilmediyse
-                    ziyaret_edildi.add(komsu)  # Ziyaret edildi olarak işaretle
-                    kuyruk.append((komsu, yol + [komsu]))  # Kuyruğa yeni istasyonu ve güncellenmiş yolu ekle
+            for e in range(ofset[u], ofset[u + 1]):  # Komşu istasyonları kontrol et
+                v = komsu[e]  # Komşunun indeksi
+                if onceki[v] == -1:  # Daha önce ziyaret edilmediyse
+                    onceki[v] = u  # Öncülünü kaydet (ziyaret edildi olarak işaretler)
+                    kuyruk.append(v)  # Kuyruğa ekle
 
         return None  # Hiçbir rota bulunamazsa None döndür
 
@@ -56,26 +92,34 @@ class MetroAgi:  # Metro ağını temsil eden sınıf
         if baslangic_id not in self.istasyonlar or hedef_id not in self.istasyonlar:  # Başlangıç veya hedef yoksa
             return None  # Geçersiz giriş
 
-        baslangic = self.istasyonlar[baslangic_id]  # Başlangıç istasyonunu al
-        hedef = self.istasyonlar[hedef_id]  # Hedef istasyonunu al
+        self.compile()  # Derlenmiş düzenin güncel olduğundan emin ol
+        ofset, komsu, agirlik = self._ofset, self._komsu, self._agirlik  # Döngüde hızlı erişim için yerel değişkenler
+        baslangic = self._indeks[baslangic_id]  # Başlangıç istasyonunun indeksi
+        hedef = self._indeks[hedef_id]  # Hedef istasyonunun indeksi
 
-        min_distance = {baslangic: 0}  # İstasyonlara ulaşım sürelerini saklayan sözlük (başlangıç 0)
-        pq = [(0, id(baslangic), baslangic, [baslangic])]  # Öncelikli kuyruk (süre, istasyon ID, istasyon, rota)
+        n = len(self._sira)  # İstasyon sayısı
+        min_distance = [float("inf")] * n  # İstasyonlara ulaşım sürelerini saklayan düz dizi
+        onceki = [-1] * n  # Her istasyonun öncülü
+        min_distance[baslangic] = 0  # Başlangıcın süresi 0
+        onceki[baslangic] = baslangic  # Başlangıç kendi öncülüdür
+        pq = [(0, baslangic)]  # Öncelikli kuyruk (süre, istasyon indeksi)
 
         while pq:  # Kuyruk boşalana kadar işle
-            current_sure, _, current_station, yol = heapq.heappop(pq)  # Kuyruktan en kısa süreli istasyonu al
+            current_sure, u = heapq.heappop(pq)  # Kuyruktan en kısa süreli istasyonu al
 
-            if current_station == hedef:  # Hedef istasyona ulaşıldıysa
-                return yol, current_sure  # Rota ve toplam süreyi döndür
+            if u == hedef:  # Hedef istasyona ulaşıldıysa
+                return self._yol_olustur(onceki, hedef), current_sure  # Rota ve toplam süreyi döndür
 
-            if current_sure > min_distance[current_station]:  # Eğer daha kısa bir rota bulunmuşsa devam etme
+            if current_sure > min_distance[u]:  # Eğer daha kısa bir rota bulunmuşsa devam etme
                 continue
 
-            for komsu, edge_sure in current_station.komsular:  # Komşu istasyonları kontrol et
-                yeni_sure = current_sure + edge_sure  # Yeni süreyi hesapla
-                if komsu not in min_distance or yeni_sure < min_distance[komsu]:  # Daha kısa bir süre bulunduysa
-                    min_distance[komsu] = yeni_sure  # Süreyi güncelle
-                    heapq.heappush(pq, (yeni_sure, id(komsu), komsu, yol + [komsu]))  # Öncelikli kuyruğa ekle
+            for e in range(ofset[u], ofset[u + 1]):  # Komşu istasyonları kontrol et
+                v = komsu[e]  # Komşunun indeksi
+                yeni_sure = current_sure + agirlik[e]  # Yeni süreyi hesapla
+                if yeni_sure < min_distance[v]:  # Daha kısa bir süre bulunduysa
+                    min_distance[v] = yeni_sure  # Süreyi güncelle
+                    onceki[v] = u  # Öncülü güncelle
+                    heapq.heappush(pq, (yeni_sure, v))  # Öncelikli kuyruğa ekle
 
         return None  # Hiçbir rota bulunamazsa None döndür
 
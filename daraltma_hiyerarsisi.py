@@ -0,0 +1,412 @@
+"""
+MetroAgi için daraltma hiyerarşisi (Contraction Hierarchies).
+
+Ön hesap çevrim dışı yapılır ve kaydet/yukle ile diske yazılıp okunur.
+Sorgular yalnızca "yukarı" kenarlar (sırası daha yüksek istasyonlara giden
+kenarlar) üzerinde çift yönlü Dijkstra çalıştırır ve kısayolları açarak
+normal bir Rota döndürür. set_delay bir kenarı değiştirdiğinde tüm ağ
+yeniden işlenmez; yalnızca etkilenen sıradan itibaren düğümler aynı
+sırayla yeniden daraltılır.
+"""
+import heapq
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from ek_ozellıklı_proje import DerlenmisAg, MetroAgi, Rota
+
+_SONSUZ = float("inf")
+_SIHIRLI = b"MTCH"
+_SURUM = 1
+_BASLIK = struct.Struct("<4sIBqq")
+
+Cift = Tuple[int, int]
+
+
+def _cift(a: int, b: int) -> Cift:
+    return (a, b) if a < b else (b, a)
+
+
+def _cift_agirliklari(ag: DerlenmisAg) -> Dict[Cift, float]:
+    """Her istasyon çifti için en ucuz (gecikmeli) kenar ağırlığı; döngüler atlanır."""
+    agirliklar: Dict[Cift, float] = {}
+    ofset, komsu, agirlik = ag.ofset, ag.komsu, ag.agirlik
+    for u in range(len(ag)):
+        for e in range(ofset[u], ofset[u + 1]):
+            v = komsu[e]
+            if u < v:
+                w = agirlik[e]
+                if w < agirliklar.get((u, v), _SONSUZ):
+                    agirliklar[(u, v)] = w
+    return agirliklar
+
+
+def _dizi_yaz(f, dizi: array) -> None:
+    if sys.byteorder != "little":
+        dizi = array(dizi.typecode, dizi)
+        dizi.byteswap()
+    f.write(struct.pack("<cq", dizi.typecode.encode(), len(dizi)))
+    f.write(dizi.tobytes())
+
+
+def _dizi_oku(f) -> array:
+    tip, uzunluk = struct.unpack("<cq", f.read(9))
+    dizi = array(tip.decode())
+    dizi.frombytes(f.read(uzunluk * dizi.itemsize))
+    if sys.byteorder != "little":
+        dizi.byteswap()
+    return dizi
+
+
+class DaraltmaHiyerarsisi:
+    def __init__(self, metro: MetroAgi, tanik_siniri: int = 60):
+        """
+        metro'nun güncel (gecikmeli) ağırlıklarıyla hiyerarşiyi kurar ve
+        metro.set_delay değişikliklerini dinlemeye başlar.
+        tanik_siniri: bir tanık aramasında kesinleştirilecek en fazla
+        istasyon; küçük değer ön hesabı hızlandırır, kısayol sayısını artırır.
+        """
+        self.metro = metro
+        self.tanik_siniri = tanik_siniri
+        self._ag = metro.compile()
+        n = len(self._ag)
+        self._ozgun = _cift_agirliklari(self._ag)
+        self.sira: List[int] = [-1] * n
+        self._yukari: List[List[Tuple[int, float, int]]] = [[] for _ in range(n)]
+        self._kisayollar: List[Tuple[int, int, float, int]] = []
+        self._tanik: Dict[Cift, int] = {}
+        self.son_yeniden_daraltilan = 0
+        self._olustur()
+        metro.gecikme_dinleyicisi_ekle(self._gecikme_degisti)
+
+    # --- Ön hesap ---
+
+    def _baslangic_komsulugu(self, r0: int) -> List[Dict[int, Tuple[float, int]]]:
+        """
+        r0 sırasındaki düğüm daraltılmadan hemen önceki kalan graf:
+        sırası >= r0 olan düğümler arasındaki özgün kenarlar ve sırası
+        r0'dan küçük düğümlerin daraltılmasıyla eklenmiş kısayollar.
+        Sıra henüz atanmamışken (hepsi -1) r0=-1 tüm özgün grafı verir.
+        """
+        sira = self.sira
+        kalan: List[Dict[int, Tuple[float, int]]] = [{} for _ in range(len(sira))]
+        for (a, b), w in self._ozgun.items():
+            if sira[a] >= r0 and sira[b] >= r0:
+                kalan[a][b] = kalan[b][a] = (w, -1)
+        for u, v, w, orta in self._kisayollar:
+            if sira[u] >= r0 and sira[v] >= r0:
+                mevcut = kalan[u].get(v)
+                if mevcut is None or w < mevcut[0]:
+                    kalan[u][v] = kalan[v][u] = (w, orta)
+        return kalan
+
+    def _olustur(self) -> None:
+        kalan = self._baslangic_komsulugu(-1)
+        silinen = [0] * len(kalan)
+        pq = [(self._oncelik(kalan, x, silinen), x) for x in range(len(kalan))]
+        heapq.heapify(pq)
+        r = 0
+        while pq:
+            _, x = heapq.heappop(pq)
+            oncelik = self._oncelik(kalan, x, silinen)
+            if pq and oncelik > pq[0][0]:
+                heapq.heappush(pq, (oncelik, x))
+                continue
+            self.sira[x] = r
+            for v in kalan[x]:
+                silinen[v] += 1
+            self._daralt(kalan, x, r)
+            r += 1
+
+    def _oncelik(self, kalan: List[Dict[int, Tuple[float, int]]], x: int, silinen: List[int]) -> int:
+        """Kenar farkı (eklenecek kısayol - kaldırılacak kenar) + daraltılmış komşu sayısı."""
+        return len(self._kisayollari_bul(kalan, x)) - len(kalan[x]) + silinen[x]
+
+    def _tanik_ara(
+        self,
+        kalan: List[Dict[int, Tuple[float, int]]],
+        kaynak: int,
+        haric: int,
+        sinir: float,
+        hedefler: Dict[int, float]
+    ) -> Tuple[Dict[int, float], Dict[int, int]]:
+        """haric düğümünü kullanmadan, sinir maliyetine ve tanik_siniri'na kadar yerel Dijkstra."""
+        mesafe = {kaynak: 0}
+        onceki = {kaynak: kaynak}
+        pq = [(0, kaynak)]
+        kalan_hedef = len(hedefler)
+        yerlesen = 0
+        while pq:
+            d, u = heapq.heappop(pq)
+            if d > mesafe[u]:
+                continue
+            if d > sinir:
+                break
+            if u in hedefler:
+                kalan_hedef -= 1
+                if not kalan_hedef:
+                    break
+            yerlesen += 1
+            if yerlesen > self.tanik_siniri:
+                break
+            for v, (w, _) in kalan[u].items():
+                if v == haric:
+                    continue
+                yeni = d + w
+                if yeni < mesafe.get(v, _SONSUZ):
+                    mesafe[v] = yeni
+                    onceki[v] = u
+                    heapq.heappush(pq, (yeni, v))
+        return mesafe, onceki
+
+    def _kisayollari_bul(
+        self,
+        kalan: List[Dict[int, Tuple[float, int]]],
+        x: int,
+        sira: Optional[int] = None
+    ) -> List[Tuple[int, int, float]]:
+        """
+        x daraltılırsa gereken kısayollar. sira verilirse bulunan her tanık
+        yolunun kenarları, bu sıradaki kararın dayandığı çiftler olarak kaydedilir.
+        """
+        komsular = list(kalan[x].items())
+        kisayollar = []
+        for i, (u, (wu, _)) in enumerate(komsular[:-1]):
+            hedefler = {v: wu + wv for v, (wv, _) in komsular[i + 1:]}
+            mesafe, onceki = self._tanik_ara(kalan, u, x, max(hedefler.values()), hedefler)
+            for v, w in hedefler.items():
+                if mesafe.get(v, _SONSUZ) > w:
+                    kisayollar.append((u, v, w))
+                elif sira is not None:
+                    while v != u:
+                        cift = _cift(v, onceki[v])
+                        if sira < self._tanik.get(cift, _SONSUZ):
+                            self._tanik[cift] = sira
+                        v = onceki[v]
+        return kisayollar
+
+    def _daralt(self, kalan: List[Dict[int, Tuple[float, int]]], x: int, sira: int) -> None:
+        kisayollar = self._kisayollari_bul(kalan, x, sira)
+        self._yukari[x] = [(v, w, orta) for v, (w, orta) in kalan[x].items()]
+        for v in kalan[x]:
+            del kalan[v][x]
+        kalan[x] = {}
+        for u, v, w in kisayollar:
+            mevcut = kalan[u].get(v)
+            if mevcut is None or w < mevcut[0]:
+                kalan[u][v] = kalan[v][u] = (w, x)
+                self._kisayollar.append((u, v, w, x))
+
+    # --- Kısmi yeniden daraltma ---
+
+    def _yeniden_daralt(self, r0: int) -> None:
+        """Sırası >= r0 olan düğümleri aynı sırayla yeniden daraltır; alttaki düzey korunur."""
+        sira = self.sira
+        self._kisayollar = [k for k in self._kisayollar if sira[k[3]] < r0]
+        self._tanik = {c: r for c, r in self._tanik.items() if r < r0}
+        kalan = self._baslangic_komsulugu(r0)
+        siradaki = sorted(range(len(sira)), key=sira.__getitem__)
+        for r in range(r0, len(sira)):
+            self._daralt(kalan, siradaki[r], r)
+
+    def _guncelle(self, degisenler: Dict[Cift, float]) -> int:
+        """
+        Değişen çift ağırlıklarını uygular. Azalışta yalnızca çiftin alt
+        ucundan itibaren, artışta ayrıca bu çifte (ya da onu içeren bir
+        kısayola) tanık olarak dayanmış en düşük sıradan itibaren yeniden
+        daraltılır. Yeniden daraltılan düğüm sayısını döndürür.
+        """
+        n = len(self.sira)
+        r0 = n
+        artanlar = set()
+        for cift, w in degisenler.items():
+            eski = self._ozgun.get(cift)
+            if eski is None or eski == w:
+                continue
+            self._ozgun[cift] = w
+            r0 = min(r0, self.sira[cift[0]], self.sira[cift[1]])
+            if w > eski:
+                artanlar.add(cift)
+        if artanlar:
+            for u, v, _, orta in self._kisayollar:
+                if _cift(u, orta) in artanlar or _cift(orta, v) in artanlar:
+                    artanlar.add(_cift(u, v))
+            for cift in artanlar:
+                r0 = min(r0, self._tanik.get(cift, n))
+        if r0 < n:
+            self._yeniden_daralt(r0)
+        self.son_yeniden_daraltilan = n - r0
+        return n - r0
+
+    def _gecikme_degisti(self, istasyon1_id: str, istasyon2_id: str, delay: int) -> None:
+        ag = self.metro.compile()
+        if ag is not self._ag:
+            return
+        i, j = ag.indeks.get(istasyon1_id), ag.indeks.get(istasyon2_id)
+        if i is None or j is None or i == j:
+            return
+        w = min(
+            (ag.agirlik[e] for e in range(ag.ofset[i], ag.ofset[i + 1]) if ag.komsu[e] == j),
+            default=None
+        )
+        if w is not None:
+            self._guncelle({_cift(i, j): w})
+
+    # --- Sorgu ---
+
+    def en_hizli_rota_bul(self, baslangic_id: str, hedef_id: str) -> Optional[Tuple[Rota, int]]:
+        """MetroAgi.en_hizli_rota_bul ile aynı sonucu yukarı-aşağı çift yönlü arama ile verir."""
+        if self.metro.compile() is not self._ag:
+            raise RuntimeError("Graf hiyerarşi kurulduktan sonra değişti; yeniden oluşturun.")
+        ag = self._ag
+        if baslangic_id not in ag.indeks or hedef_id not in ag.indeks:
+            return None
+        kaynak, hedef = ag.indeks[baslangic_id], ag.indeks[hedef_id]
+        if kaynak == hedef:
+            return Rota(ag, array("i", [kaynak]), 0), 0
+
+        yukari = self._yukari
+        mesafe = ({kaynak: 0}, {hedef: 0})
+        onceki = ({kaynak: (kaynak, -1)}, {hedef: (hedef, -1)})
+        kuyruklar = ([(0, kaynak)], [(0, hedef)])
+        en_iyi, bulusma = _SONSUZ, -1
+
+        while kuyruklar[0] or kuyruklar[1]:
+            if not kuyruklar[1] or (kuyruklar[0] and kuyruklar[0][0][0] <= kuyruklar[1][0][0]):
+                yon = 0
+            else:
+                yon = 1
+            pq, m_bu, o_bu = kuyruklar[yon], mesafe[yon], onceki[yon]
+            d, u = heapq.heappop(pq)
+            if d > m_bu[u]:
+                continue
+            if d >= en_iyi:
+                pq.clear()
+                continue
+            karsi = mesafe[1 - yon].get(u)
+            if karsi is not None and d + karsi < en_iyi:
+                en_iyi, bulusma = d + karsi, u
+            for v, w, orta in yukari[u]:
+                yeni = d + w
+                if yeni < m_bu.get(v, _SONSUZ):
+                    m_bu[v] = yeni
+                    o_bu[v] = (u, orta)
+                    heapq.heappush(pq, (yeni, v))
+
+        if bulusma == -1:
+            return None
+        return Rota(ag, self._yolu_ac(onceki, bulusma), en_iyi), en_iyi
+
+    def _orta(self, alt: int, ust: int) -> int:
+        for v, _, orta in self._yukari[alt]:
+            if v == ust:
+                return orta
+        raise KeyError((alt, ust))
+
+    def _yolu_ac(self, onceki: Tuple[Dict[int, Tuple[int, int]], Dict[int, Tuple[int, int]]], bulusma: int) -> array:
+        """Hiyerarşi yolundaki kısayolları özgün kenarlara açarak indeks yolunu kurar."""
+        kenarlar = []
+        v = bulusma
+        while onceki[0][v][0] != v:
+            u, orta = onceki[0][v]
+            kenarlar.append((u, v, orta))
+            v = u
+        kenarlar.reverse()
+        v = bulusma
+        while onceki[1][v][0] != v:
+            u, orta = onceki[1][v]
+            kenarlar.append((v, u, orta))
+            v = u
+
+        yol = array("i", [kenarlar[0][0]] if kenarlar else [bulusma])
+        for a, b, orta in kenarlar:
+            yigin = [(a, b, orta)]
+            while yigin:
+                a, b, orta = yigin.pop()
+                if orta == -1:
+                    yol.append(b)
+                else:
+                    yigin.append((orta, b, self._orta(orta, b)))
+                    yigin.append((a, orta, self._orta(orta, a)))
+        return yol
+
+    # --- Disk ---
+
+    def kaydet(self, dosya_yolu: str) -> None:
+        """Hiyerarşiyi, kısmi yeniden daraltma için gereken bilgilerle birlikte ikili dosyaya yazar."""
+        ag = self._ag
+        tip = "q" if ag.tamsayi else "d"
+        idler = [ist.idx.encode("utf-8") for ist in ag.istasyonlar]
+        id_ofset = array("q", [0])
+        for b in idler:
+            id_ofset.append(id_ofset[-1] + len(b))
+
+        yukari_ofset = array("q", [0])
+        yukari_hedef, yukari_agirlik, yukari_orta = array("i"), array(tip), array("i")
+        for kenarlar in self._yukari:
+            for v, w, orta in kenarlar:
+                yukari_hedef.append(v)
+                yukari_agirlik.append(w)
+                yukari_orta.append(orta)
+            yukari_ofset.append(len(yukari_hedef))
+
+        with open(dosya_yolu, "wb") as f:
+            f.write(_BASLIK.pack(_SIHIRLI, _SURUM, int(ag.tamsayi), len(ag), self.tanik_siniri))
+            _dizi_yaz(f, id_ofset)
+            f.write(b"".join(idler))
+            _dizi_yaz(f, array("i", self.sira))
+            for dizi in (yukari_ofset, yukari_hedef, yukari_agirlik, yukari_orta):
+                _dizi_yaz(f, dizi)
+            for i in range(4):
+                _dizi_yaz(f, array(tip if i == 2 else "i", (k[i] for k in self._kisayollar)))
+            _dizi_yaz(f, array("i", (c[0] for c in self._ozgun)))
+            _dizi_yaz(f, array("i", (c[1] for c in self._ozgun)))
+            _dizi_yaz(f, array(tip, self._ozgun.values()))
+            _dizi_yaz(f, array("i", (c[0] for c in self._tanik)))
+            _dizi_yaz(f, array("i", (c[1] for c in self._tanik)))
+            _dizi_yaz(f, array("i", self._tanik.values()))
+
+    @classmethod
+    def yukle(cls, dosya_yolu: str, metro: MetroAgi) -> "DaraltmaHiyerarsisi":
+        """
+        kaydet ile yazılmış hiyerarşiyi metro üzerine yükler. Dosyadan sonra
+        değişmiş gecikmeler kısmi yeniden daraltma ile hemen uygulanır.
+        """
+        with open(dosya_yolu, "rb") as f:
+            sihirli, surum, _, n, tanik_siniri = _BASLIK.unpack(f.read(_BASLIK.size))
+            if sihirli != _SIHIRLI or surum != _SURUM:
+                raise ValueError(f"{dosya_yolu} bir daraltma hiyerarşisi dosyası değil")
+            id_ofset = _dizi_oku(f)
+            blob = f.read(id_ofset[-1])
+            idler = [blob[id_ofset[i]:id_ofset[i + 1]].decode("utf-8") for i in range(n)]
+            sira = _dizi_oku(f)
+            yukari_ofset, yukari_hedef, yukari_agirlik, yukari_orta = (_dizi_oku(f) for _ in range(4))
+            k_u, k_v, k_w, k_orta = (_dizi_oku(f) for _ in range(4))
+            o_a, o_b, o_w = (_dizi_oku(f) for _ in range(3))
+            t_a, t_b, t_r = (_dizi_oku(f) for _ in range(3))
+
+        ag = metro.compile()
+        if idler != [ist.idx for ist in ag.istasyonlar]:
+            raise ValueError("Hiyerarşi dosyası bu metro ağının istasyonlarıyla eşleşmiyor")
+
+        ch = cls.__new__(cls)
+        ch.metro = metro
+        ch.tanik_siniri = tanik_siniri
+        ch._ag = ag
+        ch.sira = sira.tolist()
+        ch._yukari = [
+            list(zip(yukari_hedef[a:b], yukari_agirlik[a:b], yukari_orta[a:b]))
+            for a, b in zip(yukari_ofset, yukari_ofset[1:])
+        ]
+        ch._kisayollar = list(zip(k_u, k_v, k_w, k_orta))
+        ch._ozgun = dict(zip(zip(o_a, o_b), o_w))
+        ch._tanik = dict(zip(zip(t_a, t_b), t_r))
+        ch.son_yeniden_daraltilan = 0
+
+        guncel = _cift_agirliklari(ag)
+        if guncel.keys() != ch._ozgun.keys():
+            raise ValueError("Hiyerarşi dosyası bu metro ağının bağlantılarıyla eşleşmiyor")
+        ch._guncelle({c: w for c, w in guncel.items() if w != ch._ozgun[c]})
+        metro.gecikme_dinleyicisi_ekle(ch._gecikme_degisti)
+        return ch
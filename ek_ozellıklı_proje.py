@@ -1,8 +1,21 @@
-from collections import defaultdict, deque
+from array import array
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+import codecs
+import contextlib
+import functools
 import heapq
-from typing import Dict, List, Tuple, Optional
+from itertools import islice
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Tuple, Optional
 import math
 import json
+import os
+import mmap
+import re
+import struct
+import sys
+import time
 
 try:
     import tkinter as tk
@@ -14,115 +27,1954 @@ except ImportError:
 class Istasyon:
     def __init__(self, idx: str, ad: str, hat: str, x: float = 0.0, y: float = 0.0):
         """
-        x, y: Koordinatlar (Heuristik kullanım için)
+        x, y: Koordinatlar (en yakın istasyon ve kapıdan kapıya sorguları için)
         """
         self.idx = idx
         self.ad = ad
         self.hat = hat
         self.x = x
         self.y = y
-        self.komsular: List[Tuple['Istasyon', int]] = []
+        self._komsular: List[Tuple['Istasyon', int]] = []
+        # yukle_snapshot'ta ((istasyonlar, ofset, komsu, sure), u): komşu listesi
+        # eşlenmiş CSR dizilerinden ilk erişimde kurulur.
+        self._tembel_komsu: Optional[Tuple] = None
+
+    @property
+    def komsular(self) -> List[Tuple['Istasyon', int]]:
+        if self._tembel_komsu is not None:
+            (istasyonlar, ofset, komsu, sure), u = self._tembel_komsu
+            self._komsular = [(istasyonlar[komsu[e]], sure[e]) for e in range(ofset[u], ofset[u + 1])]
+            self._tembel_komsu = None
+        return self._komsular
+
+    @komsular.setter
+    def komsular(self, komsular: List[Tuple['Istasyon', int]]) -> None:
+        self._komsular = komsular
+        self._tembel_komsu = None
 
     def komsu_ekle(self, istasyon: 'Istasyon', sure: int):
         self.komsular.append((istasyon, sure))
 
-class MetroAgi:
+_SONSUZ = math.inf
+_KOVA_SINIRI = 1 << 12
+_YOK = object()
+
+# İkili anlık görüntü: başlık, ardından her biri 8 bayta hizalı bölümler.
+_SNAPSHOT_SIHIRLI = b"MTSN"
+_SNAPSHOT_SURUM = 1
+_SNAPSHOT_BASLIK = struct.Struct("<4sHHqqqqq")
+_SNAPSHOT_FLOAT_SURE = 1
+_SNAPSHOT_FLOAT_GECIKME = 2
+
+def _hizala(boyut: int) -> int:
+    return (boyut + 7) & ~7
+
+def _kucuk_endian(dizi) -> bytes:
+    """Diziyi little-endian ham bayt olarak döndürür."""
+    if sys.byteorder == "little":
+        return bytes(dizi)
+    kopya = array(getattr(dizi, "typecode", None) or dizi.format, dizi)
+    kopya.byteswap()
+    return kopya.tobytes()
+
+def _eslemeyi_kapat(mm: mmap.mmap, gorunumler: List[memoryview]) -> None:
+    """Eşlemeye bağlı memoryview'ları bırakıp mmap'i kapatır (tersten: önce türetilenler)."""
+    for gorunum in reversed(gorunumler):
+        gorunum.release()
+    mm.close()
+
+_BOSLUK = re.compile(r"[ \t\r\n]*")
+
+class _JsonAkisOkuyucu:
+    """
+    En üst düzey JSON nesnesindeki dizileri öğe öğe okur. Dosya parça parça
+    çözülür; tamponda en fazla bir parça ve yarım kalmış bir öğe tutulur.
+    """
+    def __init__(self, f, parca_boyutu: int = 1 << 16):
+        self.f = f
+        self.parca_boyutu = parca_boyutu
+        self.okunan_bayt = 0
+        self.tampon = ""
+        self.konum = 0
+        self.bitti = False
+        self._metin = codecs.getincrementaldecoder("utf-8")()
+        self._cozucu = json.JSONDecoder()
+
+    def _doldur(self) -> bool:
+        if self.bitti:
+            return False
+        parca = self.f.read(self.parca_boyutu)
+        self.okunan_bayt += len(parca)
+        self.bitti = not parca
+        self.tampon = self.tampon[self.konum:] + self._metin.decode(parca, final=self.bitti)
+        self.konum = 0
+        return True
+
+    def _karakter(self) -> str:
+        """Boşlukları atlar ve sıradaki karakteri tüketmeden döndürür; dosya sonunda ''."""
+        while True:
+            k = self.konum = _BOSLUK.match(self.tampon, self.konum).end()
+            if k < len(self.tampon):
+                return self.tampon[k]
+            if not self._doldur():
+                return ""
+
+    def _bekle(self, karakter: str) -> None:
+        if self._karakter() != karakter:
+            raise ValueError(f"JSON ayrıştırılamadı: {self.okunan_bayt}. bayt civarında '{karakter}' bekleniyordu")
+        self.konum += 1
+
+    def _deger(self) -> Any:
+        self._karakter()
+        while True:
+            try:
+                deger, son = self._cozucu.raw_decode(self.tampon, self.konum)
+            except json.JSONDecodeError:
+                if self._doldur():
+                    continue
+                raise
+            # Tampon sonunda biten bir sayı sonraki parçada devam ediyor olabilir.
+            if son == len(self.tampon) and self._doldur():
+                continue
+            self.konum = son
+            return deger
+
+    def diziler(self) -> Iterable[Tuple[str, Any]]:
+        """(anahtar, öğe) çiftleri üretir; dizi olmayan değerler atlanır."""
+        self._bekle("{")
+        if self._karakter() == "}":
+            return
+        while True:
+            anahtar = self._deger()
+            self._bekle(":")
+            if self._karakter() == "[":
+                self.konum += 1
+                if self._karakter() == "]":
+                    self.konum += 1
+                else:
+                    while True:
+                        yield anahtar, self._deger()
+                        if self._karakter() != ",":
+                            break
+                        self.konum += 1
+                    self._bekle("]")
+            else:
+                self._deger()
+            if self._karakter() != ",":
+                break
+            self.konum += 1
+        self._bekle("}")
+
+
+class _IkiliYigin:
+    """heapq tabanlı öncelik kuyruğu; her türlü (float dahil) maliyetle çalışır."""
+    __slots__ = ("_pq",)
+
     def __init__(self):
+        self._pq: List[Tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._pq)
+
+    def ekle(self, maliyet: float, dugum: int) -> None:
+        heapq.heappush(self._pq, (maliyet, dugum))
+
+    def cikar(self) -> Tuple[float, int]:
+        return heapq.heappop(self._pq)
+
+    def en_kucuk(self) -> float:
+        return self._pq[0][0]
+
+class _KovaKuyrugu:
+    """
+    Dial kova kuyruğu: tamsayı ve monoton artan (Dijkstra) anahtarlar için.
+    Kuyruktaki anahtarlar her an [en_kucuk, en_kucuk + C] aralığında
+    kaldığından C+1 dairesel kova yeterlidir; ekle O(1), cikar amortize O(1).
+    """
+    __slots__ = ("_kovalar", "_boyut", "_en_kucuk", "_adet")
+
+    def __init__(self, en_buyuk_adim: int):
+        self._boyut = en_buyuk_adim + 1
+        self._kovalar: List[List[int]] = [[] for _ in range(self._boyut)]
+        self._en_kucuk = _SONSUZ
+        self._adet = 0
+
+    def __len__(self) -> int:
+        return self._adet
+
+    def ekle(self, maliyet: int, dugum: int) -> None:
+        if maliyet < self._en_kucuk:
+            self._en_kucuk = maliyet
+        self._kovalar[maliyet % self._boyut].append(dugum)
+        self._adet += 1
+
+    def cikar(self) -> Tuple[int, int]:
+        kovalar, boyut = self._kovalar, self._boyut
+        m = self._en_kucuk
+        while not kovalar[m % boyut]:
+            m += 1
+        self._en_kucuk = m
+        self._adet -= 1
+        return m, kovalar[m % boyut].pop()
+
+    def en_kucuk(self) -> int:
+        kovalar, boyut = self._kovalar, self._boyut
+        m = self._en_kucuk
+        while not kovalar[m % boyut]:
+            m += 1
+        self._en_kucuk = m
+        return m
+
+class AramaIstatistigi:
+    """
+    Tek bir sorgunun sayaçları. İzleme açıkken derlenmiş ağa bağlanır.
+    Arama döngüleri yalnızca bir istasyon yerleştiğinde bildirir; kuyruğa
+    eklemeler sayaçlı kuyruk sarmalayıcılarından gelir, böylece izleme
+    kapalıyken iç döngüye ek kontrol girmez. gevsetme yerleşen
+    istasyonlardan denenen kenar sayısı, gecikme_okuma bunlardan gecikmesi
+    olan (ağırlığı set_delay ile değişmiş) kenar sayısı, bayat ise
+    çıkarılan - yerleşendir. Landmark tablosu, ızgara ve derleme gibi
+    tembel ön hesaplar sayaçlara girmez; süreleri hazirlik_sn'de, sure_sn
+    dışında raporlanır.
+    """
+    __slots__ = (
+        "yontem", "yerlesen", "eklenen", "cikarilan", "gevsetme", "gecikme_okuma",
+        "sure_sn", "hazirlik_sn", "onbellekten", "_ofset", "_gecikmeli", "_istasyonlar",
+        "_yerlesme_kancalari", "_gevsetme_kancalari"
+    )
+
+    def __init__(self, yontem: str, yerlesme_kancalari: List[Callable] = (), gevsetme_kancalari: List[Callable] = ()):
+        self.yontem = yontem
+        self.yerlesen = 0
+        self.eklenen = 0
+        self.cikarilan = 0
+        self.gevsetme = 0
+        self.gecikme_okuma = 0
+        self.sure_sn = 0.0
+        self.hazirlik_sn = 0.0
+        self.onbellekten = False
+        self._ofset = None
+        self._gecikmeli = None
+        self._istasyonlar = None
+        self._yerlesme_kancalari = yerlesme_kancalari
+        self._gevsetme_kancalari = gevsetme_kancalari
+
+    @property
+    def bayat(self) -> int:
+        return self.cikarilan - self.yerlesen
+
+    def yerlesti(self, u: int, maliyet: Optional[float]) -> None:
+        self.yerlesen += 1
+        self.gevsetme += self._ofset[u + 1] - self._ofset[u]
+        self.gecikme_okuma += self._gecikmeli[u]
+        for kanca in self._yerlesme_kancalari:
+            kanca(self.yontem, self._istasyonlar[u], maliyet)
+
+    def itildi(self, v: int, maliyet: float) -> None:
+        """Etiketi iyileşip kuyruğa giren istasyon (kaynaklar dahil); maliyet kuyruk anahtarıdır."""
+        self.eklenen += 1
+        for kanca in self._gevsetme_kancalari:
+            kanca(self.yontem, self._istasyonlar[v], maliyet)
+
+    def sozluk(self) -> Dict[str, Any]:
+        return {
+            "yontem": self.yontem,
+            "yerlesen": self.yerlesen,
+            "eklenen": self.eklenen,
+            "cikarilan": self.cikarilan,
+            "bayat": self.bayat,
+            "gevsetme": self.gevsetme,
+            "gecikme_okuma": self.gecikme_okuma,
+            "sure_sn": self.sure_sn,
+            "hazirlik_sn": self.hazirlik_sn,
+            "onbellekten": self.onbellekten,
+        }
+
+class _SayacliKuyruk:
+    """Öncelik kuyruğu sarmalayıcısı; yalnızca izleme açıkken kullanılır."""
+    __slots__ = ("_pq", "_istatistik")
+
+    def __init__(self, pq, istatistik: AramaIstatistigi):
+        self._pq = pq
+        self._istatistik = istatistik
+
+    def __len__(self) -> int:
+        return len(self._pq)
+
+    def ekle(self, maliyet, dugum: int) -> None:
+        self._istatistik.itildi(dugum, maliyet)
+        self._pq.ekle(maliyet, dugum)
+
+    def cikar(self):
+        self._istatistik.cikarilan += 1
+        return self._pq.cikar()
+
+    def en_kucuk(self):
+        return self._pq.en_kucuk()
+
+class _SayacliDeque(deque):
+    """BFS kuyruğu; yalnızca izleme açıkken kullanılır. Anahtar bilinmediğinden kancalara None gider."""
+    def __init__(self, ogeler: Iterable[int], istatistik: AramaIstatistigi):
+        super().__init__()
+        self.istatistik = istatistik
+        for oge in ogeler:
+            self.append(oge)
+
+    def append(self, oge: int) -> None:
+        self.istatistik.itildi(oge, None)
+        super().append(oge)
+
+    def popleft(self) -> int:
+        self.istatistik.cikarilan += 1
+        return super().popleft()
+
+class DerlenmisAg:
+    """
+    MetroAgi grafının dondurulmuş (CSR) hâli.
+    İstasyonlar 0..n-1 tamsayı indeksleriyle numaralanır; i. istasyonun
+    komşuları komsu[ofset[i]:ofset[i+1]] aralığındadır.
+    sure kenarın kendi süresini, agirlik ise set_delay gecikmesi eklenmiş
+    süreyi tutar; aramalar yalnızca agirlik dizisini okur. gecikmeli[u],
+    u'dan çıkan gecikmeli kenar sayısıdır (izleme sayaçları için).
+    izleyici None değilse aramalar sayaçlarını ona bildirir (bkz. AramaIstatistigi).
+    """
+    def __init__(self, istasyonlar: List[Istasyon], delays: Dict[Tuple[str, str], int]):
+        indeks = {ist.idx: i for i, ist in enumerate(istasyonlar)}
+        ofset = array("i", [0])
+        komsu = array("i")
+        sureler = []
+        for ist in istasyonlar:
+            for k, sure in ist.komsular:
+                komsu.append(indeks[k.idx])
+                sureler.append(sure)
+            ofset.append(len(komsu))
+        tip = "i" if all(isinstance(s, int) for s in sureler) else "d"
+        self._kur(istasyonlar, ofset, komsu, array(tip, sureler), delays)
+
+    @classmethod
+    def dizilerden(
+        cls,
+        istasyonlar: List[Istasyon],
+        ofset: Sequence,
+        komsu: Sequence,
+        sure: Sequence,
+        delays: Dict[Tuple[str, str], int]
+    ) -> "DerlenmisAg":
+        """
+        Hazır CSR dizilerinden derlenmiş ağ kurar. ofset/komsu/sure
+        kopyalanmaz; bellek eşlemeli bir dosyanın memoryview'ları olabilir.
+        """
+        ag = cls.__new__(cls)
+        ag._kur(istasyonlar, ofset, komsu, sure, delays)
+        return ag
+
+    def _kur(self, istasyonlar, ofset, komsu, sure, delays) -> None:
+        self.istasyonlar = istasyonlar
+        self.indeks: Dict[str, int] = {ist.idx: i for i, ist in enumerate(istasyonlar)}
+        self.ofset = ofset
+        self.komsu = komsu
+        self.sure = sure
+
+        tip = getattr(sure, "typecode", None) or sure.format
+        self.tamsayi = tip != "d"
+        self.agirlik = array(tip)
+        self.agirlik.frombytes(memoryview(sure).cast("B"))
+
+        hat_numaralari: Dict[str, int] = {}
+        self.hat_no = array("i", (hat_numaralari.setdefault(ist.hat, len(hat_numaralari)) for ist in istasyonlar))
+        self.gecikmeli = array("i", bytes(4 * len(istasyonlar)))
+
+        self.en_kucuk_agirlik = min(self.agirlik, default=0)
+        self.en_buyuk_agirlik = max(self.agirlik, default=0)
+        self.izleyici: Optional[AramaIstatistigi] = None
+        for (s1, s2), gecikme in delays.items():
+            self.gecikme_uygula(s1, s2, gecikme)
+
+    def __len__(self) -> int:
+        return len(self.istasyonlar)
+
+    def gecikme_uygula(self, istasyon1_id: str, istasyon2_id: str, gecikme: int) -> None:
+        """
+        İki istasyon arasındaki tüm kenar kopyalarının ağırlığını
+        sure + gecikme olarak günceller (yeniden derleme gerekmez).
+        """
+        i = self.indeks.get(istasyon1_id)
+        j = self.indeks.get(istasyon2_id)
+        if i is None or j is None:
+            return
+        if self.tamsayi and not isinstance(gecikme, int):
+            self.tamsayi = False
+            self.sure = array("d", self.sure)
+            self.agirlik = array("d", self.agirlik)
+        ofset, komsu, sure, agirlik = self.ofset, self.komsu, self.sure, self.agirlik
+        for u, v in ((i, j), (j, i)):
+            for e in range(ofset[u], ofset[u + 1]):
+                if komsu[e] == v:
+                    self.gecikmeli[u] += (gecikme != 0) - (agirlik[e] != sure[e])
+                    agirlik[e] = sure[e] + gecikme
+                    self.en_kucuk_agirlik = min(self.en_kucuk_agirlik, agirlik[e])
+                    self.en_buyuk_agirlik = max(self.en_buyuk_agirlik, agirlik[e])
+
+    def kuyruk_olustur(self, tur: str, aktarma_cezasi: float = 0, tamsayi: bool = True):
+        """
+        tur == "dial" ise ve tüm kenar maliyetleri küçük, negatif olmayan
+        tamsayılarsa kova kuyruğu; aksi hâlde heapq kuyruğu döndürür.
+        tamsayi=False (ör. float sezgisel kullanılıyorsa) heapq'ya zorlar.
+        """
+        if tur == "dial" and tamsayi and self.tamsayi and isinstance(aktarma_cezasi, int):
+            en_buyuk = self.en_buyuk_agirlik + max(aktarma_cezasi, 0)
+            if self.en_kucuk_agirlik >= 0 and en_buyuk <= _KOVA_SINIRI:
+                pq = _KovaKuyrugu(en_buyuk)
+                return pq if self.izleyici is None else _SayacliKuyruk(pq, self.izleyici)
+        pq = _IkiliYigin()
+        return pq if self.izleyici is None else _SayacliKuyruk(pq, self.izleyici)
+
+    @staticmethod
+    def _yol(onceki: List[int], hedef: int) -> array:
+        yol = array("i", [hedef])
+        while onceki[yol[-1]] != yol[-1]:
+            yol.append(onceki[yol[-1]])
+        yol.reverse()
+        return yol
+
+    def yol_suresi(self, yol: Sequence) -> int:
+        """Ardışık indeksler arasındaki en ucuz kenarların (gecikmeli) toplam süresi."""
+        ofset, komsu, agirlik = self.ofset, self.komsu, self.agirlik
+        toplam = 0
+        for u, v in zip(yol, yol[1:]):
+            toplam += min(agirlik[e] for e in range(ofset[u], ofset[u + 1]) if komsu[e] == v)
+        return toplam
+
+    def genislik_agaci(self, kaynak: int) -> Tuple[List[float], List[int]]:
+        """Kaynaktan tüm istasyonlara BFS. (kenar sayısı, onceki) dizilerini döndürür."""
+        ofset, komsu = self.ofset, self.komsu
+        n = len(self.istasyonlar)
+        mesafe = [_SONSUZ] * n
+        onceki = [-1] * n
+        mesafe[kaynak] = 0
+        onceki[kaynak] = kaynak
+        izleyici = self.izleyici
+        kuyruk = deque([kaynak]) if izleyici is None else _SayacliDeque([kaynak], izleyici)
+
+        while kuyruk:
+            u = kuyruk.popleft()
+            if izleyici is not None:
+                izleyici.yerlesti(u, mesafe[u])
+            du = mesafe[u] + 1
+            for e in range(ofset[u], ofset[u + 1]):
+                v = komsu[e]
+                if onceki[v] == -1:
+                    onceki[v] = u
+                    mesafe[v] = du
+                    kuyruk.append(v)
+
+        return mesafe, onceki
+
+    def genislik_oncelikli(self, kaynak: int, hedef: int) -> Optional[array]:
+        """BFS; en az kenarlı yolun indeks listesini döndürür."""
+        ofset, komsu = self.ofset, self.komsu
+        onceki = [-1] * len(self.istasyonlar)
+        onceki[kaynak] = kaynak
+        izleyici = self.izleyici
+        kuyruk = deque([kaynak]) if izleyici is None else _SayacliDeque([kaynak], izleyici)
+
+        while kuyruk:
+            u = kuyruk.popleft()
+            if izleyici is not None:
+                izleyici.yerlesti(u, None)
+            if u == hedef:
+                return self._yol(onceki, hedef)
+            for e in range(ofset[u], ofset[u + 1]):
+                v = komsu[e]
+                if onceki[v] == -1:
+                    onceki[v] = u
+                    kuyruk.append(v)
+
+        return None
+
+    def en_kisa_yol_agaci(
+        self,
+        kaynak: int,
+        aktarma_cezasi: int = 0,
+        kuyruk: str = "heapq"
+    ) -> Tuple[List[float], List[int]]:
+        """
+        Kaynaktan tüm istasyonlara Dijkstra. (mesafe, onceki) dizilerini
+        döndürür; ulaşılamayan istasyonlarda mesafe inf, onceki -1'dir.
+        """
+        ofset, komsu, agirlik, hat_no = self.ofset, self.komsu, self.agirlik, self.hat_no
+        n = len(self.istasyonlar)
+        mesafe = [_SONSUZ] * n
+        onceki = [-1] * n
+        mesafe[kaynak] = 0
+        onceki[kaynak] = kaynak
+        pq = self.kuyruk_olustur(kuyruk, aktarma_cezasi)
+        ekle, cikar = pq.ekle, pq.cikar
+        ekle(0, kaynak)
+        izleyici = self.izleyici
+
+        while pq:
+            d, u = cikar()
+            if d > mesafe[u]:
+                continue
+            if izleyici is not None:
+                izleyici.yerlesti(u, d)
+            hat_u = hat_no[u]
+            for e in range(ofset[u], ofset[u + 1]):
+                v = komsu[e]
+                yeni = d + agirlik[e]
+                if aktarma_cezasi and hat_no[v] != hat_u:
+                    yeni += aktarma_cezasi
+                if yeni < mesafe[v]:
+                    mesafe[v] = yeni
+                    onceki[v] = u
+                    ekle(yeni, v)
+
+        return mesafe, onceki
+
+    def sinirli_agac(
+        self,
+        kaynaklar: Dict[int, float],
+        butce: float,
+        aktarma_cezasi: int = 0
+    ) -> Tuple[Dict[int, float], Dict[int, int]]:
+        """
+        Çok kaynaklı, bütçeli Dijkstra: her kaynak kendi başlangıç
+        maliyetiyle kuyruğa girer, maliyeti butce'yi aşan istasyon
+        yerleşmez. Dizi yerine yalnızca ulaşılan istasyonları tutan
+        (mesafe, onceki) sözlüklerini döndürür; iş ulaşılan bölgeyle sınırlıdır.
+        """
+        ofset, komsu, agirlik, hat_no = self.ofset, self.komsu, self.agirlik, self.hat_no
+        mesafe: Dict[int, float] = {}
+        onceki: Dict[int, int] = {}
+        pq = []
+        for s, d in kaynaklar.items():
+            if d <= butce and d < mesafe.get(s, _SONSUZ):
+                mesafe[s] = d
+                onceki[s] = s
+                pq.append((d, s))
+        heapq.heapify(pq)
+        izleyici = self.izleyici
+        if izleyici is not None:
+            for d, s in pq:
+                izleyici.itildi(s, d)
+
+        while pq:
+            d, u = heapq.heappop(pq)
+            if izleyici is not None:
+                izleyici.cikarilan += 1
+            if d > mesafe[u]:
+                continue
+            if izleyici is not None:
+                izleyici.yerlesti(u, d)
+            hat_u = hat_no[u]
+            for e in range(ofset[u], ofset[u + 1]):
+                v = komsu[e]
+                yeni = d + agirlik[e]
+                if aktarma_cezasi and hat_no[v] != hat_u:
+                    yeni += aktarma_cezasi
+                if yeni <= butce and yeni < mesafe.get(v, _SONSUZ):
+                    mesafe[v] = yeni
+                    onceki[v] = u
+                    heapq.heappush(pq, (yeni, v))
+                    if izleyici is not None:
+                        izleyici.itildi(v, yeni)
+
+        return mesafe, onceki
+
+    def _sapma_yolu(
+        self,
+        kaynak: int,
+        hedef: int,
+        h: Sequence[float],
+        yasak: bytearray,
+        yasak_kenarlar: set,
+        aktarma_cezasi: int
+    ) -> Optional[Tuple[List[int], float]]:
+        """
+        Yasak istasyon ve (u, v) kenarlarını atlayan A*. h hedeften geri
+        en kısa yol ağacının mesafeleridir; kenar silmek mesafeyi yalnızca
+        artırdığından kabul edilebilir ve tutarlıdır. Durumlar sözlükte
+        tutulur, böylece her sapma araması yalnızca dokunduğu kadar iş yapar.
+        """
+        ofset, komsu, agirlik, hat_no = self.ofset, self.komsu, self.agirlik, self.hat_no
+        mesafe = {kaynak: 0}
+        onceki = {kaynak: kaynak}
+        kapali = set()
+        pq = [(h[kaynak], kaynak)]
+
+        while pq:
+            _, u = heapq.heappop(pq)
+            if u in kapali:
+                continue
+            kapali.add(u)
+            d = mesafe[u]
+            if u == hedef:
+                return list(self._yol(onceki, hedef)), d
+            hat_u = hat_no[u]
+            for e in range(ofset[u], ofset[u + 1]):
+                v = komsu[e]
+                if yasak[v] or v in kapali or h[v] == _SONSUZ or (u, v) in yasak_kenarlar:
+                    continue
+                yeni = d + agirlik[e]
+                if aktarma_cezasi and hat_no[v] != hat_u:
+                    yeni += aktarma_cezasi
+                if yeni < mesafe.get(v, _SONSUZ):
+                    mesafe[v] = yeni
+                    onceki[v] = u
+                    heapq.heappush(pq, (yeni + h[v], v))
+
+        return None
+
+    def k_en_kisa_yollar(
+        self,
+        kaynak: int,
+        hedef: int,
+        aktarma_cezasi: int = 0
+    ) -> Iterator[Tuple[array, float]]:
+        """
+        Yen algoritmasıyla döngüsüz yolları artan maliyet sırasıyla üretir.
+        Hedeften bir kez kurulan en kısa yol ağacı tüm sapma aramalarında
+        A* sezgiseli olarak paylaşılır; hedefe ulaşamayan istasyonlara hiç
+        girilmez. Lawler iyileştirmesiyle bir yol yalnızca kendi sapma
+        noktasından sonrasında dallandırılır, kök maliyetleri yol başına bir
+        kez hesaplanan önek toplamlarından okunur.
+        """
+        h, _ = self.en_kisa_yol_agaci(hedef, aktarma_cezasi)
+        if h[kaynak] == _SONSUZ:
+            return
+        ofset, komsu, agirlik, hat_no = self.ofset, self.komsu, self.agirlik, self.hat_no
+        yasak = bytearray(len(self.istasyonlar))
+        bulunan: List[List[int]] = []
+        ilk, maliyet = self._sapma_yolu(kaynak, hedef, h, yasak, set(), aktarma_cezasi)
+        adaylar = [(maliyet, 0, ilk, 0)]
+        gorulen = {tuple(ilk)}
+        sayac = 1
+
+        while adaylar:
+            maliyet, _, yol, sapma = heapq.heappop(adaylar)
+            yield array("i", yol), maliyet
+            bulunan.append(yol)
+
+            onek = [0]
+            for u, v in zip(yol, yol[1:]):
+                w = min(agirlik[e] for e in range(ofset[u], ofset[u + 1]) if komsu[e] == v)
+                onek.append(onek[-1] + w + (aktarma_cezasi if aktarma_cezasi and hat_no[u] != hat_no[v] else 0))
+
+            for i in range(sapma, len(yol) - 1):
+                kok = yol[:i + 1]
+                yasak_kenarlar = {(p[i], p[i + 1]) for p in bulunan if len(p) > i + 1 and p[:i + 1] == kok}
+                for u in kok[:-1]:
+                    yasak[u] = 1
+                sonuc = self._sapma_yolu(yol[i], hedef, h, yasak, yasak_kenarlar, aktarma_cezasi)
+                for u in kok[:-1]:
+                    yasak[u] = 0
+                if sonuc is None:
+                    continue
+                dal, dal_maliyeti = sonuc
+                yeni = kok[:-1] + dal
+                if tuple(yeni) not in gorulen:
+                    gorulen.add(tuple(yeni))
+                    heapq.heappush(adaylar, (onek[i] + dal_maliyeti, sayac, yeni, i))
+                    sayac += 1
+
+    def cok_uclu_yol(
+        self,
+        kaynaklar: Dict[int, float],
+        hedefler: Dict[int, float],
+        aktarma_cezasi: int = 0
+    ) -> Optional[Tuple[array, float]]:
+        """
+        Çok kaynaklı, çok hedefli Dijkstra. kaynaklar ve hedefler
+        istasyon -> giriş/çıkış maliyeti sözlükleridir; en iyi
+        (giriş + ağ + çıkış) toplamı bulunduğunda, kuyruğun tepesi bu
+        toplama ulaşınca durulur. (indeks yolu, toplam maliyet) döndürür.
+        """
+        ofset, komsu, agirlik, hat_no = self.ofset, self.komsu, self.agirlik, self.hat_no
+        mesafe: Dict[int, float] = {}
+        onceki: Dict[int, int] = {}
+        pq = []
+        for s, d in kaynaklar.items():
+            if d < mesafe.get(s, _SONSUZ):
+                mesafe[s] = d
+                onceki[s] = s
+                pq.append((d, s))
+        heapq.heapify(pq)
+        en_iyi, bitis = _SONSUZ, -1
+        izleyici = self.izleyici
+        if izleyici is not None:
+            for d, s in pq:
+                izleyici.itildi(s, d)
+
+        while pq:
+            d, u = heapq.heappop(pq)
+            if izleyici is not None:
+                izleyici.cikarilan += 1
+            if d >= en_iyi:
+                break
+            if d > mesafe[u]:
+                continue
+            if izleyici is not None:
+                izleyici.yerlesti(u, d)
+            if u in hedefler and d + hedefler[u] < en_iyi:
+                en_iyi, bitis = d + hedefler[u], u
+            hat_u = hat_no[u]
+            for e in range(ofset[u], ofset[u + 1]):
+                v = komsu[e]
+                yeni = d + agirlik[e]
+                if aktarma_cezasi and hat_no[v] != hat_u:
+                    yeni += aktarma_cezasi
+                if yeni < mesafe.get(v, _SONSUZ):
+                    mesafe[v] = yeni
+                    onceki[v] = u
+                    heapq.heappush(pq, (yeni, v))
+                    if izleyici is not None:
+                        izleyici.itildi(v, yeni)
+
+        if bitis == -1:
+            return None
+        return self._yol(onceki, bitis), en_iyi
+
+    def en_kisa_yol(
+        self,
+        kaynak: int,
+        hedef: int,
+        aktarma_cezasi: int = 0,
+        sezgisel: Optional[Callable[[int], float]] = None,
+        kuyruk: str = "heapq"
+    ) -> Optional[Tuple[array, int]]:
+        """
+        Dijkstra (sezgisel verilirse A*). Hat değişen her kenara
+        aktarma_cezasi eklenir. (indeks yolu, toplam maliyet) döndürür.
+        kuyruk: "heapq" veya "dial" (bkz. kuyruk_olustur).
+        """
+        ofset, komsu, agirlik, hat_no = self.ofset, self.komsu, self.agirlik, self.hat_no
+        n = len(self.istasyonlar)
+        mesafe = [_SONSUZ] * n
+        onceki = [-1] * n
+        kapali = bytearray(n)
+        mesafe[kaynak] = 0
+        onceki[kaynak] = kaynak
+        pq = self.kuyruk_olustur(kuyruk, aktarma_cezasi, tamsayi=sezgisel is None)
+        ekle, cikar = pq.ekle, pq.cikar
+        ekle(0, kaynak)
+        izleyici = self.izleyici
+
+        while pq:
+            _, u = cikar()
+            if kapali[u]:
+                continue
+            kapali[u] = 1
+            d = mesafe[u]
+            if izleyici is not None:
+                izleyici.yerlesti(u, d)
+            if u == hedef:
+                return self._yol(onceki, hedef), d
+
+            hat_u = hat_no[u]
+            for e in range(ofset[u], ofset[u + 1]):
+                v = komsu[e]
+                if kapali[v]:
+                    continue
+                yeni = d + agirlik[e]
+                if aktarma_cezasi and hat_no[v] != hat_u:
+                    yeni += aktarma_cezasi
+                if yeni < mesafe[v]:
+                    mesafe[v] = yeni
+                    onceki[v] = u
+                    ekle(yeni + sezgisel(v) if sezgisel else yeni, v)
+
+        return None
+
+    def en_az_aktarma_yolu(self, kaynak: int, hedef: int) -> Optional[Tuple[array, int, float]]:
+        """
+        (aktarma sayısı, dakika) sözlük sırasında en iyi yolu bulur. Hat
+        değiştiren kenar 1, aynı hattaki kenar 0 aktarma sayılır. Aktarma
+        katmanları 0-1 BFS'teki gibi sırayla işlenir: 0 kenarlar aynı
+        katmanda kalır, 1 kenarlar sonraki katmanın sınırına eklenir; katman
+        içinde dakikaya göre heapq ile ilerlenir. Her istasyon bir kez
+        yerleşir. (indeks yolu, aktarma sayısı, dakika) döndürür.
+        """
+        ofset, komsu, agirlik, hat_no = self.ofset, self.komsu, self.agirlik, self.hat_no
+        n = len(self.istasyonlar)
+        aktarma = [_SONSUZ] * n
+        mesafe = [_SONSUZ] * n
+        onceki = [-1] * n
+        kapali = bytearray(n)
+        aktarma[kaynak] = 0
+        mesafe[kaynak] = 0
+        onceki[kaynak] = kaynak
+        katman = 0
+        sinir = [kaynak]
+        izleyici = self.izleyici
+        if izleyici is not None:
+            izleyici.itildi(kaynak, 0)
+
+        while sinir:
+            pq = [(mesafe[v], v) for v in sinir if not kapali[v] and aktarma[v] == katman]
+            heapq.heapify(pq)
+            sinir = []
+            while pq:
+                d, u = heapq.heappop(pq)
+                if izleyici is not None:
+                    izleyici.cikarilan += 1
+                if kapali[u] or d > mesafe[u]:
+                    continue
+                kapali[u] = 1
+                if izleyici is not None:
+                    izleyici.yerlesti(u, d)
+                if u == hedef:
+                    return self._yol(onceki, hedef), katman, d
+
+                hat_u = hat_no[u]
+                for e in range(ofset[u], ofset[u + 1]):
+                    v = komsu[e]
+                    if kapali[v]:
+                        continue
+                    yeni = d + agirlik[e]
+                    if hat_no[v] == hat_u:
+                        if aktarma[v] > katman or yeni < mesafe[v]:
+                            aktarma[v] = katman
+                            mesafe[v] = yeni
+                            onceki[v] = u
+                            heapq.heappush(pq, (yeni, v))
+                            if izleyici is not None:
+                                izleyici.itildi(v, yeni)
+                    elif aktarma[v] > katman + 1 or (aktarma[v] == katman + 1 and yeni < mesafe[v]):
+                        aktarma[v] = katman + 1
+                        mesafe[v] = yeni
+                        onceki[v] = u
+                        sinir.append(v)
+                        if izleyici is not None:
+                            izleyici.itildi(v, yeni)
+            katman += 1
+
+        return None
+
+    def pareto_yollar(
+        self,
+        kaynak: int,
+        hedef: int,
+        etiket_siniri: int = 8
+    ) -> List[Tuple[array, float, int]]:
+        """
+        (dakika, aktarma sayısı) için Pareto cephesini tek aramada bulur.
+        Etiketler dakika sırasıyla yerleşir; bu yüzden bir istasyonda yeni
+        yerleşen etiket ancak oradaki en az aktarmadan daha azıyla
+        baskılanmaz ve baskınlık kontrolü O(1)'dir. Hedefte yerleşmiş bir
+        etiketi geçemeyen etiketler de budanır. Bir istasyonda en fazla
+        etiket_siniri etiket yerleşir; sınıra takılan aramada cephe eksik
+        kalabilir. Dakikası artan (aktarması azalan) sırada
+        (indeks yolu, dakika, aktarma) listesi döndürür.
+        """
+        ofset, komsu, agirlik, hat_no = self.ofset, self.komsu, self.agirlik, self.hat_no
+        n = len(self.istasyonlar)
+        en_az_aktarma = [_SONSUZ] * n
+        yerlesen = [0] * n
+        e_dugum = array("i", [kaynak])
+        e_onceki = array("i", [-1])
+        pq = [(0, 0, 0)]
+        cephe: List[Tuple[int, float, int]] = []
+        izleyici = self.izleyici
+        if izleyici is not None:
+            izleyici.itildi(kaynak, 0)
+
+        while pq:
+            d, a, etiket = heapq.heappop(pq)
+            u = e_dugum[etiket]
+            if izleyici is not None:
+                izleyici.cikarilan += 1
+            if a >= en_az_aktarma[u] or a >= en_az_aktarma[hedef] or yerlesen[u] >= etiket_siniri:
+                continue
+            en_az_aktarma[u] = a
+            yerlesen[u] += 1
+            if izleyici is not None:
+                izleyici.yerlesti(u, d)
+            if u == hedef:
+                cephe.append((etiket, d, a))
+                if a == 0:
+                    break
+                continue
+
+            hat_u = hat_no[u]
+            for e in range(ofset[u], ofset[u + 1]):
+                v = komsu[e]
+                a_v = a + (hat_no[v] != hat_u)
+                if a_v >= en_az_aktarma[v] or a_v >= en_az_aktarma[hedef] or yerlesen[v] >= etiket_siniri:
+                    continue
+                e_dugum.append(v)
+                e_onceki.append(etiket)
+                heapq.heappush(pq, (d + agirlik[e], a_v, len(e_dugum) - 1))
+                if izleyici is not None:
+                    izleyici.itildi(v, d + agirlik[e])
+
+        sonuc = []
+        for etiket, d, a in cephe:
+            yol = array("i")
+            while etiket != -1:
+                yol.append(e_dugum[etiket])
+                etiket = e_onceki[etiket]
+            yol.reverse()
+            sonuc.append((yol, d, a))
+        return sonuc
+
+    def cift_yonlu_genislik(self, kaynak: int, hedef: int) -> Optional[Tuple[array, Tuple[int, int]]]:
+        """
+        Çift yönlü BFS. Her adımda küçük olan sınır bir seviye bütünüyle
+        genişletilir; o seviyede karşı tarafa değen ilk kenarlar arasından
+        en kısa birleşim seçilir. (indeks yolu, (ileri, geri) yerleşen) döndürür.
+        """
+        if kaynak == hedef:
+            return array("i", [kaynak]), (0, 0)
+        ofset, komsu = self.ofset, self.komsu
+        n = len(self.istasyonlar)
+        mesafe = ([-1] * n, [-1] * n)
+        onceki = ([-1] * n, [-1] * n)
+        mesafe[0][kaynak] = mesafe[1][hedef] = 0
+        onceki[0][kaynak] = kaynak
+        onceki[1][hedef] = hedef
+        sinir = ([kaynak], [hedef])
+        yerlesen = [0, 0]
+        izleyici = self.izleyici
+        if izleyici is not None:
+            izleyici.itildi(kaynak, 0)
+            izleyici.itildi(hedef, 0)
+
+        while sinir[0] and sinir[1]:
+            yon = 0 if len(sinir[0]) <= len(sinir[1]) else 1
+            m_bu, m_karsi, o_bu = mesafe[yon], mesafe[1 - yon], onceki[yon]
+            sonraki = []
+            en_iyi, bulusma = -1, None
+            for u in sinir[yon]:
+                yerlesen[yon] += 1
+                du = m_bu[u] + 1
+                if izleyici is not None:
+                    izleyici.cikarilan += 1
+                    izleyici.yerlesti(u, du - 1)
+                for e in range(ofset[u], ofset[u + 1]):
+                    v = komsu[e]
+                    if m_karsi[v] != -1 and (en_iyi == -1 or du + m_karsi[v] < en_iyi):
+                        en_iyi, bulusma = du + m_karsi[v], (u, v)
+                    if m_bu[v] == -1:
+                        m_bu[v] = du
+                        o_bu[v] = u
+                        sonraki.append(v)
+                        if izleyici is not None:
+                            izleyici.itildi(v, du)
+            if bulusma is not None:
+                a, b = bulusma if yon == 0 else bulusma[::-1]
+                return self._birlesik_yol(onceki, a, b), (yerlesen[0], yerlesen[1])
+            sinir = (sonraki, sinir[1]) if yon == 0 else (sinir[0], sonraki)
+
+        return None
+
+    def cift_yonlu_en_kisa_yol(
+        self,
+        kaynak: int,
+        hedef: int,
+        aktarma_cezasi: int = 0,
+        kuyruk: str = "heapq"
+    ) -> Optional[Tuple[array, int, Tuple[int, int]]]:
+        """
+        Çift yönlü Dijkstra. Graf yönsüz ve gecikmeler/cezalar simetrik
+        olduğundan geri arama aynı CSR dizileri üzerinde çalışır.
+        En iyi birleşim maliyeti mu iken iki kuyruğun tepe anahtarları
+        toplamı mu'ya ulaşınca durulur; bu, sonucu tek yönlü Dijkstra ile
+        aynı maliyete sabitler. (indeks yolu, maliyet, (ileri, geri) yerleşen) döndürür.
+        """
+        if kaynak == hedef:
+            return array("i", [kaynak]), 0, (0, 0)
+        ofset, komsu, agirlik, hat_no = self.ofset, self.komsu, self.agirlik, self.hat_no
+        n = len(self.istasyonlar)
+        mesafe = ([_SONSUZ] * n, [_SONSUZ] * n)
+        onceki = ([-1] * n, [-1] * n)
+        kapali = (bytearray(n), bytearray(n))
+        kuyruklar = (self.kuyruk_olustur(kuyruk, aktarma_cezasi), self.kuyruk_olustur(kuyruk, aktarma_cezasi))
+        for yon, dugum in ((0, kaynak), (1, hedef)):
+            mesafe[yon][dugum] = 0
+            onceki[yon][dugum] = dugum
+            kuyruklar[yon].ekle(0, dugum)
+        yerlesen = [0, 0]
+        mu, bulusma = _SONSUZ, None
+        izleyici = self.izleyici
+
+        while kuyruklar[0] and kuyruklar[1]:
+            tepe_i, tepe_g = kuyruklar[0].en_kucuk(), kuyruklar[1].en_kucuk()
+            if tepe_i + tepe_g >= mu:
+                break
+            yon = 0 if tepe_i <= tepe_g else 1
+            m_bu, m_karsi, o_bu, k_bu, pq = mesafe[yon], mesafe[1 - yon], onceki[yon], kapali[yon], kuyruklar[yon]
+            _, u = pq.cikar()
+            if k_bu[u]:
+                continue
+            k_bu[u] = 1
+            yerlesen[yon] += 1
+            d = m_bu[u]
+            if izleyici is not None:
+                izleyici.yerlesti(u, d)
+            hat_u = hat_no[u]
+            for e in range(ofset[u], ofset[u + 1]):
+                v = komsu[e]
+                yeni = d + agirlik[e]
+                if aktarma_cezasi and hat_no[v] != hat_u:
+                    yeni += aktarma_cezasi
+                if yeni < m_bu[v]:
+                    m_bu[v] = yeni
+                    o_bu[v] = u
+                    pq.ekle(yeni, v)
+                if yeni + m_karsi[v] < mu:
+                    mu = yeni + m_karsi[v]
+                    bulusma = (u, v) if yon == 0 else (v, u)
+
+        if bulusma is None:
+            return None
+        return self._birlesik_yol(onceki, *bulusma), mu, (yerlesen[0], yerlesen[1])
+
+    def _birlesik_yol(self, onceki: Tuple[List[int], List[int]], ileri_uc: int, geri_uc: int) -> array:
+        """İleri ağaçta kaynak..ileri_uc ve geri ağaçta geri_uc..hedef zincirlerini birleştirir."""
+        yol = self._yol(onceki[0], ileri_uc)
+        onceki_g = onceki[1]
+        v = geri_uc
+        while True:
+            yol.append(v)
+            if onceki_g[v] == v:
+                return yol
+            v = onceki_g[v]
+
+class LandmarkTablosu:
+    """
+    ALT (A*, Landmark, Triangle inequality) sezgiseli için ön hesap.
+    Her landmark L için d(L, v) tablosu tutulur; üçgen eşitsizliğinden
+    |d(L, t) - d(L, v)| <= d(v, t) olduğundan en büyük fark kabul edilebilir
+    (ve tutarlı) bir alt sınırdır. Farklı bileşenlerdeki istasyonlarda
+    fark inf olur, bu da hedefe ulaşamayan dalları budar.
+    """
+    def __init__(self, ag: DerlenmisAg, sayi: int = 4):
+        self.landmarklar: List[int] = []
+        self.tablolar: List[array] = []
+        n = len(ag)
+        if not n:
+            return
+        en_yakin = [_SONSUZ] * n
+        aday = max(range(n), key=ag.en_kisa_yol_agaci(0)[0].__getitem__, default=0)
+        while len(self.landmarklar) < min(sayi, n):
+            mesafe, _ = ag.en_kisa_yol_agaci(aday)
+            self.landmarklar.append(aday)
+            self.tablolar.append(array("d", mesafe))
+            for v in range(n):
+                if mesafe[v] < en_yakin[v]:
+                    en_yakin[v] = mesafe[v]
+            for L in self.landmarklar:
+                en_yakin[L] = -1
+            aday = max(range(n), key=en_yakin.__getitem__)
+            if en_yakin[aday] <= 0:
+                break
+
+    def sezgisel(self, hedef: int) -> Callable[[int], float]:
+        """Verilen hedef için h(v) = max_L |d(L, t) - d(L, v)| fonksiyonu."""
+        ciftler = [(tablo, tablo[hedef]) for tablo in self.tablolar]
+
+        def h(v: int) -> float:
+            en_buyuk = 0
+            for tablo, dt in ciftler:
+                fark = dt - tablo[v]
+                if fark < 0:
+                    fark = -fark
+                if fark > en_buyuk:
+                    en_buyuk = fark
+            return en_buyuk
+
+        return h
+
+class IzgaraIndeksi:
+    """
+    İstasyon koordinatları üzerinde düzgün ızgara. Hücre kenarı, hücre
+    başına ortalama iki istasyon düşecek şekilde seçilir. En yakın k
+    sorgusu sorgu hücresinden halka halka genişler; r. halka bittiğinde
+    görülmemiş istasyonlar en az (r * kenar) uzakta olduğundan k. aday bu
+    sınırın içindeyse durulur.
+    """
+    def __init__(self, istasyonlar: List[Istasyon]):
+        self.istasyonlar = istasyonlar
+        self.hucreler: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        if not istasyonlar:
+            self.kenar = 1.0
+            return
+        xs = [ist.x for ist in istasyonlar]
+        ys = [ist.y for ist in istasyonlar]
+        alan = (max(xs) - min(xs)) * (max(ys) - min(ys))
+        self.kenar = math.sqrt(2 * alan / len(istasyonlar)) if alan > 0 else max(
+            max(xs) - min(xs), max(ys) - min(ys), 1.0
+        )
+        for i, ist in enumerate(istasyonlar):
+            self.hucreler[self._hucre(ist.x, ist.y)].append(i)
+        self.sinir = (
+            min(c[0] for c in self.hucreler), min(c[1] for c in self.hucreler),
+            max(c[0] for c in self.hucreler), max(c[1] for c in self.hucreler)
+        )
+
+    def _hucre(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.kenar), math.floor(y / self.kenar)
+
+    def en_yakin(self, x: float, y: float, k: int = 1) -> List[Tuple[int, float]]:
+        """(x, y)'ye en yakın k istasyonun (indeks, Öklid uzaklığı) listesi, yakından uzağa."""
+        if not self.hucreler or k <= 0:
+            return []
+        cx, cy = self._hucre(x, y)
+        x0, y0, x1, y1 = self.sinir
+        en_buyuk_halka = max(abs(cx - x0), abs(cx - x1), abs(cy - y0), abs(cy - y1))
+        # Dolu hücrelerin sınır kutusuna Chebyshev uzaklığından önceki halkalar
+        # boştur; halkalar da kutuya kırpılır. Böylece ağın çok uzağındaki bir
+        # nokta için iş uzaklıkla değil kutunun boyutuyla orantılı kalır.
+        ilk_halka = max(x0 - cx, cx - x1, y0 - cy, cy - y1, 0)
+        istasyonlar, hucreler = self.istasyonlar, self.hucreler
+        adaylar: List[Tuple[float, int]] = []
+        for r in range(ilk_halka, en_buyuk_halka + 1):
+            for hx in range(max(cx - r, x0), min(cx + r, x1) + 1):
+                if abs(hx - cx) == r:
+                    hy_ler = range(max(cy - r, y0), min(cy + r, y1) + 1)
+                else:
+                    hy_ler = [hy for hy in (cy - r, cy + r) if y0 <= hy <= y1]
+                for hy in hy_ler:
+                    for i in hucreler.get((hx, hy), ()):
+                        ist = istasyonlar[i]
+                        adaylar.append((math.hypot(ist.x - x, ist.y - y), i))
+            if len(adaylar) >= k:
+                adaylar = heapq.nsmallest(k, adaylar)
+                if adaylar[-1][0] <= r * self.kenar:
+                    break
+        return [(i, d) for d, i in sorted(adaylar)[:k]]
+
+class Rota(Sequence):
+    """
+    Bir aramanın sonucu olan tembel rota.
+    Yalnızca istasyon indekslerini tutar; Istasyon listesi ilk kez
+    gezinildiğinde kurulur. len() ve toplam_sure listeyi kurmadan okunur,
+    bu yüzden liste bekleyen kodlar (print_route, GUI) aynen çalışır.
+    yerlesen: çift yönlü aramalarda (ileri, geri) yönlerin kaç istasyonu
+    kesinleştirdiği; tek yönlü aramalarda None.
+    """
+    __slots__ = ("_ag", "indeksler", "toplam_sure", "yerlesen", "_liste")
+
+    def __init__(
+        self,
+        ag: DerlenmisAg,
+        indeksler: array,
+        toplam_sure: Optional[int] = None,
+        yerlesen: Optional[Tuple[int, int]] = None
+    ):
+        self._ag = ag
+        self.indeksler = indeksler
+        self.toplam_sure = ag.yol_suresi(indeksler) if toplam_sure is None else toplam_sure
+        self.yerlesen = yerlesen
+        self._liste: Optional[List[Istasyon]] = None
+
+    def _istasyonlar(self) -> List[Istasyon]:
+        if self._liste is None:
+            istasyonlar = self._ag.istasyonlar
+            self._liste = [istasyonlar[i] for i in self.indeksler]
+        return self._liste
+
+    @property
+    def istasyon_sayisi(self) -> int:
+        return len(self.indeksler)
+
+    def __len__(self) -> int:
+        return len(self.indeksler)
+
+    def __getitem__(self, i):
+        return self._istasyonlar()[i]
+
+    def __iter__(self):
+        return iter(self._istasyonlar())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Rota, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        ilk, son = self._ag.istasyonlar[self.indeksler[0]], self._ag.istasyonlar[self.indeksler[-1]]
+        return f"Rota({ilk.idx} -> {son.idx}, {len(self)} istasyon, {self.toplam_sure} dk)"
+
+class EnKisaYolAgaci:
+    """
+    Bir kaynaktan tüm istasyonlara en kısa yol ağacı (mesafe ve öncül dizileri).
+    Aynı kaynaktan her hedef sorgusu tek bir dizi okuması ve yol kurulumudur.
+    tur "bfs" ise mesafe kenar sayısı, "dijkstra" ise (cezalı) maliyettir.
+    """
+    __slots__ = ("ag", "kaynak", "tur", "aktarma_cezasi", "mesafe", "onceki")
+
+    def __init__(
+        self,
+        ag: DerlenmisAg,
+        kaynak: int,
+        tur: str = "dijkstra",
+        aktarma_cezasi: int = 0,
+        kuyruk: str = "heapq"
+    ):
+        self.ag = ag
+        self.kaynak = kaynak
+        self.tur = tur
+        self.aktarma_cezasi = aktarma_cezasi
+        if tur == "bfs":
+            self.mesafe, self.onceki = ag.genislik_agaci(kaynak)
+        else:
+            self.mesafe, self.onceki = ag.en_kisa_yol_agaci(kaynak, aktarma_cezasi, kuyruk)
+
+    def rota(self, hedef: int) -> Optional[Tuple[Rota, float]]:
+        if self.onceki[hedef] == -1:
+            return None
+        maliyet = self.mesafe[hedef]
+        sure = maliyet if self.tur == "dijkstra" and not self.aktarma_cezasi else None
+        return Rota(self.ag, DerlenmisAg._yol(self.onceki, hedef), sure), maliyet
+
+    def onar(self, ciftler: Iterable[Tuple[int, int]]) -> int:
+        """
+        ag.agirlik'ta ağırlığı değişmiş (u, v) çiftlerine göre ağacı yerinde
+        onarır (dinamik SSSP). Ağırlığı artan bir ağaç kenarının altındaki alt
+        ağaç sıfırlanır ve sınırındaki komşulardan yeniden bağlanır; azalan
+        kenarlar iyileştirme tohumu olur. Tek bir Dijkstra geçişi yalnızca
+        değişen istasyonlara dokunur. Mesafesi ya da öncülü değişen
+        istasyon sayısını döndürür.
+        """
+        if self.tur != "dijkstra":
+            return 0
+        ag = self.ag
+        ofset, komsu, agirlik, hat_no = ag.ofset, ag.komsu, ag.agirlik, ag.hat_no
+        mesafe, onceki, ceza = self.mesafe, self.onceki, self.aktarma_cezasi
+
+        def kenar(u: int, v: int) -> float:
+            w = min((agirlik[e] for e in range(ofset[u], ofset[u + 1]) if komsu[e] == v), default=_SONSUZ)
+            return w + ceza if ceza and hat_no[u] != hat_no[v] else w
+
+        # 1) Artık tutarlı olmayan ağaç kenarlarının alt ağaçlarını sıfırla.
+        sifirlanan = bytearray(len(mesafe))
+        kokler = []
+        iyilesen = []
+        for a, b in ciftler:
+            w = kenar(a, b)
+            for u, v in ((a, b), (b, a)):
+                if onceki[v] == u and v != self.kaynak and mesafe[u] + w > mesafe[v]:
+                    kokler.append(v)
+                elif mesafe[u] + w < mesafe[v]:
+                    iyilesen.append((u, v))
+        alt_agac = []
+        for kok in kokler:
+            if sifirlanan[kok]:
+                continue
+            sifirlanan[kok] = 1
+            yigin = [kok]
+            while yigin:
+                u = yigin.pop()
+                alt_agac.append(u)
+                for e in range(ofset[u], ofset[u + 1]):
+                    v = komsu[e]
+                    if onceki[v] == u and not sifirlanan[v] and v != u:
+                        sifirlanan[v] = 1
+                        yigin.append(v)
+        for v in alt_agac:
+            mesafe[v] = _SONSUZ
+            onceki[v] = -1
+
+        # 2) Tohumlar: sıfırlanan düğümlerin sınır komşuları ve azalan kenarlar.
+        dokunulan = bytearray(len(mesafe))
+        pq = []
+        for v in alt_agac:
+            dokunulan[v] = 1
+            hat_v = hat_no[v]
+            for e in range(ofset[v], ofset[v + 1]):
+                u = komsu[e]
+                if sifirlanan[u] or onceki[u] == -1:
+                    continue
+                yeni = mesafe[u] + agirlik[e]
+                if ceza and hat_no[u] != hat_v:
+                    yeni += ceza
+                if yeni < mesafe[v]:
+                    mesafe[v] = yeni
+                    onceki[v] = u
+            if mesafe[v] < _SONSUZ:
+                pq.append((mesafe[v], v))
+        for u, v in iyilesen:
+            yeni = mesafe[u] + kenar(u, v)
+            if yeni < mesafe[v]:
+                mesafe[v] = yeni
+                onceki[v] = u
+                dokunulan[v] = 1
+                pq.append((yeni, v))
+        heapq.heapify(pq)
+
+        # 3) Yalnızca iyileşen istasyonlar üzerinden yayılım.
+        while pq:
+            d, u = heapq.heappop(pq)
+            if d > mesafe[u]:
+                continue
+            hat_u = hat_no[u]
+            for e in range(ofset[u], ofset[u + 1]):
+                v = komsu[e]
+                yeni = d + agirlik[e]
+                if ceza and hat_no[v] != hat_u:
+                    yeni += ceza
+                if yeni < mesafe[v]:
+                    mesafe[v] = yeni
+                    onceki[v] = u
+                    dokunulan[v] = 1
+                    heapq.heappush(pq, (yeni, v))
+
+        return sum(dokunulan)
+
+class RotaOnbellegi:
+    """
+    Sınırlı boyutlu LRU önbellek; isabet, ıska ve çıkarma sayılarını tutar.
+    kapasite 0 ise hiçbir şey saklanmaz.
+    """
+    def __init__(self, kapasite: int = 1024):
+        self.kapasite = kapasite
+        self._veri: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.isabet = 0
+        self.iska = 0
+        self.cikarilan = 0
+
+    def __len__(self) -> int:
+        return len(self._veri)
+
+    def al(self, anahtar: Hashable, varsayilan: Any = None) -> Any:
+        try:
+            deger = self._veri[anahtar]
+        except KeyError:
+            self.iska += 1
+            return varsayilan
+        self._veri.move_to_end(anahtar)
+        self.isabet += 1
+        return deger
+
+    def koy(self, anahtar: Hashable, deger: Any) -> None:
+        if self.kapasite <= 0:
+            return
+        self._veri[anahtar] = deger
+        self._veri.move_to_end(anahtar)
+        while len(self._veri) > self.kapasite:
+            self._veri.popitem(last=False)
+            self.cikarilan += 1
+
+    def temizle(self) -> None:
+        self._veri.clear()
+
+    def degerler(self) -> List[Any]:
+        """Saklı değerler (LRU sırasını ve sayaçları değiştirmeden)."""
+        return list(self._veri.values())
+
+    def istatistikler(self) -> Dict[str, int]:
+        return {
+            "isabet": self.isabet,
+            "iska": self.iska,
+            "cikarilan": self.cikarilan,
+            "boyut": len(self._veri),
+            "kapasite": self.kapasite,
+        }
+
+class MetrikKaydi:
+    """
+    İzlenen sorguların yöntem başına toplanmış sayaçları ve son sorguların
+    AramaIstatistigi kayıtları. json() ve prometheus() ile dışa aktarılır.
+    """
+    SAYACLAR = ("yerlesen", "eklenen", "cikarilan", "bayat", "gevsetme", "gecikme_okuma")
+
+    def __init__(self, son_sorgu_sayisi: int = 100):
+        self.yontemler: Dict[str, Dict[str, float]] = {}
+        self.son_sorgular: deque = deque(maxlen=son_sorgu_sayisi)
+
+    def kaydet(self, istatistik: AramaIstatistigi) -> None:
+        toplam = self.yontemler.get(istatistik.yontem)
+        if toplam is None:
+            toplam = self.yontemler[istatistik.yontem] = dict.fromkeys(
+                ("sorgu", "onbellekten") + self.SAYACLAR + ("sure_sn", "hazirlik_sn", "en_uzun_sure_sn"), 0
+            )
+        toplam["sorgu"] += 1
+        toplam["onbellekten"] += istatistik.onbellekten
+        for sayac in self.SAYACLAR:
+            toplam[sayac] += getattr(istatistik, sayac)
+        toplam["sure_sn"] += istatistik.sure_sn
+        toplam["hazirlik_sn"] += istatistik.hazirlik_sn
+        toplam["en_uzun_sure_sn"] = max(toplam["en_uzun_sure_sn"], istatistik.sure_sn)
+        self.son_sorgular.append(istatistik)
+
+    def temizle(self) -> None:
+        self.yontemler.clear()
+        self.son_sorgular.clear()
+
+    def json(self) -> str:
+        return json.dumps({
+            "yontemler": self.yontemler,
+            "son_sorgular": [ist.sozluk() for ist in self.son_sorgular],
+        }, ensure_ascii=False, indent=2)
+
+    def prometheus(self, onek: str = "metro_arama") -> str:
+        """Prometheus metin biçimi: sayaçlar *_total, en uzun süre gauge."""
+        satirlar = []
+        for ad in ("sorgu", "onbellekten") + self.SAYACLAR + ("sure_sn", "hazirlik_sn"):
+            metrik = f"{onek}_{ad.replace('_sn', '_saniye')}_total"
+            satirlar.append(f"# TYPE {metrik} counter")
+            for yontem, toplam in sorted(self.yontemler.items()):
+                satirlar.append(f'{metrik}{{yontem="{yontem}"}} {toplam[ad]}')
+        metrik = f"{onek}_en_uzun_sure_saniye"
+        satirlar.append(f"# TYPE {metrik} gauge")
+        for yontem, toplam in sorted(self.yontemler.items()):
+            satirlar.append(f'{metrik}{{yontem="{yontem}"}} {toplam["en_uzun_sure_sn"]}')
+        return "\n".join(satirlar) + "\n"
+
+# Süre matrisi işçi süreçlerinin derlenmiş ağı ve sorgu ayarları; havuz
+# başlatılırken bir kez kurulur, görevler yalnızca kaynak indekslerini taşır.
+_ISCI_AGI: Optional[DerlenmisAg] = None
+_ISCI_AYARLARI: Tuple = ()
+
+def _matris_isci_baslat(
+    istasyonlar: List[Istasyon],
+    ofset: array,
+    komsu: array,
+    agirlik: array,
+    hedefler: array,
+    aktarma_cezasi: float,
+    kuyruk: str,
+    tip: str
+) -> None:
+    global _ISCI_AGI, _ISCI_AYARLARI
+    _ISCI_AGI = DerlenmisAg.dizilerden(istasyonlar, ofset, komsu, agirlik, {})
+    _ISCI_AYARLARI = (hedefler, aktarma_cezasi, kuyruk, tip)
+
+def _sure_satirlari(
+    ag: DerlenmisAg,
+    kaynaklar: Sequence,
+    hedefler: Sequence,
+    aktarma_cezasi: float,
+    kuyruk: str,
+    tip: str
+) -> bytes:
+    """Her kaynak için tek bir Dijkstra ağacından hedef sütunlarını okur; ulaşılamayan -1."""
+    satirlar = array(tip)
+    for kaynak in kaynaklar:
+        mesafe, _ = ag.en_kisa_yol_agaci(kaynak, aktarma_cezasi, kuyruk)
+        satirlar.extend(-1 if mesafe[h] == _SONSUZ else mesafe[h] for h in hedefler)
+    return satirlar.tobytes()
+
+def _isci_sure_satirlari(kaynaklar: array) -> bytes:
+    return _sure_satirlari(_ISCI_AGI, kaynaklar, *_ISCI_AYARLARI)
+
+def _izlenen(yontem: Callable) -> Callable:
+    """
+    İzleme açıksa sorguyu bir AramaIstatistigi ile sarar; kapalıyken
+    maliyeti sorgu başına tek bir None kontrolüdür. İç içe çağrılar dıştaki
+    sorgunun istatistiğine yazılır.
+    """
+    @functools.wraps(yontem)
+    def sarmal(self, *args, **kwargs):
+        if self._izleme is None or self._etkin_istatistik is not None:
+            return yontem(self, *args, **kwargs)
+        return self._izleyerek(yontem, args, kwargs)
+    return sarmal
+
+class MetroAgi:
+    def __init__(self, oncelik_kuyrugu: str = "heapq", onbellek_boyutu: int = 1024, agac_onbellek_boyutu: int = 32):
+        """
+        oncelik_kuyrugu: "heapq" ya da "dial". "dial", dakika cinsinden
+        tamsayı ağırlıklar için kova kuyruğu kullanır; tamsayı olmayan
+        maliyet (float süre/ceza ya da sezgisel) görüldüğünde heapq'ya düşer.
+        onbellek_boyutu / agac_onbellek_boyutu: rota sonuçları ve kaynak
+        başına en kısa yol ağaçları için LRU kapasiteleri (0: kapalı).
+        """
+        if oncelik_kuyrugu not in ("heapq", "dial"):
+            raise ValueError(f"Bilinmeyen öncelik kuyruğu: {oncelik_kuyrugu}")
+        self.oncelik_kuyrugu = oncelik_kuyrugu
         self.istasyonlar: Dict[str, Istasyon] = {}
         self.hatlar: Dict[str, List[Istasyon]] = defaultdict(list)
         self.delays: Dict[Tuple[str, str], int] = {}
+        self.landmark_sayisi = 4
+        self._derlenmis: Optional[DerlenmisAg] = None
+        self._landmarklar: Optional[LandmarkTablosu] = None
+        self._izgara: Optional[IzgaraIndeksi] = None
+        # yukle_snapshot'ın bellek eşlemesi: (mmap, memoryview'lar, eşlenmiş DerlenmisAg).
+        self._snapshot: Optional[Tuple[mmap.mmap, List[memoryview], DerlenmisAg]] = None
+        self._gecikme_dinleyicileri: List[Callable[[str, str, int], None]] = []
+
+        # Graf sürümü: istasyon_ekle, baglanti_ekle ve set_delay her çağrıda artırır.
+        self.surum = 0
+        # Yapı sürümü yalnızca istasyon/bağlantı eklenince artar; gecikmeler
+        # saklı ağaçları geçersiz kılmaz, set_delay onları yerinde onarır.
+        self._yapi_surumu = 0
+        self.rota_onbellegi = RotaOnbellegi(onbellek_boyutu)
+        self.agac_onbellegi = RotaOnbellegi(agac_onbellek_boyutu)
+        # Aynı kaynaktan bu kadar ıska olunca kaynağın tüm ağacı hesaplanıp saklanır.
+        self.agac_esigi = 2
+        self._kaynak_iskalari: Dict[Tuple, int] = defaultdict(int)
+        self._onbellek_surumu = 0
+        self._agac_yapi_surumu = 0
+
+        # İzleme varsayılan olarak kapalıdır (bkz. izleme_ac).
+        self._izleme: Optional[MetrikKaydi] = None
+        self._izleme_kancalari: Dict[str, List[Callable]] = {"yerlesme": [], "gevsetme": []}
+        self._etkin_istatistik: Optional[AramaIstatistigi] = None
+        self.son_istatistik: Optional[AramaIstatistigi] = None
 
     def istasyon_ekle(self, idx: str, ad: str, hat: str, x: float = 0.0, y: float = 0.0) -> None:
         if idx not in self.istasyonlar:
             istasyon = Istasyon(idx, ad, hat, x, y)
             self.istasyonlar[idx] = istasyon
             self.hatlar[hat].append(istasyon)
+            self._graf_degisti()
 
     def baglanti_ekle(self, istasyon1_id: str, istasyon2_id: str, sure: int) -> None:
         istasyon1 = self.istasyonlar[istasyon1_id]
         istasyon2 = self.istasyonlar[istasyon2_id]
         istasyon1.komsu_ekle(istasyon2, sure)
         istasyon2.komsu_ekle(istasyon1, sure)
+        self._graf_degisti()
 
-    def en_az_aktarma_bul(self, baslangic_id: str, hedef_id: str) -> Optional[List[Istasyon]]:
-        """BFS kullanarak en az aktarmalı (en kısa kenar sayılı) rotayı bulur."""
+    def _graf_degisti(self) -> None:
+        self.snapshot_kapat()
+        self.surum += 1
+        self._yapi_surumu += 1
+        self._derlenmis = None
+        self._landmarklar = None
+        self._izgara = None
+
+    def _onbellekten(self, anahtar: Tuple) -> Any:
+        """
+        Sürüm değiştiyse rota önbelleğini, yapı değiştiyse ağaçları da
+        boşaltır; anahtar yoksa _YOK döndürür.
+        """
+        if self._onbellek_surumu != self.surum:
+            self.rota_onbellegi.temizle()
+            self._onbellek_surumu = self.surum
+        if self._agac_yapi_surumu != self._yapi_surumu:
+            self.agac_onbellegi.temizle()
+            self._kaynak_iskalari.clear()
+            self._agac_yapi_surumu = self._yapi_surumu
+        return self.rota_onbellegi.al(anahtar, _YOK)
+
+    def _agactan(self, tur: str, baslangic_id: str, hedef_id: str, aktarma_cezasi: int = 0) -> Any:
+        """
+        Kaynağın saklı ağacından cevap verir. Ağaç yoksa ve bu kaynaktan
+        agac_esigi kadar ıska olduysa ağacı hesaplayıp saklar; aksi hâlde _YOK.
+        """
+        anahtar = (tur, baslangic_id, aktarma_cezasi, self._yapi_surumu)
+        agac = self.agac_onbellegi.al(anahtar)
+        if agac is None:
+            self._kaynak_iskalari[anahtar] += 1
+            if self.agac_esigi is None or self._kaynak_iskalari[anahtar] < self.agac_esigi:
+                return _YOK
+            ag = self.compile()
+            agac = EnKisaYolAgaci(ag, ag.indeks[baslangic_id], tur, aktarma_cezasi, self.oncelik_kuyrugu)
+            self.agac_onbellegi.koy(anahtar, agac)
+            del self._kaynak_iskalari[anahtar]
+        return agac.rota(agac.ag.indeks[hedef_id])
+
+    def izleme_ac(self, kayit: Optional[MetrikKaydi] = None) -> MetrikKaydi:
+        """
+        Sorgu izlemeyi açar. Her rota sorgusu için yerleşen istasyon,
+        kuyruk ekleme/çıkarma, bayat girdi, gevşetme (denenen kenar),
+        gecikmeli kenar okuması, süre, ön hesap süresi ve önbellek isabeti
+        kaydedilir; sonuç son_istatistik'te ve kayit'ta toplanır.
+        """
+        self._izleme = kayit if kayit is not None else MetrikKaydi()
+        return self._izleme
+
+    def izleme_kapat(self) -> Optional[MetrikKaydi]:
+        kayit, self._izleme = self._izleme, None
+        return kayit
+
+    def izleme_kancasi_ekle(self, olay: str, kanca: Callable) -> None:
+        """
+        olay "yerlesme" ise istasyon kesinleştiğinde, "gevsetme" ise bir
+        istasyonun etiketi iyileşip kuyruğa girdiğinde (kaynaklar dahil)
+        kanca(yontem, istasyon, maliyet) çağrılır. gevsetme'deki maliyet
+        kuyruk anahtarıdır (A*'da g + h); BFS'te None olabilir. Kancalar
+        yalnızca izleme açıkken çalışır.
+        """
+        if olay not in self._izleme_kancalari:
+            raise ValueError(f"Bilinmeyen izleme olayı: {olay}")
+        self._izleme_kancalari[olay].append(kanca)
+
+    def izleme_kancasi_cikar(self, olay: str, kanca: Callable) -> None:
+        self._izleme_kancalari[olay].remove(kanca)
+
+    def _izleyerek(self, yontem: Callable, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        istatistik = AramaIstatistigi(
+            yontem.__name__, self._izleme_kancalari["yerlesme"], self._izleme_kancalari["gevsetme"]
+        )
+        isabet = self.rota_onbellegi.isabet + self.agac_onbellegi.isabet
+        self._etkin_istatistik = istatistik
+        ag = None
+        baslangic = time.perf_counter()
+        try:
+            ag = self.compile()
+            istatistik.hazirlik_sn = time.perf_counter() - baslangic
+            istatistik._ofset, istatistik._gecikmeli, istatistik._istasyonlar = ag.ofset, ag.gecikmeli, ag.istasyonlar
+            ag.izleyici = istatistik
+            return yontem(self, *args, **kwargs)
+        finally:
+            istatistik.sure_sn = time.perf_counter() - baslangic - istatistik.hazirlik_sn
+            if ag is not None:
+                ag.izleyici = None
+            self._etkin_istatistik = None
+            istatistik.onbellekten = self.rota_onbellegi.isabet + self.agac_onbellegi.isabet > isabet
+            self.son_istatistik = istatistik
+            if self._izleme is not None:
+                self._izleme.kaydet(istatistik)
+
+    @contextlib.contextmanager
+    def _hazirlik(self, ag: DerlenmisAg) -> Iterator[None]:
+        """
+        Tembel ön hesabı etkin sorgunun sayaçlarından ayırır: izleyici geçici
+        olarak çözülür ve geçen süre hazirlik_sn'ye yazılır.
+        """
+        istatistik, izleyici = self._etkin_istatistik, ag.izleyici
+        ag.izleyici = None
+        baslangic = time.perf_counter()
+        try:
+            yield
+        finally:
+            ag.izleyici = izleyici
+            if istatistik is not None:
+                istatistik.hazirlik_sn += time.perf_counter() - baslangic
+
+    def onbellek_istatistikleri(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "rota": self.rota_onbellegi.istatistikler(),
+            "agac": self.agac_onbellegi.istatistikler(),
+        }
+
+    def compile(self) -> DerlenmisAg:
+        """
+        Grafı CSR düzenine (tamsayı indeksler, düz ofset/komşu/ağırlık
+        dizileri) dondurur. Sonuç saklanır; istasyon_ekle/baglanti_ekle
+        grafı değiştirdiğinde bir sonraki sorguda yeniden derlenir.
+        """
+        if self._derlenmis is None:
+            self._derlenmis = DerlenmisAg(list(self.istasyonlar.values()), self.delays)
+        return self._derlenmis
+
+    @_izlenen
+    def en_az_aktarma_bul(self, baslangic_id: str, hedef_id: str, cift_yonlu: bool = False) -> Optional[Rota]:
+        """
+        BFS kullanarak en kısa kenar sayılı (en az duraklı) rotayı bulur.
+        Hat değişimlerini sayan gerçek en az aktarma için en_az_aktarmali_rota.
+        cift_yonlu=True ise iki uçtan aynı anda aranır; kenar sayısı aynı
+        kalır ve rota.yerlesen her yönün genişlettiği istasyon sayısını verir.
+        """
         if baslangic_id not in self.istasyonlar or hedef_id not in self.istasyonlar:
             return None
 
-        baslangic = self.istasyonlar[baslangic_id]
-        hedef = self.istasyonlar[hedef_id]
+        anahtar = ("en_az_aktarma", baslangic_id, hedef_id, cift_yonlu, self.surum)
+        sonuc = self._onbellekten(anahtar)
+        if sonuc is _YOK:
+            sonuc = _YOK if cift_yonlu else self._agactan("bfs", baslangic_id, hedef_id)
+            if sonuc is _YOK:
+                sonuc = self._en_az_aktarma_hesapla(baslangic_id, hedef_id, cift_yonlu)
+            elif sonuc is not None:
+                sonuc = sonuc[0]
+            self.rota_onbellegi.koy(anahtar, sonuc)
+        return sonuc
 
-        kuyruk = deque([(baslangic, [baslangic])])
-        ziyaret_edildi = set([baslangic])
+    def _en_az_aktarma_hesapla(self, baslangic_id: str, hedef_id: str, cift_yonlu: bool) -> Optional[Rota]:
+        ag = self.compile()
+        kaynak, hedef = ag.indeks[baslangic_id], ag.indeks[hedef_id]
+        if cift_yonlu:
+            sonuc = ag.cift_yonlu_genislik(kaynak, hedef)
+            if sonuc is None:
+                return None
+            yol, yerlesen = sonuc
+            return Rota(ag, yol, yerlesen=yerlesen)
 
-        while kuyruk:
-            istasyon, yol = kuyruk.popleft()
-            if istasyon == hedef:
-                return yol 
+        yol = ag.genislik_oncelikli(kaynak, hedef)
+        if yol is None:
+            return None
+        return Rota(ag, yol)
+
+    @_izlenen
+    def en_az_aktarmali_rota(self, baslangic_id: str, hedef_id: str) -> Optional[Tuple[Rota, int]]:
+        """
+        Hat değişimi sayısı en az olan rotayı bulur; eşitlikte toplam
+        dakikası (gecikmeler dahil) en küçük olan seçilir. Her istasyon tek
+        bir hatta olduğundan (istasyon, hat) durumu istasyonun kendisidir ve
+        K1-M2 gibi aktarma bağlantıları 1, hat içi kenarlar 0 sayılır.
+        (Rota, aktarma sayısı) döndürür; dakika rota.toplam_sure'dedir.
+        """
+        if baslangic_id not in self.istasyonlar or hedef_id not in self.istasyonlar:
+            return None
 
-            for komsu, _ in istasyon.komsular:
-                if komsu not in ziyaret_edildi:
-                    ziyaret_edildi.add(komsu)
-                    kuyruk.append((komsu, yol + [komsu]))
+        anahtar = ("en_az_aktarmali", baslangic_id, hedef_id, self.surum)
+        sonuc = self._onbellekten(anahtar)
+        if sonuc is _YOK:
+            ag = self.compile()
+            sonuc = ag.en_az_aktarma_yolu(ag.indeks[baslangic_id], ag.indeks[hedef_id])
+            if sonuc is not None:
+                yol, aktarma, dakika = sonuc
+                sonuc = (Rota(ag, yol, toplam_sure=dakika), aktarma)
+            self.rota_onbellegi.koy(anahtar, sonuc)
+        return sonuc
 
-        return None
+    @_izlenen
+    def pareto_rotalar(self, baslangic_id: str, hedef_id: str, etiket_siniri: int = 8) -> List[Tuple[Rota, int]]:
+        """
+        Toplam dakika (gecikmeler dahil) ve hat değişimi sayısı için tüm
+        Pareto-optimal rotaları tek bir çok etiketli aramayla döndürür.
+        Liste en hızlıdan en az aktarmalıya sıralı (Rota, aktarma)
+        çiftleridir; dakika rota.toplam_sure'dedir. Hiçbir aktarma_cezasi
+        değeriyle en_uygun_rota'dan çıkmayan uzlaşma rotaları da buradadır.
+        etiket_siniri istasyon başına yerleşen etiket sayısını sınırlar.
+        """
+        if baslangic_id not in self.istasyonlar or hedef_id not in self.istasyonlar:
+            return []
+
+        anahtar = ("pareto", baslangic_id, hedef_id, etiket_siniri, self.surum)
+        sonuc = self._onbellekten(anahtar)
+        if sonuc is _YOK:
+            ag = self.compile()
+            sonuc = [
+                (Rota(ag, yol, toplam_sure=dakika), aktarma)
+                for yol, dakika, aktarma in ag.pareto_yollar(
+                    ag.indeks[baslangic_id], ag.indeks[hedef_id], etiket_siniri
+                )
+            ]
+            self.rota_onbellegi.koy(anahtar, sonuc)
+        return sonuc
+
+    def alternatif_rotalar(
+        self,
+        baslangic_id: str,
+        hedef_id: str,
+        aktarma_cezasi: int = 0,
+        ayni_ad_tekrarini_atla: bool = True
+    ) -> Iterator[Tuple[Rota, float]]:
+        """
+        Döngüsüz alternatif rotaları (Rota, maliyet) olarak maliyet
+        sırasıyla, tembel biçimde üretir; ilk öğe en_hizli_rota_bul /
+        en_uygun_rota ile aynı maliyettedir. Gecikmeler ve aktarma_cezasi
+        maliyete dahildir. ayni_ad_tekrarini_atla=True ise yalnızca aynı
+        adlı istasyonlar arası bir aktarma adımıyla (ör. K1/M2 Kızılay)
+        ayrılan, yani ardışık tekrarlar atılınca istasyon adları aynı kalan
+        rotalar atlanır. Üretim sürerken graf ya da gecikmeler değişirse
+        RuntimeError verilir.
+        """
+        if baslangic_id not in self.istasyonlar or hedef_id not in self.istasyonlar:
+            return
+        ag = self.compile()
+        surum = self.surum
+        istasyonlar = ag.istasyonlar
+        adlar = set()
+        for yol, maliyet in ag.k_en_kisa_yollar(ag.indeks[baslangic_id], ag.indeks[hedef_id], aktarma_cezasi):
+            if self.surum != surum:
+                raise RuntimeError("Alternatif rotalar üretilirken metro ağı değişti")
+            if ayni_ad_tekrarini_atla:
+                imza = []
+                for i in yol:
+                    if not imza or imza[-1] != istasyonlar[i].ad:
+                        imza.append(istasyonlar[i].ad)
+                imza = tuple(imza)
+                if imza in adlar:
+                    continue
+                adlar.add(imza)
+            yield Rota(ag, yol, None if aktarma_cezasi else maliyet), maliyet
+
+    def izgara(self) -> IzgaraIndeksi:
+        """İstasyon koordinatları için ızgara indeksi; graf değişince yeniden kurulur."""
+        if self._izgara is None:
+            ag = self.compile()
+            with self._hazirlik(ag):
+                self._izgara = IzgaraIndeksi(ag.istasyonlar)
+        return self._izgara
+
+    def en_yakin_istasyonlar(self, x: float, y: float, k: int = 1) -> List[Tuple[Istasyon, float]]:
+        """(x, y) noktasına en yakın k istasyonu (Istasyon, uzaklık) olarak, yakından uzağa döndürür."""
+        izgara = self.izgara()
+        return [(izgara.istasyonlar[i], d) for i, d in izgara.en_yakin(x, y, k)]
+
+    @_izlenen
+    def izokron(self, baslangic_id: str, dakika: float, aktarma_cezasi: int = 0) -> Dict[str, float]:
+        """
+        baslangic_id'den en fazla dakika sürede (gecikmeler dahil) ulaşılan
+        istasyonları {idx: süre} olarak, süreye göre sıralı döndürür.
+        Dijkstra bütçe aşılınca durur; tüm ağ taranmaz.
+        """
+        if baslangic_id not in self.istasyonlar:
+            return {}
+        ag = self.compile()
+        mesafe, _ = ag.sinirli_agac({ag.indeks[baslangic_id]: 0}, dakika, aktarma_cezasi)
+        return {ag.istasyonlar[i].idx: d for i, d in sorted(mesafe.items(), key=lambda t: (t[1], t[0]))}
+
+    @_izlenen
+    def kapidan_kapiya(
+        self,
+        x1: float,
+        y1: float,
+        x2: float,
+        y2: float,
+        aday_sayisi: int = 3,
+        yurume_hizi: float = 1.0,
+        aktarma_cezasi: int = 0
+    ) -> Optional[Tuple[Rota, float]]:
+        """
+        (x1, y1) noktasından (x2, y2) noktasına kapıdan kapıya rota. Her
+        uçta en yakın aday_sayisi istasyon seçilir; yürüme süresi Öklid
+        uzaklığı / yurume_hizi (koordinat birimi / dakika) olarak kaynak ve
+        hedeflere başlangıç/bitiş maliyeti yazılır ve tek bir çok kaynaklı,
+        çok hedefli Dijkstra çalışır. (Rota, yürüme dahil toplam maliyet)
+        döndürür; rota.toplam_sure yalnızca metro içindeki süredir.
+        """
+        ag = self.compile()
+        izgara = self.izgara()
+        kaynaklar = {i: d / yurume_hizi for i, d in izgara.en_yakin(x1, y1, aday_sayisi)}
+        hedefler = {i: d / yurume_hizi for i, d in izgara.en_yakin(x2, y2, aday_sayisi)}
+        sonuc = ag.cok_uclu_yol(kaynaklar, hedefler, aktarma_cezasi)
+        if sonuc is None:
+            return None
+        yol, maliyet = sonuc
+        return (Rota(ag, yol), maliyet)
+
+    def landmark_hazirla(self, sayi: Optional[int] = None) -> LandmarkTablosu:
+        """
+        ALT sezgiseli için landmark seçer ve her birinden tüm istasyonlara
+        süreleri önceden hesaplar. Landmarklar "en uzak" kuralıyla seçilir:
+        her yeni landmark, seçilmişlere en uzak kalan istasyondur.
+        Graf ya da bir gecikme değiştiğinde tablo düşürülür ve bir sonraki
+        sezgiselli sorguda yeniden hazırlanır.
+        """
+        if sayi is not None:
+            self.landmark_sayisi = sayi
+        ag = self.compile()
+        with self._hazirlik(ag):
+            self._landmarklar = LandmarkTablosu(ag, self.landmark_sayisi)
+        return self._landmarklar
 
     def _heuristic(self, current: Istasyon, hedef: Istasyon) -> float:
         """
-        Basit Öklid mesafesi (kuş uçuşu).
-        Koordinatlar gerçek değilse bile, 
-        mantığı göstermek amacıyla eklenmiştir.
+        Landmark (ALT) alt sınırı: dakika cinsinden, hiçbir zaman gerçek
+        süreyi aşmaz. (Eski Öklid mesafesi koordinat biriminde olduğundan
+        kabul edilebilir değildi ve yanlış rota döndürebiliyordu.)
         """
-        dx = current.x - hedef.x
-        dy = current.y - hedef.y
-        return math.sqrt(dx*dx + dy*dy)
+        if self._landmarklar is None:
+            self.landmark_hazirla()
+        ag = self.compile()
+        return self._landmarklar.sezgisel(ag.indeks[hedef.idx])(ag.indeks[current.idx])
 
+    @_izlenen
     def en_hizli_rota_bul(
         self, 
         baslangic_id: str, 
         hedef_id: str, 
-        use_heuristic: bool = False
-    ) -> Optional[Tuple[List[Istasyon], int]]:
+        use_heuristic: bool = False,
+        cift_yonlu: bool = False
+    ) -> Optional[Tuple[Rota, int]]:
         """
         A* araması yaparak en hızlı (en kısa süreli) rotayı bulur.
-        use_heuristic=True ise f(n)=g(n)+h(n) kullanılır.
+        use_heuristic=True ise f(n)=g(n)+h(n) kullanılır; h landmark (ALT) alt sınırıdır.
         Aksi takdirde h(n)=0 olarak çalışır (Dijkstra).
+        cift_yonlu=True ise çift yönlü Dijkstra kullanılır (sezgiselle birlikte kullanılamaz).
         """
         if baslangic_id not in self.istasyonlar or hedef_id not in self.istasyonlar:
             return None
+        if cift_yonlu and use_heuristic:
+            raise ValueError("cift_yonlu ve use_heuristic birlikte kullanılamaz")
 
-        baslangic = self.istasyonlar[baslangic_id]
-        hedef = self.istasyonlar[hedef_id]
-        g_score = {baslangic: 0}
-        pq = [(0, id(baslangic), baslangic, [baslangic])]
-
-        while pq:
-            f_deger, _, current_station, yol = heapq.heappop(pq)
-            current_sure = g_score[current_station]
-
-            if current_station == hedef:
-                return (yol, current_sure)
+        anahtar = ("en_hizli", baslangic_id, hedef_id, use_heuristic, cift_yonlu, self.surum)
+        sonuc = self._onbellekten(anahtar)
+        if sonuc is _YOK:
+            sonuc = _YOK if cift_yonlu else self._agactan("dijkstra", baslangic_id, hedef_id)
+            if sonuc is _YOK:
+                sonuc = self._en_hizli_hesapla(baslangic_id, hedef_id, use_heuristic, cift_yonlu)
+            self.rota_onbellegi.koy(anahtar, sonuc)
+        return sonuc
 
-            for komsu, edge_sure in current_station.komsular:
-                extra_delay = self._get_delay(current_station.idx, komsu.idx)
-                tentative_g = current_sure + edge_sure + extra_delay
+    def _en_hizli_hesapla(
+        self,
+        baslangic_id: str,
+        hedef_id: str,
+        use_heuristic: bool,
+        cift_yonlu: bool
+    ) -> Optional[Tuple[Rota, int]]:
+        if cift_yonlu:
+            return self._cift_yonlu_rota(baslangic_id, hedef_id, 0)
 
-                if (komsu not in g_score) or (tentative_g < g_score[komsu]):
-                    g_score[komsu] = tentative_g
-                    h_deger = self._heuristic(komsu, hedef) if use_heuristic else 0
-                    f_komsu = tentative_g + h_deger
-                    heapq.heappush(pq, (f_komsu, id(komsu), komsu, yol + [komsu]))
+        ag = self.compile()
+        sezgisel = None
+        if use_heuristic:
+            if self._landmarklar is None:
+                self.landmark_hazirla()
+            sezgisel = self._landmarklar.sezgisel(ag.indeks[hedef_id])
+        sonuc = ag.en_kisa_yol(
+            ag.indeks[baslangic_id], ag.indeks[hedef_id],
+            sezgisel=sezgisel, kuyruk=self.oncelik_kuyrugu
+        )
+        if sonuc is None:
+            return None
+        yol, sure = sonuc
+        return (Rota(ag, yol, sure), sure)
 
-        return None
+    def _cift_yonlu_rota(self, baslangic_id: str, hedef_id: str, aktarma_cezasi: int) -> Optional[Tuple[Rota, int]]:
+        ag = self.compile()
+        sonuc = ag.cift_yonlu_en_kisa_yol(
+            ag.indeks[baslangic_id], ag.indeks[hedef_id],
+            aktarma_cezasi=aktarma_cezasi, kuyruk=self.oncelik_kuyrugu
+        )
+        if sonuc is None:
+            return None
+        yol, maliyet, yerlesen = sonuc
+        return (Rota(ag, yol, maliyet if not aktarma_cezasi else None, yerlesen), maliyet)
 
-    def set_delay(self, istasyon1_id: str, istasyon2_id: str, delay: int) -> None:
+    def set_delay(self, istasyon1_id: str, istasyon2_id: str, delay: int) -> int:
         """
         Metro ağındaki iki istasyon arasına ek gecikme tanımlanır.
         Hesaplamalar bu gecikmeyi süreye ekleyecektir.
+        Saklı en kısa yol ağaçları yerinde onarılır; onarımın dokunduğu
+        istasyon sayısı (tüm ağaçlar toplamı) döndürülür.
         """
-        if istasyon1_id > istasyon2_id:
-            istasyon1_id, istasyon2_id = istasyon2_id, istasyon1_id
-        self.delays[(istasyon1_id, istasyon2_id)] = delay
+        return self.set_delays([(istasyon1_id, istasyon2_id, delay)])
+
+    def set_delays(self, guncellemeler: Iterable[Tuple[str, str, int]]) -> int:
+        """
+        (istasyon1_id, istasyon2_id, delay) gecikmelerini toplu uygular ve
+        saklı ağaçları tek bir onarım geçişiyle günceller. Canlı aksama
+        akışı için tasarlanmıştır; dokunulan istasyon sayısını döndürür.
+        """
+        degisenler = set()
+        for istasyon1_id, istasyon2_id, delay in guncellemeler:
+            if istasyon1_id > istasyon2_id:
+                istasyon1_id, istasyon2_id = istasyon2_id, istasyon1_id
+            if self.delays.get((istasyon1_id, istasyon2_id), 0) != delay:
+                # Azalış eski landmark sınırlarını kabul edilemez kılar, artış zayıflatır.
+                self._landmarklar = None
+                degisenler.add((istasyon1_id, istasyon2_id))
+            self.delays[(istasyon1_id, istasyon2_id)] = delay
+            if self._derlenmis is not None:
+                self._derlenmis.gecikme_uygula(istasyon1_id, istasyon2_id, delay)
+            for dinleyici in self._gecikme_dinleyicileri:
+                dinleyici(istasyon1_id, istasyon2_id, delay)
+        self.surum += 1
+
+        ag = self._derlenmis
+        if ag is None or not degisenler:
+            return 0
+        ciftler = [
+            (ag.indeks[a], ag.indeks[b]) for a, b in degisenler
+            if a in ag.indeks and b in ag.indeks
+        ]
+        return sum(
+            agac.onar(ciftler) for agac in self.agac_onbellegi.degerler()
+            if agac.ag is ag
+        )
+
+    def gecikme_dinleyicisi_ekle(self, dinleyici: Callable[[str, str, int], None]) -> None:
+        """
+        set_delay her çağrıldığında (sıralı istasyon1_id, istasyon2_id, delay)
+        ile çağrılacak bir fonksiyon kaydeder. Ön hesaplı yapıların
+        (ör. daraltma hiyerarşisi) kendini güncellemesi içindir.
+        """
+        self._gecikme_dinleyicileri.append(dinleyici)
+
+    def gecikme_dinleyicisi_cikar(self, dinleyici: Callable[[str, str, int], None]) -> None:
+        self._gecikme_dinleyicileri.remove(dinleyici)
 
     def _get_delay(self, istasyon1_id: str, istasyon2_id: str) -> int:
         if istasyon1_id > istasyon2_id:
@@ -142,100 +1994,453 @@ class MetroAgi:
             ...
           ]
         }
+        İsteğe bağlı "delays": [{"s1": "K2", "s2": "K3", "delay": 2}, ...]
+        listesi set_delay ile uygulanır. Dosya yukle_json_akisli ile okunur;
+        hatalı bir dosyada ağa hiçbir şey eklenmez.
+        """
+        self.yukle_json_akisli(file_path)
+
+    def yukle_json_akisli(
+        self,
+        file_path: str,
+        parti_boyutu: int = 10000,
+        ilerleme: Optional[Callable[[str, int, int, float], None]] = None
+    ) -> Dict[str, float]:
         """
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        JSON ağ dosyasını tamamını belleğe almadan öğe öğe okur.
 
-        for st in data["stations"]:
-            self.istasyon_ekle(
-                st["idx"], 
-                st["ad"], 
-                st["hat"], 
-                float(st.get("x", 0)), 
-                float(st.get("y", 0))
+        Okuma sırasında istasyonlar Istasyon nesneleri, bağlantılar ise
+        kimlik numaralarından oluşan düz diziler olarak hazırlanır; ağın
+        kendisine dokunulmaz. Dosyanın sonunda tüm bağlantı ve gecikmelerin
+        tanımlı istasyonlara işaret ettiği doğrulanır, ardından bağlantılar
+        parti_boyutu'luk partilerle eklenir. Eksik alan, geçersiz süre ya da
+        gecikme, tanımsız istasyon ValueError verir ve ağ yüklemeden önceki
+        hâlinde kalır.
+
+        ilerleme(asama, islenen, okunan_bayt, gecen_saniye) her partide
+        çağrılır; asama "okuma" ya da "ekleme"dir. Sayaçları ve saniyedeki
+        öğe sayısını içeren bir sözlük döndürür.
+        """
+        baslangic = time.perf_counter()
+        yeni: Dict[str, Istasyon] = {}
+        kimlikler: Dict[str, int] = {}
+        b_s1 = array("i")
+        b_s2 = array("i")
+        sureler: List[int] = []
+        gecikmeler: List[Tuple[str, str, int]] = []
+        sayac = defaultdict(int)
+
+        def no(kimlik: Any) -> int:
+            if not isinstance(kimlik, str):
+                raise TypeError(f"istasyon kimliği metin olmalı: {kimlik!r}")
+            return kimlikler.setdefault(kimlik, len(kimlikler))
+
+        islenen = 0
+        with open(file_path, "rb") as f:
+            okuyucu = _JsonAkisOkuyucu(f)
+            for anahtar, oge in okuyucu.diziler():
+                try:
+                    if anahtar == "stations":
+                        idx = oge["idx"]
+                        no(idx)
+                        if idx not in self.istasyonlar and idx not in yeni:
+                            yeni[idx] = Istasyon(
+                                idx,
+                                oge["ad"],
+                                oge["hat"],
+                                float(oge.get("x", 0)),
+                                float(oge.get("y", 0))
+                            )
+                    elif anahtar == "connections":
+                        sure = oge["sure"]
+                        if isinstance(sure, bool) or not isinstance(sure, (int, float)):
+                            raise TypeError(f"süre sayı olmalı: {sure!r}")
+                        b_s1.append(no(oge["s1"]))
+                        b_s2.append(no(oge["s2"]))
+                        sureler.append(sure)
+                    elif anahtar == "delays":
+                        gecikme = oge["delay"]
+                        if isinstance(gecikme, bool) or not isinstance(gecikme, (int, float)):
+                            raise TypeError(f"gecikme sayı olmalı: {gecikme!r}")
+                        no(oge["s1"])
+                        no(oge["s2"])
+                        gecikmeler.append((oge["s1"], oge["s2"], gecikme))
+                    else:
+                        continue
+                except (KeyError, TypeError, ValueError) as hata:
+                    raise ValueError(
+                        f"{file_path}: {anahtar}[{sayac[anahtar]}] geçersiz: {hata!r}"
+                    ) from None
+                sayac[anahtar] += 1
+                islenen += 1
+                if ilerleme is not None and islenen % parti_boyutu == 0:
+                    ilerleme("okuma", islenen, okuyucu.okunan_bayt, time.perf_counter() - baslangic)
+            okunan_bayt = okuyucu.okunan_bayt
+
+        tanimsiz = [k for k in kimlikler if k not in yeni and k not in self.istasyonlar]
+        if tanimsiz:
+            raise ValueError(
+                f"{file_path}: {len(tanimsiz)} tanımsız istasyona başvuruluyor: "
+                + ", ".join(tanimsiz[:5]) + (" ..." if len(tanimsiz) > 5 else "")
             )
 
-        for conn in data["connections"]:
-            s1 = conn["s1"]
-            s2 = conn["s2"]
-            sure = conn["sure"]
-            self.baglanti_ekle(s1, s2, sure)
+        for istasyon in yeni.values():
+            self.istasyonlar[istasyon.idx] = istasyon
+            self.hatlar[istasyon.hat].append(istasyon)
+        nesneler = [yeni.get(k) or self.istasyonlar[k] for k in kimlikler]
+        for basla in range(0, len(sureler), parti_boyutu):
+            for i in range(basla, min(basla + parti_boyutu, len(sureler))):
+                istasyon1 = nesneler[b_s1[i]]
+                istasyon2 = nesneler[b_s2[i]]
+                istasyon1.komsu_ekle(istasyon2, sureler[i])
+                istasyon2.komsu_ekle(istasyon1, sureler[i])
+            if ilerleme is not None:
+                ilerleme("ekleme", min(basla + parti_boyutu, len(sureler)), okunan_bayt, time.perf_counter() - baslangic)
+        if yeni or sureler:
+            self._graf_degisti()
+        if gecikmeler:
+            self.set_delays(gecikmeler)
+
+        gecen = time.perf_counter() - baslangic
+        return {
+            "istasyon": sayac["stations"],
+            "baglanti": sayac["connections"],
+            "gecikme": sayac["delays"],
+            "bayt": okunan_bayt,
+            "saniye": gecen,
+            "oge_per_saniye": islenen / gecen if gecen > 0 else 0.0,
+        }
 
     def kaydet_json(self, file_path: str) -> None:
         """
-        Mevcut grafı JSON formatında bir dosyaya kaydeder.
-        """
-        stations_data = []
-        for idx, ist in self.istasyonlar.items():
-            stations_data.append({
-                "idx": ist.idx,
-                "ad": ist.ad,
-                "hat": ist.hat,
-                "x": ist.x,
-                "y": ist.y
-            })
-
-        connections_data = []
-        seen_pairs = set()
-        for idx, ist in self.istasyonlar.items():
-            for komsu, sure in ist.komsular:
-                pair = tuple(sorted([ist.idx, komsu.idx]))
-                if pair not in seen_pairs:
-                    seen_pairs.add(pair)
-                    connections_data.append({
-                        "s1": pair[0],
-                        "s2": pair[1],
-                        "sure": sure
-                    })
-
-        out = {
-            "stations": stations_data,
-            "connections": connections_data
-        }
+        Mevcut grafı JSON formatında bir dosyaya kaydeder. Öğeler tek tek
+        yazılır; çıktı json.dump(..., indent=2) ile aynıdır.
+        """
+        def yaz_dizi(f, anahtar: str, ogeler: Iterable[Dict[str, Any]], son: bool) -> None:
+            f.write(f'  "{anahtar}": [')
+            ayirici = "\n"
+            for oge in ogeler:
+                f.write(ayirici + "    " + json.dumps(oge, ensure_ascii=False, indent=2).replace("\n", "\n    "))
+                ayirici = ",\n"
+            f.write(("]" if ayirici == "\n" else "\n  ]") + ("\n" if son else ",\n"))
+
+        def istasyonlar():
+            for idx, ist in self.istasyonlar.items():
+                yield {
+                    "idx": ist.idx,
+                    "ad": ist.ad,
+                    "hat": ist.hat,
+                    "x": ist.x,
+                    "y": ist.y
+                }
+
+        def baglantilar():
+            seen_pairs = set()
+            for idx, ist in self.istasyonlar.items():
+                for komsu, sure in ist.komsular:
+                    pair = tuple(sorted([ist.idx, komsu.idx]))
+                    if pair not in seen_pairs:
+                        seen_pairs.add(pair)
+                        yield {
+                            "s1": pair[0],
+                            "s2": pair[1],
+                            "sure": sure
+                        }
 
         with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(out, f, ensure_ascii=False, indent=2)
+            f.write("{\n")
+            yaz_dizi(f, "stations", istasyonlar(), False)
+            yaz_dizi(f, "connections", baglantilar(), not self.delays)
+            if self.delays:
+                yaz_dizi(f, "delays", (
+                    {"s1": s1, "s2": s2, "delay": delay}
+                    for (s1, s2), delay in self.delays.items()
+                ), True)
+            f.write("}")
+
+    def kaydet_snapshot(self, file_path: str) -> None:
+        """
+        Grafı ikili anlık görüntü olarak yazar: başlık, idx/ad/hat için
+        dizgi tablosu, koordinatlar, CSR kenar dizileri ve set_delay
+        gecikmeleri. yukle_snapshot dosyayı bellek eşleyerek okur.
+        """
+        ag = self.compile()
+        dizgiler: Dict[str, int] = {}
+
+        def no(dizgi: str) -> int:
+            return dizgiler.setdefault(dizgi, len(dizgiler))
+
+        idx_no = array("i", (no(ist.idx) for ist in ag.istasyonlar))
+        ad_no = array("i", (no(ist.ad) for ist in ag.istasyonlar))
+        hat_no = array("i", (no(ist.hat) for ist in ag.istasyonlar))
+        x = array("d", (ist.x for ist in ag.istasyonlar))
+        y = array("d", (ist.y for ist in ag.istasyonlar))
+        g_s1 = array("i", (no(s1) for s1, _ in self.delays))
+        g_s2 = array("i", (no(s2) for _, s2 in self.delays))
+        float_gecikme = not all(isinstance(d, int) for d in self.delays.values())
+        g_deger = array("d" if float_gecikme else "i", self.delays.values())
+
+        kodlanmis = [d.encode("utf-8") for d in dizgiler]
+        dz_ofset = array("q", [0])
+        for b in kodlanmis:
+            dz_ofset.append(dz_ofset[-1] + len(b))
+
+        bayraklar = (0 if ag.tamsayi else _SNAPSHOT_FLOAT_SURE) | (_SNAPSHOT_FLOAT_GECIKME if float_gecikme else 0)
+        bolumler = [_kucuk_endian(dz_ofset), b"".join(kodlanmis)]
+        bolumler += [
+            _kucuk_endian(d)
+            for d in (idx_no, ad_no, hat_no, x, y, ag.ofset, ag.komsu, ag.sure, g_s1, g_s2, g_deger)
+        ]
+        with open(file_path, "wb") as f:
+            f.write(_SNAPSHOT_BASLIK.pack(
+                _SNAPSHOT_SIHIRLI, _SNAPSHOT_SURUM, bayraklar,
+                len(ag), len(ag.komsu), len(self.delays), len(dizgiler), dz_ofset[-1]
+            ))
+            f.write(bytes(_hizala(_SNAPSHOT_BASLIK.size) - _SNAPSHOT_BASLIK.size))
+            for bolum in bolumler:
+                f.write(bolum)
+                f.write(bytes(_hizala(len(bolum)) - len(bolum)))
+
+    def yukle_snapshot(self, file_path: str) -> None:
+        """
+        kaydet_snapshot ile yazılmış dosyayı yükler. Boş bir ağa yüklerken
+        dosya bellek eşlenir ve CSR dizileri kopyalanmadan derlenmiş ağ
+        olarak kullanılır. Yükleme maliyeti istasyon sayısıyla orantılıdır:
+        Istasyon nesneleri ve dizgiler kurulur, kenar başına nesne
+        oluşturulmaz. Bir istasyonun komsular listesi ilk erişimde eşlenmiş
+        dizilerden kurulur; aramalar buna hiç dokunmaz, ancak kaydet_json
+        ya da yeniden derleme tüm listeleri (O(E)) kurar.
+
+        Eşleme snapshot_kapat'a kadar açık kalır; graf değiştiğinde ya da
+        yeni bir anlık görüntü yüklendiğinde kendiliğinden kapatılır. Dolu
+        bir ağa yüklerken istasyon ve bağlantılar yukle_json gibi tek tek
+        eklenir ve eşleme hemen kapatılır.
+        """
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _SNAPSHOT_BASLIK.size:
+                raise ValueError(f"{file_path} bir metro anlık görüntüsü değil")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        sihirli, surum, bayraklar, n, m, d, s, blob_boyu = _SNAPSHOT_BASLIK.unpack_from(mm, 0)
+        if sihirli != _SNAPSHOT_SIHIRLI or surum != _SNAPSHOT_SURUM:
+            mm.close()
+            raise ValueError(f"{file_path} bir metro anlık görüntüsü değil")
+
+        bellek = memoryview(mm)
+        gorunumler = [bellek]
+        konum = _hizala(_SNAPSHOT_BASLIK.size)
+
+        def bolum(tip: str, adet: int):
+            nonlocal konum
+            boyut = adet * array(tip).itemsize
+            parca = bellek[konum:konum + boyut]
+            konum += _hizala(boyut)
+            if sys.byteorder == "little":
+                gorunumler.append(parca.cast(tip))
+                return gorunumler[-1]
+            kopya = array(tip)
+            kopya.frombytes(parca.cast("B"))
+            kopya.byteswap()
+            return kopya
+
+        dz_ofset = bolum("q", s + 1)
+        blob = bellek[konum:konum + blob_boyu]
+        gorunumler.append(blob)
+        konum += _hizala(blob_boyu)
+        dizgiler = [str(blob[a:b], "utf-8") for a, b in zip(dz_ofset, dz_ofset[1:])]
+        idx_no, ad_no, hat_no = bolum("i", n), bolum("i", n), bolum("i", n)
+        x, y = bolum("d", n), bolum("d", n)
+        ofset, komsu = bolum("i", n + 1), bolum("i", m)
+        sure = bolum("d" if bayraklar & _SNAPSHOT_FLOAT_SURE else "i", m)
+        g_s1, g_s2 = bolum("i", d), bolum("i", d)
+        g_deger = bolum("d" if bayraklar & _SNAPSHOT_FLOAT_GECIKME else "i", d)
+
+        istasyonlar = [
+            Istasyon(dizgiler[idx_no[i]], dizgiler[ad_no[i]], dizgiler[hat_no[i]], x[i], y[i])
+            for i in range(n)
+        ]
+        gecikmeler = {(dizgiler[g_s1[i]], dizgiler[g_s2[i]]): g_deger[i] for i in range(d)}
+
+        if self.istasyonlar:
+            for ist in istasyonlar:
+                self.istasyon_ekle(ist.idx, ist.ad, ist.hat, ist.x, ist.y)
+            for u in range(n):
+                dongu = 0
+                for e in range(ofset[u], ofset[u + 1]):
+                    v = komsu[e]
+                    # Her bağlantı CSR'de iki kez geçer; kendine dönen bağlantı aynı listede.
+                    if u < v or (u == v and dongu % 2):
+                        self.baglanti_ekle(istasyonlar[u].idx, istasyonlar[v].idx, sure[e])
+                    dongu += u == v
+            for (s1, s2), gecikme in gecikmeler.items():
+                self.set_delay(s1, s2, gecikme)
+            _eslemeyi_kapat(mm, gorunumler)
+            return
+
+        kaynak = (istasyonlar, ofset, komsu, sure)
+        for u, ist in enumerate(istasyonlar):
+            self.istasyonlar[ist.idx] = ist
+            self.hatlar[ist.hat].append(ist)
+            ist._tembel_komsu = (kaynak, u)
+        self.delays.update(gecikmeler)
+        self._graf_degisti()
+        self._derlenmis = DerlenmisAg.dizilerden(istasyonlar, ofset, komsu, sure, self.delays)
+        self._snapshot = (mm, gorunumler, self._derlenmis)
+
+    def snapshot_kapat(self) -> None:
+        """
+        yukle_snapshot'ın bellek eşlemesini kapatır. Henüz kurulmamış komşu
+        listeleri kurulur ve eşlenmiş derlenmiş ağın dizileri kopyalanır;
+        ağ ve ondan üretilmiş Rota'lar çalışmaya devam eder. Eşleme yoksa
+        bir şey yapmaz.
+        """
+        if self._snapshot is None:
+            return
+        mm, gorunumler, ag = self._snapshot
+        self._snapshot = None
+        for ist in self.istasyonlar.values():
+            ist.komsular
+        for ad in ("ofset", "komsu", "sure"):
+            dizi = getattr(ag, ad)
+            if isinstance(dizi, memoryview):
+                setattr(ag, ad, array(dizi.format, dizi.tobytes()))
+        _eslemeyi_kapat(mm, gorunumler)
 
+    @staticmethod
+    def json_to_snapshot(json_path: str, snapshot_path: str) -> None:
+        """JSON ağ dosyasını (gecikmeleriyle) ikili anlık görüntüye çevirir."""
+        metro = MetroAgi()
+        metro.yukle_json(json_path)
+        metro.kaydet_snapshot(snapshot_path)
+
+    @staticmethod
+    def snapshot_to_json(snapshot_path: str, json_path: str) -> None:
+        """İkili anlık görüntüyü mevcut JSON şemasına (gecikmeler dahil) çevirir."""
+        metro = MetroAgi()
+        metro.yukle_snapshot(snapshot_path)
+        metro.kaydet_json(json_path)
+
+    @_izlenen
     def en_uygun_rota(
         self, 
         baslangic_id: str, 
         hedef_id: str, 
-        aktarma_cezasi: int = 5
-    ) -> Optional[Tuple[List[Istasyon], int]]:
+        aktarma_cezasi: int = 5,
+        cift_yonlu: bool = False
+    ) -> Optional[Tuple[Rota, int]]:
         """
         Çoklu kriter örneği:
         - Bir kenar geçişi: 'süre' + eğer hat değişimi olduysa 'aktarma_cezasi'
         - Bu, sabit bir cezadır. Gerçekte durak sayısı, konfor, ücret vb. eklenebilir.
+        Aktarma sayısı her şeyden önemliyse en_az_aktarmali_rota kullanılmalı.
+        cift_yonlu=True ise çift yönlü Dijkstra kullanılır (ceza simetriktir).
         """
         if baslangic_id not in self.istasyonlar or hedef_id not in self.istasyonlar:
             return None
 
-        baslangic = self.istasyonlar[baslangic_id]
-        hedef = self.istasyonlar[hedef_id]
-        cost = {baslangic: 0}
-        pq = [(0, id(baslangic), baslangic, [baslangic])]
+        anahtar = ("en_uygun", baslangic_id, hedef_id, aktarma_cezasi, cift_yonlu, self.surum)
+        sonuc = self._onbellekten(anahtar)
+        if sonuc is _YOK:
+            sonuc = _YOK if cift_yonlu else self._agactan("dijkstra", baslangic_id, hedef_id, aktarma_cezasi)
+            if sonuc is _YOK:
+                sonuc = self._en_uygun_hesapla(baslangic_id, hedef_id, aktarma_cezasi, cift_yonlu)
+            self.rota_onbellegi.koy(anahtar, sonuc)
+        return sonuc
 
-        while pq:
-            current_cost, _, current_station, yol = heapq.heappop(pq)
-            if current_station == hedef:
-                return (yol, current_cost)
+    def _en_uygun_hesapla(
+        self,
+        baslangic_id: str,
+        hedef_id: str,
+        aktarma_cezasi: int,
+        cift_yonlu: bool
+    ) -> Optional[Tuple[Rota, int]]:
+        if cift_yonlu:
+            return self._cift_yonlu_rota(baslangic_id, hedef_id, aktarma_cezasi)
 
-            if current_cost > cost[current_station]:
-                continue
+        ag = self.compile()
+        sonuc = ag.en_kisa_yol(
+            ag.indeks[baslangic_id], ag.indeks[hedef_id],
+            aktarma_cezasi=aktarma_cezasi, kuyruk=self.oncelik_kuyrugu
+        )
+        if sonuc is None:
+            return None
+        yol, maliyet = sonuc
+        return (Rota(ag, yol), maliyet)
 
-            for komsu, edge_sure in current_station.komsular:
-                extra_delay = self._get_delay(current_station.idx, komsu.idx)
-                penalty = aktarma_cezasi if (current_station.hat != komsu.hat) else 0
-                yeni_maliyet = current_cost + edge_sure + extra_delay + penalty
+    def sure_matrisi(
+        self,
+        kaynak_idler: Sequence[str],
+        hedef_idler: Optional[Sequence[str]] = None,
+        aktarma_cezasi: int = 0,
+        calisan_sayisi: Optional[int] = None,
+        dosya_yolu: Optional[str] = None,
+        parca_boyutu: int = 64
+    ) -> Optional[memoryview]:
+        """
+        Kaynak x hedef seyahat süresi matrisi (hedef_idler verilmezse tüm
+        istasyonlar). Her kaynak için tek bir Dijkstra ağacı kurulur; süreler
+        set_delay gecikmelerini ve en_uygun_rota'daki gibi aktarma_cezasi'nı
+        içerir, ulaşılamayan hücreler -1'dir.
 
-                if (komsu not in cost) or (yeni_maliyet < cost[komsu]):
-                    cost[komsu] = yeni_maliyet
-                    heapq.heappush(pq, (yeni_maliyet, id(komsu), komsu, yol + [komsu]))
+        Kaynaklar parca_boyutu'luk görevlere bölünüp calisan_sayisi süreçli
+        bir ProcessPoolExecutor'a dağıtılır (None: CPU sayısı, 1: aynı
+        süreçte). Derlenmiş ağ işçilere havuz kurulurken bir kez gönderilir.
 
-        return None
+        Sonuç (kaynak, hedef) biçimli bir memoryview'dır: m[i, j] ya da
+        m.tolist(). Tüm ağırlıklar ve ceza tamsayıysa tipi "i", değilse
+        "d"dir. dosya_yolu verilirse satırlar hesaplandıkça dosyaya
+        little-endian ham değerler olarak sırayla yazılır ve None döner.
+        """
+        if hedef_idler is None:
+            hedef_idler = list(self.istasyonlar)
+        tanimsiz = [i for i in (*kaynak_idler, *hedef_idler) if i not in self.istasyonlar]
+        if tanimsiz:
+            raise ValueError(f"Bilinmeyen istasyon: {', '.join(tanimsiz[:5])}")
+
+        ag = self.compile()
+        kaynaklar = array("i", (ag.indeks[i] for i in kaynak_idler))
+        hedefler = array("i", (ag.indeks[i] for i in hedef_idler))
+        tip = "i" if ag.tamsayi and isinstance(aktarma_cezasi, int) else "d"
+        parcalar = [kaynaklar[i:i + parca_boyutu] for i in range(0, len(kaynaklar), parca_boyutu)]
+        if calisan_sayisi is None:
+            calisan_sayisi = os.cpu_count() or 1
+        calisan_sayisi = min(calisan_sayisi, len(parcalar))
+
+        havuz = None
+        if calisan_sayisi > 1:
+            havuz = ProcessPoolExecutor(
+                calisan_sayisi,
+                initializer=_matris_isci_baslat,
+                initargs=(
+                    [Istasyon(ist.idx, "", ist.hat) for ist in ag.istasyonlar],
+                    array("i", ag.ofset), array("i", ag.komsu), ag.agirlik,
+                    hedefler, aktarma_cezasi, self.oncelik_kuyrugu, tip
+                )
+            )
+            satirlar = havuz.map(_isci_sure_satirlari, parcalar)
+        else:
+            satirlar = (
+                _sure_satirlari(ag, parca, hedefler, aktarma_cezasi, self.oncelik_kuyrugu, tip)
+                for parca in parcalar
+            )
+        try:
+            if dosya_yolu is not None:
+                with open(dosya_yolu, "wb") as f:
+                    for parca in satirlar:
+                        f.write(_kucuk_endian(memoryview(parca).cast(tip)))
+                return None
+            matris = bytearray()
+            for parca in satirlar:
+                matris += parca
+        finally:
+            if havuz is not None:
+                havuz.shutdown()
+        if not matris:
+            # memoryview sıfır boyutlu biçime dönüştürülemez; boş tek boyutlu görünüm.
+            return memoryview(array(tip))
+        return memoryview(matris).cast(tip, (len(kaynaklar), len(hedefler)))
 
     @staticmethod
-    def print_route(rota: List[Istasyon]) -> str:
+    def print_route(rota: Sequence) -> str:
         """
         Örnek bir basit iyileştirme: 
         İstasyon adlarını art arda aynı ise tekrar etmeyelim (başka hat ama aynı ad).
@@ -306,6 +2511,32 @@ if __name__ == "__main__":
         stations, cost_val = rota_combo
         print(f"Çoklu Kriter Rota: {MetroAgi.print_route(stations)} (Maliyet: {cost_val})")
 
+    rota_aktarma = metro.en_az_aktarmali_rota("M1", "K4")
+    if rota_aktarma:
+        stations, aktarma = rota_aktarma
+        print(f"En Az Aktarma (0-1 BFS) Rota: {MetroAgi.print_route(stations)} (Aktarma: {aktarma}, Süre: {stations.toplam_sure})")
+
+    for stations, aktarma in metro.pareto_rotalar("M1", "K4"):
+        print(f"Pareto Rota: {MetroAgi.print_route(stations)} (Süre: {stations.toplam_sure}, Aktarma: {aktarma})")
+
+    matris = metro.sure_matrisi(["M1", "K1", "T4"], ["K4", "M4"], calisan_sayisi=1)
+    print("Süre Matrisi (M1, K1, T4 -> K4, M4):", matris.tolist())
+
+    for stations, sure in islice(metro.alternatif_rotalar("M1", "K4"), 3):
+        print(f"Alternatif Rota: {MetroAgi.print_route(stations)} (Süre: {sure})")
+
+    print("İzokron (K1, 10 dk):", metro.izokron("K1", 10))
+    rota_kapi = metro.kapidan_kapiya(-1.2, 0.1, 2.9, 3.2)
+    if rota_kapi:
+        stations, maliyet = rota_kapi
+        print(f"Kapıdan Kapıya Rota: {MetroAgi.print_route(stations)} (Toplam: {maliyet:.1f})")
+
+    kayit = metro.izleme_ac()
+    metro.en_hizli_rota_bul("T1", "M3")
+    print("Arama İstatistiği:", metro.son_istatistik.sozluk())
+    metro.izleme_kapat()
+    print(kayit.prometheus(), end="")
+
     if tk and ttk:
         def run_gui(metro_obj: MetroAgi):
             window = tk.Tk()
@@ -339,6 +2570,8 @@ if __name__ == "__main__":
                 if a_star_route:
                     a_route, a_cost = a_star_route
                     result_text += f"A* (Heuristik): {MetroAgi.print_route(a_route)} (Süre: {a_cost})\n"
+                for sira, (alt_route, alt_cost) in enumerate(islice(metro_obj.alternatif_rotalar(s_id, e_id), 1, 4), 1):
+                    result_text += f"Alternatif {sira}: {MetroAgi.print_route(alt_route)} (Süre: {alt_cost})\n"
                 result_label.config(text=result_text)
 
             tk.Button(window, text="Rota Bul", command=find_routes).grid(row=2, column=0, columnspan=2, pady=5)
@@ -0,0 +1,272 @@
+"""
+MetroAgi için kapanma (aksama) senaryosu analizi.
+
+Önce her kaynaktan bir en kısa yol ağacı kurulur ve tüm çiftlerin süreleri
+saklanır. Bir bağlantı ya da istasyon kapatıldığında Istasyon.komsular'a
+dokunulmaz; ilgili CSR kenarlarının ağırlığı işçinin kendi kopyasında
+sonsuz yapılır. Yalnızca ağacı kapanan öğeyi kullanan kaynaklar yeniden
+hesaplanır: bir ağaç kapanan kenarı ya da istasyonu kullanmıyorsa hâlâ
+geçerlidir ve kapanma hiçbir süreyi kısaltamaz. Senaryolar
+ProcessPoolExecutor işçilerine dağıtılır; derlenmiş ağ her işçiye bir kez
+gönderilir.
+"""
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ek_ozellıklı_proje import DerlenmisAg, Istasyon, MetroAgi
+
+_SONSUZ = float("inf")
+
+# ("baglanti", istasyon1_id, istasyon2_id) ya da ("istasyon", istasyon_id)
+Senaryo = Tuple[str, ...]
+
+# İşçi sürecinin kayan noktalı ağırlıklı ağ kopyası; kapanmalar burada uygulanır.
+_ISCI_AGI: Optional[DerlenmisAg] = None
+
+
+def _isci_baslat(istasyonlar: List[Istasyon], ofset: array, komsu: array, agirlik: array) -> None:
+    global _ISCI_AGI
+    _ISCI_AGI = DerlenmisAg.dizilerden(istasyonlar, ofset, komsu, array("d", agirlik), {})
+
+
+def _agaclar(ag: DerlenmisAg, kaynaklar: Sequence[int]) -> List[Tuple[bytes, bytes]]:
+    sonuc = []
+    for kaynak in kaynaklar:
+        mesafe, onceki = ag.en_kisa_yol_agaci(kaynak)
+        sonuc.append((array("d", mesafe).tobytes(), array("i", onceki).tobytes()))
+    return sonuc
+
+
+def _isci_agaclar(kaynaklar: Sequence[int]) -> List[Tuple[bytes, bytes]]:
+    return _agaclar(_ISCI_AGI, kaynaklar)
+
+
+def _senaryo_satirlari(
+    ag: DerlenmisAg,
+    kenarlar: Sequence[int],
+    haric: int,
+    kaynaklar: Sequence[int]
+) -> List[Tuple[int, float, float, int]]:
+    """
+    kenarlar kapalıyken her kaynak için (kaynak, toplam, en büyük, ulaşılan)
+    satır özetini döndürür; kaynağın kendisi ve haric istasyonu sayılmaz.
+    Ağırlıklar iş bitince geri yüklenir.
+    """
+    agirlik = ag.agirlik
+    eski = [agirlik[e] for e in kenarlar]
+    for e in kenarlar:
+        agirlik[e] = _SONSUZ
+    try:
+        ozet = []
+        for kaynak in kaynaklar:
+            mesafe, _ = ag.en_kisa_yol_agaci(kaynak)
+            mesafe[kaynak] = _SONSUZ
+            if haric != -1:
+                mesafe[haric] = _SONSUZ
+            ulasilan = [d for d in mesafe if d != _SONSUZ]
+            ozet.append((kaynak, sum(ulasilan), max(ulasilan, default=0), len(ulasilan)))
+        return ozet
+    finally:
+        for e, w in zip(kenarlar, eski):
+            agirlik[e] = w
+
+
+def _isci_senaryo(is_: Tuple[Sequence[int], int, Sequence[int]]) -> List[Tuple[int, float, float, int]]:
+    return _senaryo_satirlari(_ISCI_AGI, *is_)
+
+
+class KapanmaAnalizi:
+    """
+    Temel durum n x n süre ve öncül dizileri olarak tutulur (O(n^2) bellek);
+    senaryo başına iş, yalnızca etkilenen kaynak sayısı kadar Dijkstra'dır.
+    """
+    def __init__(self, metro: MetroAgi, calisan_sayisi: Optional[int] = None, parca_boyutu: int = 32):
+        """
+        calisan_sayisi: işçi süreç sayısı (None: CPU sayısı, 1: aynı süreçte).
+        Temel ağaçlar ilk analizde, metro (gecikmeler dahil) değiştiyse
+        yeniden kurulur.
+        """
+        self.metro = metro
+        if calisan_sayisi is None:
+            calisan_sayisi = os.cpu_count() or 1
+        self.calisan_sayisi = calisan_sayisi
+        self.parca_boyutu = parca_boyutu
+        self._surum: Optional[int] = None
+
+    def _calistir(self, havuz: Optional[ProcessPoolExecutor], fonksiyon, yerel, isler: List) -> Iterable:
+        if havuz is None:
+            return (yerel(self._yerel_ag, is_) for is_ in isler)
+        return havuz.map(fonksiyon, isler)
+
+    def _havuz(self, gorev_sayisi: int) -> Optional[ProcessPoolExecutor]:
+        calisan = min(self.calisan_sayisi, gorev_sayisi)
+        if calisan <= 1:
+            return None
+        ag = self._ag
+        return ProcessPoolExecutor(
+            calisan,
+            initializer=_isci_baslat,
+            initargs=(
+                [Istasyon(ist.idx, "", ist.hat) for ist in ag.istasyonlar],
+                array("i", ag.ofset), array("i", ag.komsu), ag.agirlik
+            )
+        )
+
+    def _temel_hesapla(self, havuz: Optional[ProcessPoolExecutor]) -> None:
+        """Tüm kaynakların süre ve öncül dizileri ile satır özetleri."""
+        ag = self._ag
+        n = len(ag)
+        parcalar = [range(i, min(i + self.parca_boyutu, n)) for i in range(0, n, self.parca_boyutu)]
+        self.mesafe = array("d")
+        self.onceki = array("i")
+        for parca in self._calistir(havuz, _isci_agaclar, _agaclar, parcalar):
+            for m, o in parca:
+                self.mesafe.frombytes(m)
+                self.onceki.frombytes(o)
+
+        # Her satırın toplamı, ulaşılan sayısı ve en büyük iki değeri (istasyon
+        # kapanınca o sütun çıkarılırken en büyüğü O(1) güncellemek için).
+        self.toplam = array("d", [0.0]) * n
+        self.ulasilan = array("i", [0]) * n
+        self.en_buyuk = [(0.0, -1, 0.0)] * n
+        self.ic_dugum = bytearray(n * n)
+        for o in range(n):
+            satir = self.mesafe[o * n:(o + 1) * n]
+            b1, a1, b2 = 0.0, -1, 0.0
+            for d, sure in enumerate(satir):
+                if d == o or sure == _SONSUZ:
+                    continue
+                self.toplam[o] += sure
+                self.ulasilan[o] += 1
+                if sure > b1:
+                    b1, a1, b2 = sure, d, b1
+                elif sure > b2:
+                    b2 = sure
+                u = self.onceki[o * n + d]
+                self.ic_dugum[o * n + u] = 1
+            self.en_buyuk[o] = (b1, a1, b2)
+        self.temel_ortalama = sum(self.toplam) / max(sum(self.ulasilan), 1)
+        self.temel_en_buyuk = max((b[0] for b in self.en_buyuk), default=0.0)
+
+    def _hazirla(self) -> None:
+        ag = self.metro.compile()
+        if self._surum == self.metro.surum and self._ag is ag:
+            return
+        self._ag = ag
+        self._yerel_ag = DerlenmisAg.dizilerden(ag.istasyonlar, ag.ofset, ag.komsu, array("d", ag.agirlik), {})
+        havuz = self._havuz(-(-len(ag) // self.parca_boyutu))
+        try:
+            self._temel_hesapla(havuz)
+        finally:
+            if havuz is not None:
+                havuz.shutdown()
+        self._surum = self.metro.surum
+
+    def _coz(self, senaryo: Senaryo) -> Tuple[List[int], int, List[int]]:
+        """Senaryoyu (kapalı kenar indeksleri, hariç istasyon, etkilenen kaynaklar) olarak çözer."""
+        ag = self._ag
+        n = len(ag)
+        ofset, komsu, onceki = ag.ofset, ag.komsu, self.onceki
+        if senaryo[0] == "baglanti":
+            a, b = ag.indeks[senaryo[1]], ag.indeks[senaryo[2]]
+            kenarlar = [e for u, v in ((a, b), (b, a)) for e in range(ofset[u], ofset[u + 1]) if komsu[e] == v]
+            etkilenen = [
+                o for o in range(n)
+                if (onceki[o * n + b] == a and b != o) or (onceki[o * n + a] == b and a != o)
+            ]
+            return kenarlar, -1, etkilenen
+        if senaryo[0] == "istasyon":
+            s = ag.indeks[senaryo[1]]
+            kenarlar = list(range(ofset[s], ofset[s + 1]))
+            kenarlar += [e for u in set(komsu[ofset[s]:ofset[s + 1]]) for e in range(ofset[u], ofset[u + 1]) if komsu[e] == s]
+            ic = self.ic_dugum
+            etkilenen = [o for o in range(n) if o != s and ic[o * n + s]]
+            return kenarlar, s, etkilenen
+        raise ValueError(f"Bilinmeyen senaryo türü: {senaryo[0]}")
+
+    def analiz(self, senaryolar: Iterable[Senaryo]) -> List[Dict]:
+        """
+        Her senaryo için temel duruma göre ortalama ve en büyük süre
+        farkını, kopan (önceden ulaşılabilen, artık ulaşılamayan) yönlü
+        istasyon çifti sayısını ve yeniden hesaplanan kaynak sayısını
+        döndürür. Ortalama ve en büyük süre hâlâ bağlı çiftler üzerindendir.
+        İstasyon kapanmasında o istasyona giden/gelen çiftler hem temel
+        hem senaryo değerlerinden çıkarılır.
+        """
+        self._hazirla()
+        senaryolar = list(senaryolar)
+        cozumler = [self._coz(s) for s in senaryolar]
+        isler = [c for c in cozumler if c[2]]
+        havuz = self._havuz(len(isler))
+        try:
+            sonuclar = iter(list(self._calistir(havuz, _isci_senaryo, lambda ag, is_: _senaryo_satirlari(ag, *is_), isler)))
+        finally:
+            if havuz is not None:
+                havuz.shutdown()
+
+        n = len(self._ag)
+        mesafe = self.mesafe
+        rapor = []
+        for senaryo, (_, haric, etkilenen) in zip(senaryolar, cozumler):
+            toplam = sum(self.toplam)
+            ulasilan = sum(self.ulasilan)
+            en_buyukler = {o: self.en_buyuk[o][0] for o in range(n)}
+            if haric != -1:
+                toplam -= self.toplam[haric]
+                ulasilan -= self.ulasilan[haric]
+                del en_buyukler[haric]
+                for o in en_buyukler:
+                    sure = mesafe[o * n + haric]
+                    if sure != _SONSUZ:
+                        toplam -= sure
+                        ulasilan -= 1
+                        b1, a1, b2 = self.en_buyuk[o]
+                        if a1 == haric:
+                            en_buyukler[o] = b2
+            temel_ulasilan = ulasilan
+            temel_ortalama = toplam / ulasilan if ulasilan else 0.0
+            temel_en_buyuk = max(en_buyukler.values(), default=0.0)
+            for o, o_toplam, o_en_buyuk, o_ulasilan in (next(sonuclar) if etkilenen else ()):
+                sure = mesafe[o * n + haric] if haric != -1 else _SONSUZ
+                eski_toplam = self.toplam[o] - (sure if sure != _SONSUZ else 0)
+                eski_ulasilan = self.ulasilan[o] - (sure != _SONSUZ)
+                toplam += o_toplam - eski_toplam
+                ulasilan += o_ulasilan - eski_ulasilan
+                en_buyukler[o] = o_en_buyuk
+            ortalama = toplam / ulasilan if ulasilan else 0.0
+            en_buyuk = max(en_buyukler.values(), default=0.0)
+            rapor.append({
+                "senaryo": senaryo,
+                "ortalama_sure": ortalama,
+                "ortalama_fark": ortalama - temel_ortalama,
+                "en_buyuk_sure": en_buyuk,
+                "en_buyuk_fark": en_buyuk - temel_en_buyuk,
+                "kopan_cift": temel_ulasilan - ulasilan,
+                "yeniden_hesaplanan": len(etkilenen),
+            })
+        return rapor
+
+    def tum_baglantilar(self) -> List[Senaryo]:
+        """Her istasyon çifti için bir bağlantı kapanma senaryosu."""
+        ciftler = set()
+        for ist in self.metro.istasyonlar.values():
+            for komsu, _ in ist.komsular:
+                if komsu.idx != ist.idx:
+                    ciftler.add(tuple(sorted((ist.idx, komsu.idx))))
+        return [("baglanti", a, b) for a, b in sorted(ciftler)]
+
+    def tum_istasyonlar(self) -> List[Senaryo]:
+        return [("istasyon", idx) for idx in self.metro.istasyonlar]
+
+    def en_zararli(self, adet: int = 10, senaryolar: Optional[Iterable[Senaryo]] = None) -> List[Dict]:
+        """
+        Senaryoları (verilmezse tüm tekil bağlantı ve istasyon kapanmaları)
+        önce kopan çift sayısına, sonra ortalama süre artışına göre sıralar.
+        """
+        if senaryolar is None:
+            senaryolar = self.tum_baglantilar() + self.tum_istasyonlar()
+        rapor = self.analiz(senaryolar)
+        rapor.sort(key=lambda r: (r["kopan_cift"], r["ortalama_fark"], r["en_buyuk_fark"]), reverse=True)
+        return rapor[:adet]
@@ -0,0 +1,405 @@
+"""
+MetroAgi için kıyaslama (benchmark) takımı.
+
+sentetik_ag tohumlu, tekrarlanabilir bir ağ üretir: her hat birkaç aktarma
+merkezinden geçen bir çizgidir, merkezde buluşan hatların istasyonları
+aynı koordinatta durur ve kısa aktarma bağlantılarıyla birbirine bağlanır.
+Ağ yalnızca istasyon_ekle / baglanti_ekle / set_delay ile kurulur; böylece
+aynı ağ hem SerhatHancer_MetroSimulation hem ek_ozellıklı_proje için
+üretilebilir.
+
+kiyasla her boyut ve her yöntem için sorgu başına süreyi (tekrarların en
+iyisi ve ortancası) ve tracemalloc ile ayrı bir turda ölçülen tepe
+belleği verir. Sonuçlar JSON satırları olarak bir dosyaya eklenir; her
+satır commit, zaman ve ortam bilgisini taşır, egilim aynı yöntem ve
+boyutun önceki ölçümüyle oranı çıkarır. olcekleme boyutlar arasındaki
+log-log eğimini (ölçekleme üssünü) hesaplar: eğimin 2'ye yaklaşması sorgu
+başına ikinci dereceden bir maliyete (ör. yol kopyalama) işaret eder.
+
+    python kiyaslama.py --boyutlar 8x25,16x50,32x100 --cikti kiyaslama.jsonl
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import SerhatHancer_MetroSimulation as temel
+from ek_ozellıklı_proje import MetroAgi
+
+Cift = Tuple[str, str]
+
+
+def sentetik_ag(
+    hat_sayisi: int,
+    durak_sayisi: int,
+    tohum: int = 0,
+    gecikme_orani: float = 0.05,
+    metro: Any = None,
+) -> Any:
+    """
+    hat_sayisi x durak_sayisi istasyonlu ağı metro'ya (verilmezse yeni,
+    önbellekleri kapalı bir MetroAgi) ekler ve metro'yu döndürür. Aynı
+    tohum her zaman aynı ağı verir. Koordinatlar ve gecikmeler yalnızca
+    destekleyen sınıflara (ek_ozellıklı_proje.MetroAgi) uygulanır.
+    """
+    if hat_sayisi < 1 or durak_sayisi < 2:
+        raise ValueError("En az bir hat ve hat başına iki durak gerekir")
+    if metro is None:
+        metro = MetroAgi(onbellek_boyutu=0, agac_onbellek_boyutu=0)
+        metro.agac_esigi = None
+    koordinatli = isinstance(metro, MetroAgi)
+    r = random.Random(tohum)
+
+    # Hat başına durak aralığı ortalama ~1 birim olacak şekilde alan seçilir.
+    kenar = 0.75 * durak_sayisi
+    merkez_sayisi = max(2, hat_sayisi)
+    merkezler = [(r.uniform(0, kenar), r.uniform(0, kenar)) for _ in range(merkez_sayisi)]
+    merkezdekiler: List[List[str]] = [[] for _ in range(merkez_sayisi)]
+    baglantilar: List[Tuple[str, str]] = []
+
+    for h in range(hat_sayisi):
+        hat = f"Hat {h + 1}"
+        gecis = r.sample(range(merkez_sayisi), min(3, merkez_sayisi, durak_sayisi))
+        # Durakları merkezler arasındaki parçalara paylaştır; merkez durakları tam merkezde.
+        parca = len(gecis) - 1
+        konumlar = [i * parca / (durak_sayisi - 1) for i in range(durak_sayisi)]
+        onceki_id = None
+        onceki_xy = None
+        merkez_duragi = {round(j * (durak_sayisi - 1) / parca): gecis[j] for j in range(len(gecis))}
+        for i in range(durak_sayisi):
+            idx = f"H{h + 1}_{i + 1}"
+            m = merkez_duragi.get(i)
+            if m is not None:
+                x, y = merkezler[m]
+                ad = f"Merkez {m + 1}"
+                merkezdekiler[m].append(idx)
+            else:
+                t = konumlar[i]
+                j = min(int(t), parca - 1)
+                (x0, y0), (x1, y1) = merkezler[gecis[j]], merkezler[gecis[j + 1]]
+                oran = t - j
+                x = x0 + (x1 - x0) * oran + r.uniform(-0.3, 0.3)
+                y = y0 + (y1 - y0) * oran + r.uniform(-0.3, 0.3)
+                ad = f"{hat} Durak {i + 1}"
+            if koordinatli:
+                metro.istasyon_ekle(idx, ad, hat, x, y)
+            else:
+                metro.istasyon_ekle(idx, ad, hat)
+            if onceki_id is not None:
+                mesafe = math.hypot(x - onceki_xy[0], y - onceki_xy[1])
+                metro.baglanti_ekle(onceki_id, idx, max(1, round(1.5 * mesafe + r.random())))
+                baglantilar.append((onceki_id, idx))
+            onceki_id, onceki_xy = idx, (x, y)
+
+    # Aynı merkezdeki hatlar arasında aktarma bağlantıları.
+    for idler in merkezdekiler:
+        for i in range(len(idler)):
+            for j in range(i + 1, len(idler)):
+                metro.baglanti_ekle(idler[i], idler[j], r.randint(2, 5))
+                baglantilar.append((idler[i], idler[j]))
+
+    if gecikme_orani > 0 and hasattr(metro, "set_delay"):
+        for s1, s2 in baglantilar:
+            if r.random() < gecikme_orani:
+                metro.set_delay(s1, s2, r.randint(1, 5))
+    return metro
+
+
+def sorgu_ciftleri(metro: Any, adet: int, tohum: int = 0) -> List[Cift]:
+    """metro'nun istasyonlarından tohumlu, birbirinden farklı uçlu sorgu çiftleri."""
+    idler = sorted(metro.istasyonlar)
+    r = random.Random(tohum)
+    ciftler = []
+    while len(ciftler) < adet:
+        a, b = r.choice(idler), r.choice(idler)
+        if a != b:
+            ciftler.append((a, b))
+    return ciftler
+
+
+def _tuket(sonuc: Any) -> int:
+    """Tembel sonuçları (Rota, üreteç) tam olarak kurar; kurulan istasyon sayısını döndürür."""
+    if sonuc is None:
+        return 0
+    if isinstance(sonuc, tuple):
+        return _tuket(sonuc[0])
+    if isinstance(sonuc, dict):
+        return len(sonuc)
+    return sum(_tuket(oge) if isinstance(oge, (tuple, list)) else 1 for oge in list(sonuc))
+
+
+def _kapidan_kapiya(metro: MetroAgi, a: str, b: str) -> Any:
+    s1, s2 = metro.istasyonlar[a], metro.istasyonlar[b]
+    return metro.kapidan_kapiya(s1.x + 0.2, s1.y - 0.2, s2.x - 0.2, s2.y + 0.2)
+
+
+# (ad, ağ sınıfı, çağrı). Çağrı her sorgu çifti için bir kez çalışır ve sonucu tam kurulur.
+KIYASLAR: List[Tuple[str, type, Callable[[Any, str, str], Any]]] = [
+    ("temel.en_az_aktarma_bul", temel.MetroAgi, lambda m, a, b: m.en_az_aktarma_bul(a, b)),
+    ("temel.en_hizli_rota_bul", temel.MetroAgi, lambda m, a, b: m.en_hizli_rota_bul(a, b)),
+    ("en_az_aktarma_bul", MetroAgi, lambda m, a, b: m.en_az_aktarma_bul(a, b)),
+    ("en_az_aktarma_bul[cift_yonlu]", MetroAgi, lambda m, a, b: m.en_az_aktarma_bul(a, b, cift_yonlu=True)),
+    ("en_hizli_rota_bul", MetroAgi, lambda m, a, b: m.en_hizli_rota_bul(a, b)),
+    ("en_hizli_rota_bul[sezgisel]", MetroAgi, lambda m, a, b: m.en_hizli_rota_bul(a, b, use_heuristic=True)),
+    ("en_hizli_rota_bul[cift_yonlu]", MetroAgi, lambda m, a, b: m.en_hizli_rota_bul(a, b, cift_yonlu=True)),
+    ("en_uygun_rota", MetroAgi, lambda m, a, b: m.en_uygun_rota(a, b)),
+    ("en_uygun_rota[cift_yonlu]", MetroAgi, lambda m, a, b: m.en_uygun_rota(a, b, cift_yonlu=True)),
+    ("en_az_aktarmali_rota", MetroAgi, lambda m, a, b: m.en_az_aktarmali_rota(a, b)),
+    ("pareto_rotalar", MetroAgi, lambda m, a, b: m.pareto_rotalar(a, b)),
+    ("alternatif_rotalar[3]", MetroAgi, lambda m, a, b: list(islice(m.alternatif_rotalar(a, b), 3))),
+    ("izokron[30]", MetroAgi, lambda m, a, b: m.izokron(a, 30)),
+    ("kapidan_kapiya", MetroAgi, _kapidan_kapiya),
+    # Kaynağın tüm istasyonlara satırı; süreç havuzu kurulumu ölçüme girmesin diye aynı süreçte.
+    ("sure_matrisi[satir]", MetroAgi, lambda m, a, b: m.sure_matrisi([a], calisan_sayisi=1).tolist()),
+]
+
+
+def _ortam() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "zaman": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def _olc(calistir: Callable[[], Any], tekrar: int) -> Tuple[List[float], int]:
+    """Süreler için tekrar kez, tepe bellek için tracemalloc altında bir kez çalıştırır."""
+    sureler = []
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        calistir()
+        sureler.append(time.perf_counter() - baslangic)
+    tracemalloc.start()
+    try:
+        calistir()
+        _, tepe = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return sureler, tepe
+
+
+def kiyasla(
+    boyutlar: Sequence[Tuple[int, int]],
+    tohum: int = 0,
+    sorgu_sayisi: int = 20,
+    tekrar: int = 3,
+    suzgec: Optional[str] = None,
+    dosya_kiyasi: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Her (hat_sayisi, durak_sayisi) boyutu için KIYASLAR'daki yöntemleri
+    (adında suzgec geçenleri) ve istenirse _DOSYA_YONTEMLERI'ni (JSON ve
+    snapshot kaydetme/yükleme) ölçer.
+    Her kayıt sorgu başına saniye (en_iyi_sn, ortanca_sn) ve tüm sorgu
+    turunun tepe belleğini (tepe_bellek_bayt) içerir.
+    """
+    ortam = _ortam()
+    kayitlar = []
+    for hat_sayisi, durak_sayisi in boyutlar:
+        aglar = {}
+        for ad, sinif, cagri in KIYASLAR:
+            if suzgec and suzgec not in ad:
+                continue
+            if sinif not in aglar:
+                metro = None if sinif is MetroAgi else sinif()
+                aglar[sinif] = sentetik_ag(hat_sayisi, durak_sayisi, tohum, metro=metro)
+            metro = aglar[sinif]
+            ciftler = sorgu_ciftleri(metro, sorgu_sayisi, tohum)
+            # Isınma: derleme, landmark ve ızgara gibi tembel ön hesaplar ölçüme girmesin.
+            _tuket(cagri(metro, *ciftler[0]))
+
+            def calistir(metro=metro, cagri=cagri, ciftler=ciftler):
+                for a, b in ciftler:
+                    _tuket(cagri(metro, a, b))
+
+            sureler, tepe = _olc(calistir, tekrar)
+            kayitlar.append(_kayit(ortam, ad, metro, hat_sayisi, durak_sayisi, tohum, sorgu_sayisi, sureler, tepe))
+
+        if dosya_kiyasi:
+            for kaydet_adi, yukle_adi, uzanti in _DOSYA_YONTEMLERI:
+                if suzgec is None or suzgec in kaydet_adi or suzgec in yukle_adi:
+                    kayitlar.extend(_dosya_kiyasi(
+                        ortam, kaydet_adi, yukle_adi, uzanti,
+                        hat_sayisi, durak_sayisi, tohum, tekrar, aglar.get(MetroAgi),
+                    ))
+    return kayitlar
+
+
+# (kaydetme yöntemi, yükleme yöntemi, dosya uzantısı)
+_DOSYA_YONTEMLERI = [
+    ("kaydet_json", "yukle_json", ".json"),
+    ("kaydet_snapshot", "yukle_snapshot", ".mtsn"),
+]
+
+
+def _dosya_kiyasi(
+    ortam: Dict[str, Any], kaydet_adi: str, yukle_adi: str, uzanti: str,
+    hat_sayisi: int, durak_sayisi: int, tohum: int, tekrar: int, metro: Optional[MetroAgi]
+) -> List[Dict[str, Any]]:
+    if metro is None:
+        metro = sentetik_ag(hat_sayisi, durak_sayisi, tohum)
+    fd, yol = tempfile.mkstemp(suffix=uzanti)
+    os.close(fd)
+    yuklenenler: List[MetroAgi] = []
+
+    def yukle_calistir() -> None:
+        yeni = MetroAgi()
+        getattr(yeni, yukle_adi)(yol)
+        yuklenenler.append(yeni)
+
+    try:
+        sureler, tepe = _olc(lambda: getattr(metro, kaydet_adi)(yol), tekrar)
+        kayitlar = [_kayit(ortam, kaydet_adi, metro, hat_sayisi, durak_sayisi, tohum, 1, sureler, tepe)]
+        sureler, tepe = _olc(yukle_calistir, tekrar)
+        kayit = _kayit(ortam, yukle_adi, metro, hat_sayisi, durak_sayisi, tohum, 1, sureler, tepe)
+        kayit["dosya_bayt"] = os.path.getsize(yol)
+        kayitlar.append(kayit)
+        return kayitlar
+    finally:
+        # Snapshot eşlemeleri dosya silinmeden kapanmalı.
+        for yeni in yuklenenler:
+            yeni.snapshot_kapat()
+        os.remove(yol)
+
+
+def _kayit(
+    ortam: Dict[str, Any], ad: str, metro: Any, hat_sayisi: int, durak_sayisi: int,
+    tohum: int, sorgu_sayisi: int, sureler: List[float], tepe: int,
+) -> Dict[str, Any]:
+    kenar = sum(len(ist.komsular) for ist in metro.istasyonlar.values()) // 2
+    return dict(
+        ortam,
+        yontem=ad,
+        hat_sayisi=hat_sayisi,
+        durak_sayisi=durak_sayisi,
+        istasyon=len(metro.istasyonlar),
+        kenar=kenar,
+        tohum=tohum,
+        sorgu=sorgu_sayisi,
+        en_iyi_sn=min(sureler) / sorgu_sayisi,
+        ortanca_sn=statistics.median(sureler) / sorgu_sayisi,
+        tepe_bellek_bayt=tepe,
+    )
+
+
+def kaydet(kayitlar: Iterable[Dict[str, Any]], dosya_yolu: str) -> None:
+    """Kayıtları JSON satırları olarak dosyanın sonuna ekler; eski ölçümler korunur."""
+    with open(dosya_yolu, "a", encoding="utf-8") as f:
+        for kayit in kayitlar:
+            f.write(json.dumps(kayit, ensure_ascii=False) + "\n")
+
+
+def yukle(dosya_yolu: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(dosya_yolu):
+        return []
+    with open(dosya_yolu, encoding="utf-8") as f:
+        return [json.loads(satir) for satir in f if satir.strip()]
+
+
+def olcekleme(kayitlar: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Yöntem başına istasyon sayısına göre sıralı (istasyon, en_iyi_sn) eğrisi
+    ve en küçük kareler log-log eğimi ("us"). Us ~1 doğrusal, ~2 ikinci
+    dereceden sorgu maliyeti demektir; tek boyutlu eğrilerde None'dır.
+    """
+    egriler: Dict[str, Dict[int, float]] = {}
+    for k in kayitlar:
+        egriler.setdefault(k["yontem"], {})[k["istasyon"]] = k["en_iyi_sn"]
+    sonuc = {}
+    for ad, noktalar in egriler.items():
+        egri = sorted(noktalar.items())
+        us = None
+        xs = [math.log(n) for n, t in egri if t > 0]
+        ys = [math.log(t) for n, t in egri if t > 0]
+        if len(xs) >= 2 and max(xs) > min(xs):
+            ox, oy = statistics.fmean(xs), statistics.fmean(ys)
+            us = sum((x - ox) * (y - oy) for x, y in zip(xs, ys)) / sum((x - ox) ** 2 for x in xs)
+        sonuc[ad] = {"egri": egri, "us": us}
+    return sonuc
+
+
+def egilim(gecmis: List[Dict[str, Any]], yeni: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Her yeni kayıt için geçmişteki aynı yöntem, boyut ve tohumlu en son
+    ölçümü bulur; oran = yeni / önceki en_iyi_sn (1'in üstü yavaşlama).
+    """
+    onceki = {}
+    for k in gecmis:
+        onceki[(k["yontem"], k["hat_sayisi"], k["durak_sayisi"], k["tohum"])] = k
+    sonuc = []
+    for k in yeni:
+        eski = onceki.get((k["yontem"], k["hat_sayisi"], k["durak_sayisi"], k["tohum"]))
+        if eski is not None and eski["en_iyi_sn"] > 0:
+            sonuc.append({
+                "yontem": k["yontem"],
+                "istasyon": k["istasyon"],
+                "onceki_commit": eski.get("commit"),
+                "oran": k["en_iyi_sn"] / eski["en_iyi_sn"],
+            })
+    return sonuc
+
+
+def _boyutlar(metin: str) -> List[Tuple[int, int]]:
+    boyutlar = []
+    for parca in metin.split(","):
+        hat, _, durak = parca.strip().partition("x")
+        boyutlar.append((int(hat), int(durak)))
+    return boyutlar
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ayristirici = argparse.ArgumentParser(description="MetroAgi kıyaslamaları")
+    ayristirici.add_argument("--boyutlar", default="4x25,8x50,16x100", help="hat x durak listesi, ör. 4x25,8x50")
+    ayristirici.add_argument("--tohum", type=int, default=0)
+    ayristirici.add_argument("--sorgu", type=int, default=20, help="boyut başına sorgu çifti")
+    ayristirici.add_argument("--tekrar", type=int, default=3)
+    ayristirici.add_argument("--yontem", default=None, help="yalnızca adında bu metin geçen yöntemler")
+    ayristirici.add_argument("--cikti", default=None, help="sonuçların ekleneceği JSON satırları dosyası")
+    ayristirici.add_argument("--dosya-yok", action="store_true", help="JSON ve snapshot kaydetme/yükleme ölçülmesin")
+    secenek = ayristirici.parse_args(argv)
+
+    gecmis = yukle(secenek.cikti) if secenek.cikti else []
+    kayitlar = kiyasla(
+        _boyutlar(secenek.boyutlar), secenek.tohum, secenek.sorgu, secenek.tekrar,
+        secenek.yontem, not secenek.dosya_yok,
+    )
+    for k in kayitlar:
+        print(
+            f"{k['yontem']:32} {k['istasyon']:>7} ist  {k['en_iyi_sn'] * 1e3:10.3f} ms"
+            f"  (ortanca {k['ortanca_sn'] * 1e3:.3f})  tepe {k['tepe_bellek_bayt'] / 1024:.0f} KiB"
+        )
+    print()
+    for ad, olcek in olcekleme(kayitlar).items():
+        us = "-" if olcek["us"] is None else f"{olcek['us']:.2f}"
+        print(f"{ad:32} ölçekleme üssü {us}")
+    degisim = egilim(gecmis, kayitlar)
+    if degisim:
+        print()
+        for d in degisim:
+            print(f"{d['yontem']:32} {d['istasyon']:>7} ist  x{d['oran']:.2f} ({d['onceki_commit']} sonrası)")
+    if secenek.cikti:
+        kaydet(kayitlar, secenek.cikti)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""
+MetroAgi için asyncio tabanlı yerel sorgu sunucusu.
+
+Ağ bir kez yüklenip derlenir ve süreç boyunca sıcak tutulur. İstemciler TCP
+ya da Unix soketi üzerinden JSON satırları gönderir; her istek bir "id"
+taşır ve cevaplar (sırası farklı olabilir) aynı id ile döner:
+
+    {"id": 1, "islem": "en_hizli", "baslangic": "K1", "hedef": "K4"}
+    {"id": 1, "sonuc": {"istasyonlar": ["K1", "K2", "K3", "K4"], "sure": 18, "maliyet": 18}}
+
+islem: en_hizli, en_az_aktarma, en_uygun (aktarma_cezasi), en_az_aktarmali,
+izokron (dakika), gecikme (guncellemeler: [[s1, s2, delay], ...]) ve durum.
+
+Tüm arama ve güncellemeler tek iş parçacıklı bir yürütücüde, geliş
+sırasıyla çalışır; olay döngüsü hiç bloklanmaz. MetroAgi önbellekleri
+iş parçacığı güvenli olmadığından ve saf Python aramalar GIL altında zaten
+paralelleşmediğinden tek işçi yeterlidir; aynı sıra gecikme güncellemelerini
+sorgular arasında atomik kılar. İşçi meşgulken biriken aynı kaynaklı
+en_hizli / en_az_aktarma / en_uygun istekleri tek bir EnKisaYolAgaci
+aramasıyla cevaplanır; henüz cevaplanmamış özdeş istekler aynı sonucu
+bekler. Birleştirme yalnızca aynı gecikme dönemi içinde yapılır: bir
+gecikme isteğinden sonra gelen sorgu her zaman güncel grafla cevaplanır.
+
+    python sorgu_sunucusu.py ag.json --port 8765
+    python sorgu_sunucusu.py ag.json --soket /tmp/metro.sock
+"""
+import argparse
+import asyncio
+import json
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+from ek_ozellıklı_proje import EnKisaYolAgaci, MetroAgi, Rota
+
+# Aynı kaynaktan toplu cevaplanabilen işlemler -> EnKisaYolAgaci türü
+_AGAC_ISLEMLERI = {
+    "en_hizli": "dijkstra",
+    "en_az_aktarma": "bfs",
+    "en_uygun": "dijkstra",
+}
+_SATIR_SINIRI = 1 << 20
+
+
+def _rota_sozlugu(rota: Optional[Rota], maliyet: Any = None) -> Optional[Dict[str, Any]]:
+    if rota is None:
+        return None
+    return {
+        "istasyonlar": [ist.idx for ist in rota],
+        "sure": rota.toplam_sure,
+        "maliyet": rota.toplam_sure if maliyet is None else maliyet,
+    }
+
+
+class SorguSunucusu:
+    def __init__(self, metro: MetroAgi, toplu_esik: int = 2):
+        """
+        toplu_esik: aynı kaynaktan bu kadar hedef birikince hedefler tek bir
+        kaynak ağacından cevaplanır; daha azı için noktadan noktaya arama
+        (MetroAgi önbellekleriyle) kullanılır.
+        """
+        self.metro = metro
+        self.toplu_esik = toplu_esik
+        self.istatistik = {"istek": 0, "birlestirilen": 0, "arama": 0, "toplu_arama": 0, "gecikme": 0}
+        self._yurutucu = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metro-sorgu")
+        # Henüz başlamamış işler: grup anahtarı -> {istek anahtarı: Future}.
+        self._gruplar: "OrderedDict[Hashable, Dict[Hashable, asyncio.Future]]" = OrderedDict()
+        # Cevabı beklenen (başlamış ya da sırada) özdeş istekler.
+        self._bekleyen: Dict[Hashable, asyncio.Future] = {}
+        self._is_var: Optional[asyncio.Event] = None
+        self._dagitici: Optional[asyncio.Task] = None
+        self._sunucu: Optional[asyncio.AbstractServer] = None
+        self._baglantilar: Set[asyncio.Task] = set()
+        # Her gecikme isteği dönemi artırır. Grup ve birleştirme anahtarları
+        # dönemi taşır; güncellemeden sonra gelen bir sorgu ondan önce
+        # sıraya girmiş işe katılamaz ve eski grafla cevaplanmaz.
+        self._donem = 0
+
+    @classmethod
+    def dosyadan(cls, file_path: str, **kwargs) -> "SorguSunucusu":
+        metro = MetroAgi()
+        metro.yukle_json(file_path)
+        return cls(metro, **kwargs)
+
+    async def baslat(self, host: str = "127.0.0.1", port: int = 8765, soket_yolu: Optional[str] = None) -> None:
+        """Ağı yürütücüde derler ve dinlemeye başlar; soket_yolu verilirse Unix soketi kullanılır."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._yurutucu, self.metro.compile)
+        self._is_var = asyncio.Event()
+        self._dagitici = asyncio.create_task(self._dagit())
+        if soket_yolu is not None:
+            self._sunucu = await asyncio.start_unix_server(self._baglanti, path=soket_yolu, limit=_SATIR_SINIRI)
+        else:
+            self._sunucu = await asyncio.start_server(self._baglanti, host, port, limit=_SATIR_SINIRI)
+
+    @property
+    def adresler(self) -> List[Any]:
+        return [s.getsockname() for s in self._sunucu.sockets] if self._sunucu else []
+
+    async def calis(self) -> None:
+        async with self._sunucu:
+            await self._sunucu.serve_forever()
+
+    async def kapat(self) -> None:
+        if self._sunucu is not None:
+            self._sunucu.close()
+        for gorev in list(self._baglantilar):
+            gorev.cancel()
+        await asyncio.gather(*self._baglantilar, return_exceptions=True)
+        if self._sunucu is not None:
+            await self._sunucu.wait_closed()
+        if self._dagitici is not None:
+            self._dagitici.cancel()
+            try:
+                await self._dagitici
+            except asyncio.CancelledError:
+                pass
+        for istekler in self._gruplar.values():
+            for fut in istekler.values():
+                if not fut.done():
+                    fut.cancel()
+        self._gruplar.clear()
+        self._bekleyen.clear()
+        self._yurutucu.shutdown(wait=True)
+
+    async def sorgula(self, istek: Dict[str, Any]) -> Any:
+        """Tek bir isteği (JSON nesnesi) işler ve JSON'a yazılabilir sonucu döndürür."""
+        self.istatistik["istek"] += 1
+        islem = istek.get("islem")
+        if islem == "durum":
+            return self._durum()
+        if islem == "gecikme":
+            guncellemeler = []
+            for s1, s2, d in istek["guncellemeler"]:
+                if isinstance(d, bool) or not isinstance(d, (int, float)):
+                    raise TypeError(f"gecikme sayı olmalı: {d!r}")
+                guncellemeler.append((str(s1), str(s2), d))
+            guncellemeler = tuple(guncellemeler)
+            self._donem += 1
+            self._bekleyen.clear()
+            anahtar = ("gecikme", guncellemeler)
+            return await self._sirala(anahtar, anahtar)
+
+        baslangic = str(istek["baslangic"])
+        if islem in _AGAC_ISLEMLERI:
+            ceza = int(istek.get("aktarma_cezasi", 5)) if islem == "en_uygun" else 0
+            hedef = str(istek["hedef"])
+            anahtar = (islem, baslangic, hedef, ceza)
+            grup = ("agac", _AGAC_ISLEMLERI[islem], baslangic, ceza)
+        elif islem == "en_az_aktarmali":
+            anahtar = (islem, baslangic, str(istek["hedef"]))
+            grup = anahtar
+        elif islem == "izokron":
+            anahtar = (islem, baslangic, float(istek["dakika"]), int(istek.get("aktarma_cezasi", 0)))
+            grup = anahtar
+        else:
+            raise ValueError(f"Bilinmeyen işlem: {islem}")
+        return await self._sirala(grup, anahtar)
+
+    async def _sirala(self, grup: Hashable, anahtar: Hashable) -> Any:
+        grup, anahtar = (self._donem, grup), (self._donem, anahtar)
+        fut = self._bekleyen.get(anahtar)
+        if fut is not None:
+            self.istatistik["birlestirilen"] += 1
+            return await asyncio.shield(fut)
+        fut = asyncio.get_running_loop().create_future()
+        self._bekleyen[anahtar] = fut
+        self._gruplar.setdefault(grup, {})[anahtar] = fut
+        self._is_var.set()
+        return await asyncio.shield(fut)
+
+    async def _dagit(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._is_var.wait()
+            self._is_var.clear()
+            while self._gruplar:
+                (_, grup), istekler = self._gruplar.popitem(last=False)
+                anahtarlar = [anahtar for _, anahtar in istekler]
+                try:
+                    sonuclar = await loop.run_in_executor(self._yurutucu, self._grup_isle, grup, anahtarlar)
+                except Exception as hata:
+                    sonuclar = None
+                    for anahtar, fut in istekler.items():
+                        self._bekleyen.pop(anahtar, None)
+                        if not fut.done():
+                            fut.set_exception(hata)
+                if sonuclar is not None:
+                    for anahtar, fut in istekler.items():
+                        self._bekleyen.pop(anahtar, None)
+                        if not fut.done():
+                            fut.set_result(sonuclar[anahtar[1]])
+
+    def _grup_isle(self, grup: Tuple, anahtarlar: List[Tuple]) -> Dict[Hashable, Any]:
+        """Yürütücü iş parçacığında çalışır; sonuçlar da burada (aynı graf hâliyle) kurulur."""
+        metro = self.metro
+        if grup[0] == "gecikme":
+            self.istatistik["gecikme"] += 1
+            guncellemeler = anahtarlar[0][1]
+            for s1, s2, _ in guncellemeler:
+                if s1 not in metro.istasyonlar or s2 not in metro.istasyonlar:
+                    raise ValueError(f"Bilinmeyen istasyon: {s1 if s1 not in metro.istasyonlar else s2}")
+            onarilan = metro.set_delays(guncellemeler)
+            return {anahtarlar[0]: {"surum": metro.surum, "onarilan": onarilan}}
+
+        if grup[0] == "agac" and len(anahtarlar) >= self.toplu_esik and grup[2] in metro.istasyonlar:
+            self.istatistik["toplu_arama"] += 1
+            _, tur, baslangic, ceza = grup
+            ag = metro.compile()
+            agac = EnKisaYolAgaci(ag, ag.indeks[baslangic], tur, ceza, metro.oncelik_kuyrugu)
+            sonuclar = {}
+            for anahtar in anahtarlar:
+                hedef = anahtar[2]
+                sonuc = agac.rota(ag.indeks[hedef]) if hedef in ag.indeks else None
+                if sonuc is None:
+                    sonuclar[anahtar] = None
+                elif tur == "bfs":
+                    sonuclar[anahtar] = _rota_sozlugu(sonuc[0])
+                else:
+                    sonuclar[anahtar] = _rota_sozlugu(*sonuc)
+            return sonuclar
+
+        self.istatistik["arama"] += len(anahtarlar)
+        return {anahtar: self._tek_sorgu(anahtar) for anahtar in anahtarlar}
+
+    def _tek_sorgu(self, anahtar: Tuple) -> Any:
+        metro = self.metro
+        islem, baslangic = anahtar[0], anahtar[1]
+        if islem == "en_hizli":
+            sonuc = metro.en_hizli_rota_bul(baslangic, anahtar[2])
+            return _rota_sozlugu(*sonuc) if sonuc else None
+        if islem == "en_az_aktarma":
+            return _rota_sozlugu(metro.en_az_aktarma_bul(baslangic, anahtar[2]))
+        if islem == "en_uygun":
+            sonuc = metro.en_uygun_rota(baslangic, anahtar[2], anahtar[3])
+            return _rota_sozlugu(*sonuc) if sonuc else None
+        if islem == "en_az_aktarmali":
+            sonuc = metro.en_az_aktarmali_rota(baslangic, anahtar[2])
+            if sonuc is None:
+                return None
+            rota, aktarma = sonuc
+            return dict(_rota_sozlugu(rota), aktarma=aktarma)
+        # izokron
+        return metro.izokron(baslangic, anahtar[2], anahtar[3])
+
+    def _durum(self) -> Dict[str, Any]:
+        return dict(
+            self.istatistik,
+            istasyon=len(self.metro.istasyonlar),
+            surum=self.metro.surum,
+            sirada=sum(len(istekler) for istekler in self._gruplar.values()),
+        )
+
+    async def _baglanti(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Her satır ayrı bir görevde işlenir; böylece bir bağlantıdaki istekler birlikte toplanabilir."""
+        self._baglantilar.add(asyncio.current_task())
+        gorevler = set()
+        try:
+            while True:
+                try:
+                    satir = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write((json.dumps({"id": None, "hata": "Satır çok uzun"}, ensure_ascii=False) + "\n").encode("utf-8"))
+                    break
+                if not satir:
+                    break
+                if not satir.strip():
+                    continue
+                gorev = asyncio.create_task(self._satir_isle(satir, writer))
+                gorevler.add(gorev)
+                gorev.add_done_callback(gorevler.discard)
+            if gorevler:
+                await asyncio.gather(*gorevler, return_exceptions=True)
+        except (ConnectionError, asyncio.CancelledError):
+            # kapat() bağlantıları iptal eder; görev sessizce biter.
+            pass
+        finally:
+            for gorev in gorevler:
+                gorev.cancel()
+            writer.close()
+            self._baglantilar.discard(asyncio.current_task())
+
+    async def _satir_isle(self, satir: bytes, writer: asyncio.StreamWriter) -> None:
+        istek_id = None
+        try:
+            istek = json.loads(satir)
+            if not isinstance(istek, dict):
+                raise ValueError("İstek bir JSON nesnesi olmalı")
+            istek_id = istek.get("id")
+            cevap = {"id": istek_id, "sonuc": await self.sorgula(istek)}
+        except asyncio.CancelledError:
+            raise
+        except (KeyError, TypeError) as hata:
+            cevap = {"id": istek_id, "hata": f"Eksik ya da hatalı alan: {hata}"}
+        except Exception as hata:
+            cevap = {"id": istek_id, "hata": str(hata)}
+        if writer.is_closing():
+            return
+        writer.write((json.dumps(cevap, ensure_ascii=False) + "\n").encode("utf-8"))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+
+async def _ana(secenek: argparse.Namespace) -> None:
+    sunucu = SorguSunucusu.dosyadan(secenek.ag, toplu_esik=secenek.toplu_esik)
+    await sunucu.baslat(secenek.host, secenek.port, secenek.soket)
+    print(f"{len(sunucu.metro.istasyonlar)} istasyon yüklendi; dinleniyor: {sunucu.adresler}")
+    try:
+        await sunucu.calis()
+    finally:
+        await sunucu.kapat()
+
+
+if __name__ == "__main__":
+    ayristirici = argparse.ArgumentParser(description="MetroAgi sorgu sunucusu (JSON satırları)")
+    ayristirici.add_argument("ag", help="yukle_json biçiminde ağ dosyası")
+    ayristirici.add_argument("--host", default="127.0.0.1")
+    ayristirici.add_argument("--port", type=int, default=8765)
+    ayristirici.add_argument("--soket", default=None, help="TCP yerine Unix soketi yolu")
+    ayristirici.add_argument("--toplu-esik", type=int, default=2)
+    try:
+        asyncio.run(_ana(ayristirici.parse_args()))
+    except KeyboardInterrupt:
+        sys.exit(0)
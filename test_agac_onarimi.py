@@ -0,0 +1,64 @@
+import random
+import unittest
+
+from ek_ozellıklı_proje import EnKisaYolAgaci, MetroAgi
+
+
+def _rastgele_ag(r: random.Random) -> MetroAgi:
+    metro = MetroAgi()
+    for h in range(r.randint(2, 4)):
+        for i in range(r.randint(3, 8)):
+            metro.istasyon_ekle(f"H{h}_{i}", f"H{h}_{i}", f"Hat {h}")
+            if i:
+                metro.baglanti_ekle(f"H{h}_{i - 1}", f"H{h}_{i}", r.randint(1, 6))
+    idler = list(metro.istasyonlar)
+    for _ in range(r.randint(1, 6)):
+        a, b = r.sample(idler, 2)
+        metro.baglanti_ekle(a, b, r.randint(1, 6))
+    return metro
+
+
+class AgacOnarimiTesti(unittest.TestCase):
+    def _agac_dogru(self, agac: EnKisaYolAgaci) -> None:
+        ag = agac.ag
+        taze = EnKisaYolAgaci(ag, agac.kaynak, agac.tur, agac.aktarma_cezasi)
+        self.assertEqual(list(agac.mesafe), list(taze.mesafe))
+        for v, u in enumerate(agac.onceki):
+            if v == agac.kaynak:
+                self.assertEqual(u, v)
+            elif u == -1:
+                self.assertEqual(taze.onceki[v], -1)
+            else:
+                # Öncül kenarı var olmalı ve mesafeyi tam olarak vermeli.
+                w = min(ag.agirlik[e] for e in range(ag.ofset[u], ag.ofset[u + 1]) if ag.komsu[e] == v)
+                if agac.aktarma_cezasi and ag.hat_no[u] != ag.hat_no[v]:
+                    w += agac.aktarma_cezasi
+                self.assertEqual(agac.mesafe[u] + w, agac.mesafe[v])
+
+    def test_artan_ve_azalan_gecikmelerden_sonra_agaclar_taze_ile_ayni(self):
+        for tohum in range(80):
+            with self.subTest(tohum=tohum):
+                r = random.Random(tohum)
+                metro = _rastgele_ag(r)
+                idler = list(metro.istasyonlar)
+                baglantilar = sorted({
+                    tuple(sorted((ist.idx, k.idx)))
+                    for ist in metro.istasyonlar.values() for k, _ in ist.komsular
+                })
+                # agac_esigi kadar ıska: her kaynağın ağacı saklanır.
+                for kaynak in r.sample(idler, 3):
+                    for hedef in r.sample(idler, metro.agac_esigi + 1):
+                        metro.en_hizli_rota_bul(kaynak, hedef)
+                        metro.en_uygun_rota(kaynak, hedef, aktarma_cezasi=3)
+                agaclar = metro.agac_onbellegi.degerler()
+                self.assertEqual(len(agaclar), 6)
+
+                for _ in range(4):
+                    if r.random() < 0.5:
+                        a, b = r.choice(baglantilar)
+                        metro.set_delay(a, b, r.choice((0, 1, 4, 10)))
+                    else:
+                        metro.set_delays([(*r.choice(baglantilar), r.choice((0, 0, 2, 7))) for _ in range(3)])
+                    self.assertEqual(metro.agac_onbellegi.degerler(), agaclar)
+                    for agac in agaclar:
+                        self._agac_dogru(agac)
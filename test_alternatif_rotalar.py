@@ -0,0 +1,48 @@
+import unittest
+
+from ek_ozellıklı_proje import MetroAgi
+
+
+def _ag() -> MetroAgi:
+    metro = MetroAgi()
+    for idx, hat in (("A1", "A"), ("A2", "A"), ("A3", "A"), ("B1", "B"), ("B2", "B")):
+        metro.istasyon_ekle(idx, idx, hat)
+    for a, b, sure in (("A1", "A2", 2), ("A2", "A3", 2), ("A1", "B1", 1), ("B1", "B2", 1), ("B2", "A3", 1), ("A2", "B2", 1)):
+        metro.baglanti_ekle(a, b, sure)
+    return metro
+
+
+class AlternatifRotalarTesti(unittest.TestCase):
+    def _rotalar(self, metro: MetroAgi, ceza: int):
+        return [
+            ([ist.idx for ist in rota], maliyet)
+            for rota, maliyet in metro.alternatif_rotalar("A1", "A3", aktarma_cezasi=ceza, ayni_ad_tekrarini_atla=False)
+        ]
+
+    def test_dongusuz_yollar_maliyet_sirasinda(self):
+        rotalar = self._rotalar(_ag(), 0)
+        self.assertEqual([m for _, m in rotalar], [3, 4, 4, 5])
+        self.assertEqual(rotalar[0][0], ["A1", "B1", "B2", "A3"])
+        self.assertEqual(
+            sorted(y for y, _ in rotalar[1:3]),
+            [["A1", "A2", "A3"], ["A1", "A2", "B2", "A3"]],
+        )
+        self.assertEqual(rotalar[3][0], ["A1", "B1", "B2", "A2", "A3"])
+        self.assertTrue(all(len(set(y)) == len(y) for y, _ in rotalar))
+
+    def test_aktarma_cezasi_sirayi_degistirir(self):
+        self.assertEqual(self._rotalar(_ag(), 2), [
+            (["A1", "A2", "A3"], 4),
+            (["A1", "B1", "B2", "A3"], 7),
+            (["A1", "A2", "B2", "A3"], 8),
+            (["A1", "B1", "B2", "A2", "A3"], 9),
+        ])
+
+    def test_ilk_rota_en_hizli_ile_ayni_maliyette(self):
+        metro = _ag()
+        ilk = next(metro.alternatif_rotalar("A1", "A3"))
+        self.assertEqual(ilk[1], metro.en_hizli_rota_bul("A1", "A3")[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
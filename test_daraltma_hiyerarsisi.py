@@ -0,0 +1,93 @@
+import os
+import random
+import tempfile
+import unittest
+
+from daraltma_hiyerarsisi import DaraltmaHiyerarsisi
+from ek_ozellıklı_proje import MetroAgi
+
+
+def _rastgele_ag(r: random.Random) -> MetroAgi:
+    metro = MetroAgi()
+    idler = []
+    for h in range(r.randint(1, 4)):
+        for i in range(r.randint(2, 7)):
+            idx = f"H{h}_{i}"
+            metro.istasyon_ekle(idx, idx, f"Hat {h}")
+            if i:
+                metro.baglanti_ekle(f"H{h}_{i - 1}", idx, r.randint(1, 6))
+            idler.append(idx)
+    for _ in range(r.randint(0, 6)):
+        a, b = r.sample(idler, 2)
+        metro.baglanti_ekle(a, b, r.randint(1, 6))
+    return metro
+
+
+def _baglantilar(metro: MetroAgi):
+    return sorted({tuple(sorted((ist.idx, k.idx))) for ist in metro.istasyonlar.values() for k, _ in ist.komsular})
+
+
+class DaraltmaHiyerarsisiTesti(unittest.TestCase):
+    def _karsilastir(self, metro: MetroAgi, ch: DaraltmaHiyerarsisi) -> None:
+        ag = metro.compile()
+        idler = list(metro.istasyonlar)
+        for a in idler:
+            for b in idler:
+                beklenen = metro.en_hizli_rota_bul(a, b)
+                sonuc = ch.en_hizli_rota_bul(a, b)
+                if beklenen is None:
+                    self.assertIsNone(sonuc, (a, b))
+                    continue
+                rota, sure = sonuc
+                self.assertEqual(sure, beklenen[1], (a, b))
+                self.assertEqual((rota[0].idx, rota[-1].idx), (a, b))
+                self.assertEqual(ag.yol_suresi(rota.indeksler), sure, (a, b))
+
+    def test_tanik_kenari_artinca_atlanan_kisayol_eklenir(self):
+        # S0 daraltılırken S3-S4 kısayolu S3-S2-S4 tanığı (3 < 4) yüzünden
+        # eklenmez; tanık pahalanınca S0'dan itibaren yeniden daraltılmalı.
+        metro = MetroAgi()
+        for idx in ("S0", "S2", "S3", "S4"):
+            metro.istasyon_ekle(idx, idx, "Hat")
+        metro.baglanti_ekle("S0", "S4", 2)
+        metro.baglanti_ekle("S2", "S4", 1)
+        metro.baglanti_ekle("S2", "S3", 2)
+        metro.baglanti_ekle("S3", "S0", 2)
+        ch = DaraltmaHiyerarsisi(metro)
+        self.assertEqual(ch.en_hizli_rota_bul("S3", "S4")[1], 3)
+
+        metro.set_delay("S2", "S4", 3)
+        rota, sure = ch.en_hizli_rota_bul("S3", "S4")
+        self.assertEqual(sure, 4)
+        self.assertEqual([ist.idx for ist in rota], ["S3", "S0", "S4"])
+
+        # Kısayolun alt kenarı pahalanır, sonra gecikmeler kalkar.
+        metro.set_delay("S0", "S4", 5)
+        self.assertEqual(ch.en_hizli_rota_bul("S3", "S4")[1], 6)
+        metro.set_delay("S0", "S4", 0)
+        metro.set_delay("S2", "S4", 0)
+        self.assertEqual(ch.en_hizli_rota_bul("S3", "S4")[1], 3)
+        self._karsilastir(metro, ch)
+
+    def test_rastgele_aglar_gecikmeler_ve_kaydet_yukle(self):
+        fd, yol = tempfile.mkstemp(suffix=".mtch")
+        os.close(fd)
+        self.addCleanup(os.remove, yol)
+        for tohum in range(150):
+            with self.subTest(tohum=tohum):
+                r = random.Random(tohum)
+                metro = _rastgele_ag(r)
+                ch = DaraltmaHiyerarsisi(metro, tanik_siniri=r.choice((1, 3, 60)))
+                self._karsilastir(metro, ch)
+                baglantilar = _baglantilar(metro)
+                for _ in range(r.randint(1, 4)):
+                    a, b = r.choice(baglantilar)
+                    metro.set_delay(a, b, r.choice((0, 0, 1, 3, 8)))
+                    self._karsilastir(metro, ch)
+                ch.kaydet(yol)
+                metro.gecikme_dinleyicisi_cikar(ch._gecikme_degisti)
+                # Dosyadan sonra değişen gecikmeler yüklemede yakalanmalı.
+                for _ in range(r.randint(0, 3)):
+                    a, b = r.choice(baglantilar)
+                    metro.set_delay(a, b, r.choice((0, 2, 9)))
+                self._karsilastir(metro, DaraltmaHiyerarsisi.yukle(yol, metro))
@@ -0,0 +1,44 @@
+import unittest
+
+from ek_ozellıklı_proje import MetroAgi
+
+
+def _ag() -> MetroAgi:
+    metro = MetroAgi()
+    for idx, hat in (("A1", "A"), ("A2", "A"), ("A3", "A"), ("B1", "B"), ("B2", "B"), ("C1", "C"), ("C2", "C"), ("C3", "C")):
+        metro.istasyon_ekle(idx, idx, hat)
+    for a, b, sure in (
+        ("A1", "A2", 1), ("A2", "A3", 1), ("B1", "B2", 1), ("C1", "C2", 1), ("C2", "C3", 1),
+        ("A3", "C1", 20),  # 1 aktarma, 23 dk
+        ("A1", "C3", 30),  # 1 aktarma, 31 dk
+        ("A2", "B1", 1), ("B2", "C2", 1),  # 2 aktarma, 4 dk
+    ):
+        metro.baglanti_ekle(a, b, sure)
+    return metro
+
+
+class EnAzAktarmaTesti(unittest.TestCase):
+    def test_once_aktarma_sonra_dakika(self):
+        metro = _ag()
+        self.assertEqual(metro.en_hizli_rota_bul("A1", "C2")[1], 4)
+        rota, aktarma = metro.en_az_aktarmali_rota("A1", "C2")
+        self.assertEqual(aktarma, 1)
+        self.assertEqual([ist.idx for ist in rota], ["A1", "A2", "A3", "C1", "C2"])
+        self.assertEqual(rota.toplam_sure, 23)
+
+    def test_gecikme_esit_aktarmada_digerini_sectirir(self):
+        metro = _ag()
+        metro.set_delay("A3", "C1", 20)
+        rota, aktarma = metro.en_az_aktarmali_rota("A1", "C2")
+        self.assertEqual(aktarma, 1)
+        self.assertEqual([ist.idx for ist in rota], ["A1", "C3", "C2"])
+        self.assertEqual(rota.toplam_sure, 31)
+
+    def test_ulasilamayan_hedef(self):
+        metro = _ag()
+        metro.istasyon_ekle("D1", "D1", "D")
+        self.assertIsNone(metro.en_az_aktarmali_rota("A1", "D1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
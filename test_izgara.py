@@ -0,0 +1,33 @@
+import math
+import random
+import time
+import unittest
+
+from ek_ozellıklı_proje import Istasyon, IzgaraIndeksi
+
+
+class IzgaraTesti(unittest.TestCase):
+    def test_kaba_kuvvetle_ayni(self):
+        r = random.Random(4)
+        for _ in range(100):
+            istasyonlar = [Istasyon(str(i), str(i), "h", r.uniform(-5, 5), r.uniform(-5, 5)) for i in range(r.randint(1, 40))]
+            izgara = IzgaraIndeksi(istasyonlar)
+            for _ in range(5):
+                x, y = r.uniform(-50, 50) * r.choice([1, 100]), r.uniform(-50, 50)
+                k = r.randint(1, 5)
+                beklenen = sorted(math.hypot(s.x - x, s.y - y) for s in istasyonlar)[:k]
+                bulunan = [d for _, d in izgara.en_yakin(x, y, k)]
+                self.assertEqual(len(bulunan), len(beklenen))
+                for a, b in zip(bulunan, beklenen):
+                    self.assertAlmostEqual(a, b)
+
+    def test_uzak_nokta_hizli(self):
+        r = random.Random(1)
+        izgara = IzgaraIndeksi([Istasyon(str(i), str(i), "h", r.uniform(0, 10), r.uniform(0, 10)) for i in range(200)])
+        baslangic = time.perf_counter()
+        izgara.en_yakin(3000, -3000, 3)
+        self.assertLess(time.perf_counter() - baslangic, 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from ek_ozellıklı_proje import MetroAgi
+
+
+def _ag() -> MetroAgi:
+    metro = MetroAgi()
+    for idx, hat in (
+        ("A1", "A"), ("A2", "A"), ("A3", "A"), ("B1", "B"), ("B2", "B"), ("C1", "C"), ("C2", "C"),
+        ("D1", "D"), ("D2", "D"), ("E1", "E"), ("E2", "E"),
+    ):
+        metro.istasyon_ekle(idx, idx, hat)
+    for a, b, sure in (
+        ("A1", "A2", 50), ("A2", "B1", 5), ("B1", "B2", 5),  # 1 aktarma, 60 dk
+        ("A1", "C1", 5), ("C1", "C2", 25), ("C2", "B2", 10),  # 2 aktarma, 40 dk
+        ("A1", "A3", 1), ("A3", "C2", 50),  # C2'ye 1 aktarma ama 51 dk: baskılanır
+        ("A1", "D1", 1), ("D1", "D2", 1), ("D2", "E1", 1), ("E1", "E2", 1), ("E2", "B2", 6),  # 3 aktarma, 10 dk
+    ):
+        metro.baglanti_ekle(a, b, sure)
+    return metro
+
+
+class ParetoTesti(unittest.TestCase):
+    def test_uzlasma_rotasi_dahil_tum_cephe(self):
+        metro = _ag()
+        cephe = [
+            ([ist.idx for ist in rota], rota.toplam_sure, aktarma)
+            for rota, aktarma in metro.pareto_rotalar("A1", "B2")
+        ]
+        self.assertEqual(cephe, [
+            (["A1", "D1", "D2", "E1", "E2", "B2"], 10, 3),
+            (["A1", "C1", "C2", "B2"], 40, 2),
+            (["A1", "A2", "B1", "B2"], 60, 1),
+        ])
+
+    def test_uzlasma_rotasi_hicbir_cezayla_bulunmaz(self):
+        # (40, 2) noktası (10, 3)-(60, 1) doğrusunun üstünde kalır.
+        metro = _ag()
+        for ceza in range(0, 61):
+            rota, _ = metro.en_uygun_rota("A1", "B2", aktarma_cezasi=ceza)
+            self.assertNotEqual([ist.idx for ist in rota], ["A1", "C1", "C2", "B2"], ceza)
+
+
+if __name__ == "__main__":
+    unittest.main()
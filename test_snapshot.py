@@ -0,0 +1,76 @@
+import os
+import random
+import tempfile
+import unittest
+
+from ek_ozellıklı_proje import MetroAgi
+
+
+def _ag(hat_sayisi: int, durak_sayisi: int, tohum: int) -> MetroAgi:
+    r = random.Random(tohum)
+    metro = MetroAgi()
+    for h in range(1, hat_sayisi + 1):
+        for i in range(1, durak_sayisi + 1):
+            metro.istasyon_ekle(f"H{h}_{i}", f"Hat {h} Durak {i}", f"Hat {h}")
+            if i > 1:
+                metro.baglanti_ekle(f"H{h}_{i - 1}", f"H{h}_{i}", r.randint(1, 5))
+    for h in range(1, hat_sayisi):
+        for _ in range(2):
+            a, b = r.randint(1, durak_sayisi), r.randint(1, durak_sayisi)
+            metro.baglanti_ekle(f"H{h}_{a}", f"H{h + 1}_{b}", r.randint(1, 4))
+    return metro
+
+
+class SnapshotTesti(unittest.TestCase):
+    def setUp(self):
+        self.kaynak = _ag(4, 20, tohum=3)
+        fd, self.yol = tempfile.mkstemp(suffix=".mtsn")
+        os.close(fd)
+        self.addCleanup(os.remove, self.yol)
+        self.kaynak.kaydet_snapshot(self.yol)
+
+    def test_komsular_tembel_ve_sorgular_ayni(self):
+        metro = MetroAgi()
+        metro.yukle_snapshot(self.yol)
+        self.assertTrue(all(ist._tembel_komsu is not None for ist in metro.istasyonlar.values()))
+        for a, b in (("H1_1", "H4_20"), ("H2_5", "H3_17")):
+            self.assertEqual(metro.en_hizli_rota_bul(a, b)[1], self.kaynak.en_hizli_rota_bul(a, b)[1])
+        self.assertTrue(all(ist._tembel_komsu is not None for ist in metro.istasyonlar.values()))
+        ist = metro.istasyonlar["H1_2"]
+        self.assertEqual(
+            [(k.idx, s) for k, s in ist.komsular],
+            [(k.idx, s) for k, s in self.kaynak.istasyonlar["H1_2"].komsular],
+        )
+        metro.snapshot_kapat()
+
+    def test_kapatinca_esleme_birakilir_rota_calisir(self):
+        metro = MetroAgi()
+        metro.yukle_snapshot(self.yol)
+        mm = metro._snapshot[0]
+        rota, sure = metro.en_hizli_rota_bul("H1_1", "H4_20")
+        metro.snapshot_kapat()
+        self.assertTrue(mm.closed)
+        self.assertIsNone(metro._snapshot)
+        self.assertEqual(rota.toplam_sure, sure)
+        self.assertEqual(metro.en_hizli_rota_bul("H1_1", "H4_20")[1], sure)
+
+    def test_graf_degisince_ve_yeniden_yuklemede_kapanir(self):
+        metro = MetroAgi()
+        metro.yukle_snapshot(self.yol)
+        mm = metro._snapshot[0]
+        metro.istasyon_ekle("YENI", "Yeni", "Hat 1")
+        metro.baglanti_ekle("YENI", "H1_1", 2)
+        self.assertTrue(mm.closed)
+        self.assertEqual(metro.en_hizli_rota_bul("YENI", "H1_2")[1], 2 + self.kaynak.en_hizli_rota_bul("H1_1", "H1_2")[1])
+
+        ikinci = MetroAgi()
+        ikinci.yukle_snapshot(self.yol)
+        ilk = ikinci._snapshot[0]
+        # Dolu ağa yükleme bağlantıları tek tek ekler; eski eşleme kapanır, yenisi tutulmaz.
+        ikinci.yukle_snapshot(self.yol)
+        self.assertTrue(ilk.closed)
+        self.assertIsNone(ikinci._snapshot)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import unittest
+
+from ek_ozellıklı_proje import MetroAgi
+from sorgu_sunucusu import SorguSunucusu
+
+
+def _ucgen() -> MetroAgi:
+    metro = MetroAgi()
+    for idx in ("A0", "A1", "A2"):
+        metro.istasyon_ekle(idx, idx, "A")
+    metro.baglanti_ekle("A0", "A1", 1)
+    metro.baglanti_ekle("A1", "A2", 1)
+    metro.baglanti_ekle("A0", "A2", 5)
+    return metro
+
+
+class GecikmeSirasiTesti(unittest.TestCase):
+    def test_gecikmeden_sonraki_sorgu_eski_ise_katilmaz(self):
+        async def senaryo():
+            sunucu = SorguSunucusu(_ucgen())
+            await sunucu.baslat(port=0)
+            engel = threading.Event()
+            try:
+                # İşçiyi meşgul tut; sonraki istekler sırada birikir.
+                asyncio.get_running_loop().run_in_executor(sunucu._yurutucu, engel.wait)
+                en_hizli = {"islem": "en_hizli", "baslangic": "A0", "hedef": "A2"}
+                gorevler = [
+                    asyncio.create_task(sunucu.sorgula({"islem": "izokron", "baslangic": "A0", "dakika": 10})),
+                    asyncio.create_task(sunucu.sorgula(en_hizli)),
+                    asyncio.create_task(sunucu.sorgula({"islem": "gecikme", "guncellemeler": [["A1", "A2", 100]]})),
+                    asyncio.create_task(sunucu.sorgula(dict(en_hizli))),
+                ]
+                await asyncio.sleep(0.05)
+                engel.set()
+                return await asyncio.gather(*gorevler)
+            finally:
+                engel.set()
+                await sunucu.kapat()
+
+        _, once, _, sonra = asyncio.run(senaryo())
+        self.assertEqual(once["istasyonlar"], ["A0", "A1", "A2"])
+        self.assertEqual(once["maliyet"], 2)
+        self.assertEqual(sonra["istasyonlar"], ["A0", "A2"])
+        self.assertEqual(sonra["maliyet"], 5)
+
+    def test_ayni_donemde_ozdes_istekler_birlesir(self):
+        async def senaryo():
+            sunucu = SorguSunucusu(_ucgen())
+            await sunucu.baslat(port=0)
+            engel = threading.Event()
+            try:
+                asyncio.get_running_loop().run_in_executor(sunucu._yurutucu, engel.wait)
+                istek = {"islem": "en_hizli", "baslangic": "A0", "hedef": "A2"}
+                gorevler = [asyncio.create_task(sunucu.sorgula(dict(istek))) for _ in range(3)]
+                await asyncio.sleep(0.05)
+                engel.set()
+                return await asyncio.gather(*gorevler), sunucu.istatistik["birlestirilen"]
+            finally:
+                engel.set()
+                await sunucu.kapat()
+
+        sonuclar, birlestirilen = asyncio.run(senaryo())
+        self.assertEqual(birlestirilen, 2)
+        self.assertTrue(all(s["maliyet"] == 2 for s in sonuclar))
+
+    def test_kesirli_gecikme_aynen_uygulanir_sayi_olmayan_reddedilir(self):
+        async def senaryo():
+            sunucu = SorguSunucusu(_ucgen())
+            await sunucu.baslat(port=0)
+            try:
+                await sunucu.sorgula({"islem": "gecikme", "guncellemeler": [["A1", "A2", 2.5]]})
+                sonuc = await sunucu.sorgula({"islem": "en_hizli", "baslangic": "A0", "hedef": "A2"})
+                with self.assertRaises(TypeError):
+                    await sunucu.sorgula({"islem": "gecikme", "guncellemeler": [["A1", "A2", "3"]]})
+                return sonuc, dict(sunucu.metro.delays)
+            finally:
+                await sunucu.kapat()
+
+        sonuc, gecikmeler = asyncio.run(senaryo())
+        self.assertEqual(sonuc["maliyet"], 4.5)
+        self.assertEqual(gecikmeler, {("A1", "A2"): 2.5})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import json
+import os
+import tempfile
+import unittest
+
+from ek_ozellıklı_proje import MetroAgi
+
+
+class YukleJsonTesti(unittest.TestCase):
+    def _dosya(self, veri) -> str:
+        fd, yol = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(veri, f)
+        self.addCleanup(os.remove, yol)
+        return yol
+
+    def _ag(self, gecikme) -> dict:
+        return {
+            "stations": [
+                {"idx": "K1", "ad": "Kızılay", "hat": "Kırmızı Hat"},
+                {"idx": "K2", "ad": "Ulus", "hat": "Kırmızı Hat"},
+            ],
+            "connections": [{"s1": "K1", "s2": "K2", "sure": 4}],
+            "delays": [{"s1": "K1", "s2": "K2", "delay": gecikme}],
+        }
+
+    def test_gecersiz_gecikme_agi_degistirmez(self):
+        for gecikme in ("x", True, None, [1]):
+            with self.subTest(gecikme=gecikme):
+                metro = MetroAgi()
+                with self.assertRaises(ValueError):
+                    metro.yukle_json(self._dosya(self._ag(gecikme)))
+                self.assertEqual(metro.istasyonlar, {})
+                self.assertEqual(metro.delays, {})
+
+    def test_sayisal_gecikme_uygulanir(self):
+        metro = MetroAgi()
+        metro.yukle_json(self._dosya(self._ag(2)))
+        self.assertEqual(metro.en_hizli_rota_bul("K1", "K2")[1], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from ek_ozellıklı_proje import MetroAgi
+from zaman_cizelgesi import ZamanCizelgesi
+
+
+class ProfilTesti(unittest.TestCase):
+    def test_zincirlenmis_yurume_ile_ulasilan_duraktan_kalkislar(self):
+        # S1 -> B1 -> C1 yalnızca iki yürüme bağlantısıyla ulaşılır; sefer
+        # yalnızca C hattında var.
+        metro = MetroAgi()
+        for idx, hat in (("S1", "S"), ("S2", "S"), ("B1", "B"), ("B2", "B"), ("C1", "C"), ("C2", "C")):
+            metro.istasyon_ekle(idx, idx, hat)
+        metro.baglanti_ekle("S1", "S2", 3)
+        metro.baglanti_ekle("B1", "B2", 3)
+        metro.baglanti_ekle("C1", "C2", 4)
+        metro.baglanti_ekle("S1", "B1", 2)
+        metro.baglanti_ekle("B1", "C1", 3)
+        cizelge = ZamanCizelgesi(metro)
+        cizelge.duzenli_seferler("C", "08:00", "08:30", 10)
+
+        tek = cizelge.en_erken_varis("S1", "C2", "07:55")
+        self.assertIsNotNone(tek)
+        profil = cizelge.profil("S1", "C2", "07:50", "08:30")
+        self.assertEqual([y.kalkis for y in profil], [475, 485, 495, 505])
+        self.assertIn(tek.varis, [y.varis for y in profil])
+
+
+if __name__ == "__main__":
+    unittest.main()
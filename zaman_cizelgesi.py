@@ -0,0 +1,415 @@
+"""
+MetroAgi için sefer çizelgesi ve RAPTOR (Round-bAsed Public Transit Optimized Router).
+
+Her hattın MetroAgi.hatlar'daki istasyon sırası bir güzergâhtır; seferler bu
+sırada (ya da ters yönde) her durağa varış dakikasıyla eklenir. Sorgular
+düz dizilere derlenmiş çizelge üzerinde tur tur çalışır: k. tur en fazla k
+sefer kullanan en erken varışları verir. Hatlar arası yürüme, farklı
+hatlardaki istasyonları birleştiren baglanti_ekle bağlantılarıdır; her turun
+sonunda bu bağlantılar üzerinden zincirleme yüründüğü için ayrıca geçişli
+kapanış gerekmez.
+
+Zamanlar gece yarısından itibaren dakikadır; "08:14" biçimi de kabul edilir.
+"""
+import heapq
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+from ek_ozellıklı_proje import DerlenmisAg, MetroAgi, Rota
+
+_SONSUZ = float("inf")
+
+Zaman = Union[int, float, str]
+
+
+def dakika(zaman: Zaman) -> float:
+    """"SS:DD" metnini ya da sayıyı gece yarısından itibaren dakikaya çevirir."""
+    if isinstance(zaman, str):
+        saat, _, dk = zaman.partition(":")
+        return int(saat) * 60 + int(dk or 0)
+    return zaman
+
+
+def saat(zaman: float) -> str:
+    """Dakikayı "SS:DD" biçiminde yazar."""
+    zaman = int(round(zaman))
+    return f"{zaman // 60:02d}:{zaman % 60:02d}"
+
+
+class Yolculuk:
+    """
+    Bir RAPTOR sorgusunun sonucu. bacaklar sırasıyla
+    ("sefer", hat, binis_id, inis_id, kalkis, varis) ya da
+    ("yurume", None, baslangic_id, bitis_id, kalkis, varis) demetleridir.
+    rota ziyaret edilen istasyonlardır; toplam_sure beklemeler dahil süredir.
+    """
+    __slots__ = ("kalkis", "varis", "aktarma", "bacaklar", "rota")
+
+    def __init__(self, kalkis: float, varis: float, bacaklar: List[Tuple], rota: Rota):
+        self.kalkis = kalkis
+        self.varis = varis
+        self.bacaklar = bacaklar
+        self.aktarma = max(sum(1 for b in bacaklar if b[0] == "sefer") - 1, 0)
+        self.rota = rota
+
+    def __repr__(self) -> str:
+        return f"Yolculuk({saat(self.kalkis)} -> {saat(self.varis)}, {self.aktarma} aktarma)"
+
+
+class ZamanCizelgesi:
+    def __init__(self, metro: MetroAgi):
+        """
+        metro.hatlar üzerine sefer saatleri ekler. Çizelge ilk sorguda ve
+        sefer ya da ağ değiştikten sonraki ilk sorguda düz dizilere derlenir.
+        """
+        self.metro = metro
+        self._seferler: Dict[Tuple[str, bool], List[array]] = {}
+        self._surum = 0
+        self._derlenen: Optional[Tuple[int, int]] = None
+
+    def sefer_ekle(self, hat: str, varislar: List[Zaman], ters: bool = False) -> None:
+        """
+        hat üzerindeki her istasyona sırayla varış zamanlarını veren bir
+        sefer ekler; ters=True ise liste hattın son istasyonundan başlar.
+        Duraklarda bekleme yoktur (varış = kalkış).
+        """
+        duraklar = self.metro.hatlar.get(hat)
+        if not duraklar:
+            raise KeyError(f"Bilinmeyen hat: {hat}")
+        if len(varislar) != len(duraklar):
+            raise ValueError(f"{hat}: {len(duraklar)} durak için {len(varislar)} zaman verildi")
+        zamanlar = array("d", (dakika(z) for z in varislar))
+        if any(a > b for a, b in zip(zamanlar, zamanlar[1:])):
+            raise ValueError(f"{hat}: sefer zamanları azalmamalı")
+        self._seferler.setdefault((hat, ters), []).append(zamanlar)
+        self._surum += 1
+
+    def duzenli_seferler(self, hat: str, ilk: Zaman, son: Zaman, aralik: float, ters: bool = False) -> int:
+        """
+        ilk..son arasında her aralik dakikada bir hattın ilk durağından
+        kalkan seferler ekler. Duraklar arası süre baglanti_ekle'deki
+        (gecikmesiz) süredir; ardışık duraklar bağlı olmalıdır. Eklenen
+        sefer sayısını döndürür.
+        """
+        ag = self.metro.compile()
+        duraklar = [ag.indeks[ist.idx] for ist in self.metro.hatlar[hat]]
+        if ters:
+            duraklar.reverse()
+        adimlar = [0.0]
+        for u, v in zip(duraklar, duraklar[1:]):
+            sureler = [ag.sure[e] for e in range(ag.ofset[u], ag.ofset[u + 1]) if ag.komsu[e] == v]
+            if not sureler:
+                raise ValueError(f"{hat}: {ag.istasyonlar[u].idx} ile {ag.istasyonlar[v].idx} bağlı değil")
+            adimlar.append(adimlar[-1] + min(sureler))
+
+        kalkis, son = dakika(ilk), dakika(son)
+        adet = 0
+        while kalkis <= son:
+            self.sefer_ekle(hat, [kalkis + a for a in adimlar], ters)
+            kalkis += aralik
+            adet += 1
+        return adet
+
+    def _derle(self) -> DerlenmisAg:
+        """
+        Güzergâhları düz dizilere çevirir: p. güzergâhın durakları
+        p_duraklar[p_ofset[p]:p_ofset[p+1]], t. seferinin i. durağa varışı
+        zaman[z_ofset[p] + t * L + i] (L durak sayısı). Seferler kalkışa göre
+        sıralanır; bir sefer öndekini geçemez (FIFO).
+        """
+        ag = self.metro.compile()
+        anahtar = (self._surum, self.metro.surum)
+        if self._derlenen == anahtar and self._ag is ag:
+            return ag
+
+        n = len(ag)
+        p_ofset, p_duraklar = array("i", [0]), array("i")
+        z_ofset, sefer_sayisi, zaman = array("i"), array("i"), array("d")
+        self.p_hat: List[str] = []
+        rotalari: List[List[Tuple[int, int]]] = [[] for _ in range(n)]
+        for (hat, ters), seferler in self._seferler.items():
+            duraklar = [ag.indeks[ist.idx] for ist in self.metro.hatlar[hat]]
+            if ters:
+                duraklar.reverse()
+            seferler = sorted(seferler, key=lambda s: s[0])
+            for onceki, sonraki in zip(seferler, seferler[1:]):
+                if any(a > b for a, b in zip(onceki, sonraki)):
+                    raise ValueError(f"{hat}: seferler birbirini geçemez")
+            p = len(self.p_hat)
+            self.p_hat.append(hat)
+            for i, s in enumerate(duraklar):
+                rotalari[s].append((p, i))
+            p_duraklar.extend(duraklar)
+            p_ofset.append(len(p_duraklar))
+            z_ofset.append(len(zaman))
+            sefer_sayisi.append(len(seferler))
+            for sefer in seferler:
+                zaman.extend(sefer)
+
+        d_ofset, d_rota, d_konum = array("i", [0]), array("i"), array("i")
+        for s in range(n):
+            for p, i in rotalari[s]:
+                d_rota.append(p)
+                d_konum.append(i)
+            d_ofset.append(len(d_rota))
+
+        # Yürüme: yalnızca farklı hatları birleştiren (gecikmeli) bağlantılar.
+        y_ofset, y_hedef, y_sure = array("i", [0]), array("i"), array("d")
+        for u in range(n):
+            for e in range(ag.ofset[u], ag.ofset[u + 1]):
+                v = ag.komsu[e]
+                if ag.hat_no[v] != ag.hat_no[u]:
+                    y_hedef.append(v)
+                    y_sure.append(ag.agirlik[e])
+            y_ofset.append(len(y_hedef))
+
+        self.p_ofset, self.p_duraklar = p_ofset, p_duraklar
+        self.z_ofset, self.sefer_sayisi, self.zaman = z_ofset, sefer_sayisi, zaman
+        self.d_ofset, self.d_rota, self.d_konum = d_ofset, d_rota, d_konum
+        self.y_ofset, self.y_hedef, self.y_sure = y_ofset, y_hedef, y_sure
+        self._ag = ag
+        self._derlenen = anahtar
+        return ag
+
+    def _etiketler(self, n: int, tur_sayisi: int):
+        tau = [[_SONSUZ] * n for _ in range(tur_sayisi + 1)]
+        iz: List[List[Optional[Tuple[int, int, int, int]]]] = [[None] * n for _ in range(tur_sayisi + 1)]
+        return tau, iz
+
+    def _raptor(self, kaynak: int, hedef: int, kalkis: float, tau: List[List[float]], iz: List[List]) -> None:
+        """
+        tau[k][v]: en fazla k seferle v'ye en erken varış. Bir etiket k.
+        turda iyileşince sonraki turlara da yazılır (tau[k] <= tau[k-1]);
+        böylece etiketler aralık sorgusunun koşuları arasında saklanabilir.
+        iz[k][v], etiketi koyan (güzergâh, sefer, biniş, iniş) ya da
+        yürümede (-1, kaynak istasyon, 0, 0) bilgisidir.
+        """
+        p_ofset, p_duraklar = self.p_ofset, self.p_duraklar
+        z_ofset, sefer_sayisi, zaman = self.z_ofset, self.sefer_sayisi, self.zaman
+        d_ofset, d_rota, d_konum = self.d_ofset, self.d_rota, self.d_konum
+        y_ofset, y_hedef, y_sure = self.y_ofset, self.y_hedef, self.y_sure
+        son_tur = len(tau) - 1
+
+        def yaz(k: int, v: int, deger: float, kaynak_iz: Tuple[int, int, int, int]) -> None:
+            iz[k][v] = kaynak_iz
+            for j in range(k, son_tur + 1):
+                if deger < tau[j][v]:
+                    tau[j][v] = deger
+
+        def yuru(k: int, isaretli: List[int]) -> List[int]:
+            # Yürüme bağlantıları zincirlenebilir (ör. M hattı -> K -> T),
+            # bu yüzden işaretli duraklardan küçük bir Dijkstra çalıştırılır.
+            bu_tau = tau[k]
+            yeni = list(isaretli)
+            pq = [(bu_tau[u], u) for u in isaretli]
+            heapq.heapify(pq)
+            while pq:
+                d, u = heapq.heappop(pq)
+                if d > bu_tau[u]:
+                    continue
+                for e in range(y_ofset[u], y_ofset[u + 1]):
+                    v = y_hedef[e]
+                    x = d + y_sure[e]
+                    if x < bu_tau[v] and x < bu_tau[hedef]:
+                        yaz(k, v, x, (-1, u, 0, 0))
+                        yeni.append(v)
+                        heapq.heappush(pq, (x, v))
+            return yeni
+
+        isaretli = []
+        if kalkis < tau[0][kaynak]:
+            yaz(0, kaynak, kalkis, (-1, kaynak, 0, 0))
+            isaretli = yuru(0, [kaynak])
+
+        for k in range(1, son_tur + 1):
+            # Her güzergâh, işaretli duraklarından en baştakinden taranır.
+            baslangic: Dict[int, int] = {}
+            for s in isaretli:
+                for e in range(d_ofset[s], d_ofset[s + 1]):
+                    p, i = d_rota[e], d_konum[e]
+                    if i < baslangic.get(p, 1 << 30):
+                        baslangic[p] = i
+            onceki_tau, bu_tau = tau[k - 1], tau[k]
+            iyilesen = []
+            for p, bas in baslangic.items():
+                a, b = p_ofset[p], p_ofset[p + 1]
+                L = b - a
+                z0, t_adet = z_ofset[p], sefer_sayisi[p]
+                t = -1
+                binis = -1
+                for i in range(bas, L):
+                    s = p_duraklar[a + i]
+                    if t != -1:
+                        x = zaman[z0 + t * L + i]
+                        if x < bu_tau[s] and x < bu_tau[hedef]:
+                            yaz(k, s, x, (p, t, binis, i))
+                            iyilesen.append(s)
+                    hazir = onceki_tau[s]
+                    if hazir == _SONSUZ or (t != -1 and zaman[z0 + t * L + i] < hazir):
+                        continue
+                    if t == -1:
+                        # Bu durakta hazir'dan sonra kalkan ilk sefer (ikili arama).
+                        alt, ust = 0, t_adet
+                        while alt < ust:
+                            orta = (alt + ust) // 2
+                            if zaman[z0 + orta * L + i] < hazir:
+                                alt = orta + 1
+                            else:
+                                ust = orta
+                        if alt < t_adet:
+                            t, binis = alt, i
+                    else:
+                        while t > 0 and zaman[z0 + (t - 1) * L + i] >= hazir:
+                            t -= 1
+                            binis = i
+            if not iyilesen:
+                break
+            isaretli = yuru(k, list(dict.fromkeys(iyilesen)))
+
+    def _yolculuk(self, ag: DerlenmisAg, kaynak: int, hedef: int, kalkis: float, tau, iz) -> Optional[Yolculuk]:
+        """En az seferle en erken varışı veren turu bulur ve izi geri sarar."""
+        varis = tau[-1][hedef]
+        if varis == _SONSUZ:
+            return None
+        k = min(j for j in range(len(tau)) if tau[j][hedef] == varis)
+        istasyonlar = ag.istasyonlar
+        bacaklar = []
+        yol = array("i", [hedef])
+        v = hedef
+        while True:
+            # Etiketi ilk koyan tur, bu değere eşit olan en küçük turdur.
+            while k > 0 and tau[k - 1][v] == tau[k][v]:
+                k -= 1
+            p, t_ya_da_u, binis, inis = iz[k][v]
+            if p == -1:
+                u = t_ya_da_u
+                if u == v:
+                    break
+                bacaklar.append(("yurume", None, istasyonlar[u].idx, istasyonlar[v].idx, tau[k][u], tau[k][v]))
+                yol.append(u)
+                v = u
+                continue
+            a = self.p_ofset[p]
+            L = self.p_ofset[p + 1] - a
+            z = self.z_ofset[p] + t_ya_da_u * L
+            u = self.p_duraklar[a + binis]
+            bacaklar.append((
+                "sefer", self.p_hat[p], istasyonlar[u].idx, istasyonlar[v].idx,
+                self.zaman[z + binis], self.zaman[z + inis]
+            ))
+            yol.extend(self.p_duraklar[a + i] for i in range(inis - 1, binis - 1, -1))
+            v = u
+            k -= 1
+        bacaklar.reverse()
+        yol.reverse()
+        return Yolculuk(kalkis, varis, bacaklar, Rota(ag, yol, toplam_sure=varis - kalkis))
+
+    def en_erken_varis(
+        self,
+        baslangic_id: str,
+        hedef_id: str,
+        kalkis: Zaman,
+        en_fazla_aktarma: int = 5
+    ) -> Optional[Yolculuk]:
+        """
+        kalkis zamanında baslangic_id'den çıkınca hedef_id'ye en erken varan
+        yolculuğu döndürür; eşit varışlarda en az aktarmalısı seçilir.
+        """
+        if baslangic_id not in self.metro.istasyonlar or hedef_id not in self.metro.istasyonlar:
+            return None
+        ag = self._derle()
+        kaynak, hedef = ag.indeks[baslangic_id], ag.indeks[hedef_id]
+        kalkis = dakika(kalkis)
+        tau, iz = self._etiketler(len(ag), en_fazla_aktarma + 1)
+        self._raptor(kaynak, hedef, kalkis, tau, iz)
+        return self._yolculuk(ag, kaynak, hedef, kalkis, tau, iz)
+
+    def _yurume_mesafeleri(self, kaynak: int) -> Dict[int, float]:
+        """
+        kaynak'tan zincirlenmiş yürüme bağlantılarıyla ulaşılan duraklara en
+        kısa yürüme süresi; _raptor'daki yuru ile aynı Dijkstra.
+        """
+        y_ofset, y_hedef, y_sure = self.y_ofset, self.y_hedef, self.y_sure
+        mesafe = {kaynak: 0.0}
+        pq = [(0.0, kaynak)]
+        while pq:
+            d, u = heapq.heappop(pq)
+            if d > mesafe[u]:
+                continue
+            for e in range(y_ofset[u], y_ofset[u + 1]):
+                v = y_hedef[e]
+                x = d + y_sure[e]
+                if x < mesafe.get(v, _SONSUZ):
+                    mesafe[v] = x
+                    heapq.heappush(pq, (x, v))
+        return mesafe
+
+    def profil(
+        self,
+        baslangic_id: str,
+        hedef_id: str,
+        ilk: Zaman,
+        son: Zaman,
+        en_fazla_aktarma: int = 5
+    ) -> List[Yolculuk]:
+        """
+        ilk..son aralığında kalkışlar için aralık (rRAPTOR) sorgusu. Aday
+        kalkışlar, başlangıçtan ya da (zincirlenmiş) yürüme bağlantılarıyla
+        ulaşılan duraklardan kalkan seferlerin saatleridir; geç kalkıştan
+        erkene doğru işlenir ve etiketler koşular arasında sıfırlanmaz. Daha geç kalkıp aynı ya da
+        daha erken varan bir yolculuğu olmayan yolculuklar kalkışa göre
+        sıralı döndürülür.
+        """
+        if baslangic_id not in self.metro.istasyonlar or hedef_id not in self.metro.istasyonlar:
+            return []
+        ag = self._derle()
+        kaynak, hedef = ag.indeks[baslangic_id], ag.indeks[hedef_id]
+        ilk, son = dakika(ilk), dakika(son)
+
+        # Başlangıçtan durağa yürüme süresi; kalkış = sefer saati - yürüme.
+        kalkislar = set()
+        for s, w in self._yurume_mesafeleri(kaynak).items():
+            for e in range(self.d_ofset[s], self.d_ofset[s + 1]):
+                p, i = self.d_rota[e], self.d_konum[e]
+                L = self.p_ofset[p + 1] - self.p_ofset[p]
+                z0 = self.z_ofset[p]
+                for t in range(self.sefer_sayisi[p]):
+                    x = self.zaman[z0 + t * L + i] - w
+                    if ilk <= x <= son:
+                        kalkislar.add(x)
+
+        tau, iz = self._etiketler(len(ag), en_fazla_aktarma + 1)
+        sonuc = []
+        for kalkis in sorted(kalkislar, reverse=True):
+            onceki_varis = tau[-1][hedef]
+            self._raptor(kaynak, hedef, kalkis, tau, iz)
+            if tau[-1][hedef] < onceki_varis:
+                sonuc.append(self._yolculuk(ag, kaynak, hedef, kalkis, tau, iz))
+        sonuc.reverse()
+        return sonuc
+
+
+if __name__ == "__main__":
+    metro = MetroAgi()
+    for idx, ad, hat in (
+        ("K1", "Kızılay", "Kırmızı Hat"), ("K2", "Ulus", "Kırmızı Hat"),
+        ("K3", "Demetevler", "Kırmızı Hat"), ("K4", "OSB", "Kırmızı Hat"),
+        ("M1", "AŞTİ", "Mavi Hat"), ("M2", "Kızılay", "Mavi Hat"),
+        ("M3", "Sıhhiye", "Mavi Hat"), ("M4", "Gar", "Mavi Hat"),
+    ):
+        metro.istasyon_ekle(idx, ad, hat)
+    for s1, s2, sure in (
+        ("K1", "K2", 4), ("K2", "K3", 6), ("K3", "K4", 8),
+        ("M1", "M2", 5), ("M2", "M3", 3), ("M3", "M4", 4), ("K1", "M2", 2),
+    ):
+        metro.baglanti_ekle(s1, s2, sure)
+
+    cizelge = ZamanCizelgesi(metro)
+    for hat in ("Kırmızı Hat", "Mavi Hat"):
+        cizelge.duzenli_seferler(hat, "06:00", "23:00", 6)
+        cizelge.duzenli_seferler(hat, "06:03", "23:00", 6, ters=True)
+
+    yolculuk = cizelge.en_erken_varis("M1", "K4", "08:14")
+    print(yolculuk, MetroAgi.print_route(yolculuk.rota))
+    for y in cizelge.profil("M1", "K4", "08:00", "08:30"):
+        print(f"  {saat(y.kalkis)} -> {saat(y.varis)} ({y.aktarma} aktarma)")